@@ -38,6 +38,12 @@ setup(
         CMakeExtension("benchcompress.algorithms.ans.markov_predict_cpp_ext",
                       sourcedir="src/benchcompress/algorithms/ans"),
         CMakeExtension("benchcompress.algorithms.ans.get_run_lengths_cpp_ext",
+                      sourcedir="src/benchcompress/algorithms/ans"),
+        CMakeExtension("benchcompress.algorithms.ans.ans_mt_cpp_ext",
+                      sourcedir="src/benchcompress/algorithms/ans"),
+        CMakeExtension("benchcompress.algorithms.ans.delta_cpp_ext",
+                      sourcedir="src/benchcompress/algorithms/ans"),
+        CMakeExtension("benchcompress.algorithms.ans.shuffle_cpp_ext",
                       sourcedir="src/benchcompress/algorithms/ans")
     ],
     cmdclass={
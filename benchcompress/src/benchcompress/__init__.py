@@ -1,5 +1,5 @@
 from .algorithms import algorithms
 from .datasets import datasets
-from .run_benchmarks import run_benchmarks
+from .run_benchmarks import run_benchmarks, recommend_algorithm
 
-__all__ = ["algorithms", "datasets", "run_benchmarks"]
+__all__ = ["algorithms", "datasets", "run_benchmarks", "recommend_algorithm"]
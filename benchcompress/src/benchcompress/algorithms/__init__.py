@@ -1,3 +1,4 @@
+import re
 from .bzip2 import algorithms as bzip2_algorithms
 from .zlib import algorithms as zlib_algorithms
 from .zstd import algorithms as zstd_algorithms
@@ -5,6 +6,10 @@ from .ans import algorithms as ans_algorithms
 from .lzma import algorithms as lzma_algorithms
 from .brotli import algorithms as brotli_algorithms
 from .lz4 import algorithms as lz4_algorithms
+from .shuffle import algorithms as shuffle_algorithms
+from .blocked import algorithms as blocked_algorithms
+from .seekable import algorithms as seekable_algorithms
+from .pipeline import is_pipeline_spec, make_pipeline_algorithm
 
 algorithms = (
     bzip2_algorithms
@@ -14,4 +19,69 @@ algorithms = (
     + lzma_algorithms
     + brotli_algorithms
     + lz4_algorithms
+    + shuffle_algorithms
+    + blocked_algorithms
+    + seekable_algorithms
 )
+
+
+# Thread-count variants are built once per name, like pipelines, so that
+# looking one up twice returns the same algorithm dictionary
+_threaded_algorithms: dict = {}
+
+
+def make_threaded_algorithm(algorithm: dict, threads: int) -> dict:
+    """Build the variant of an algorithm with native threading for a thread count.
+
+    Algorithms with native threading have a "threads" entry and a
+    "with_threads" function building the same algorithm for another thread
+    count. Variants that are registered are returned as registered.
+
+    Args:
+        algorithm: Algorithm dictionary with a "with_threads" entry
+        threads: Number of threads
+
+    Returns:
+        Algorithm dictionary of the variant
+
+    Raises:
+        ValueError: If the algorithm has no native threading
+    """
+    if "with_threads" not in algorithm:
+        raise ValueError(f"Algorithm {algorithm['name']} has no native threading")
+    if threads == algorithm.get("threads", 1):
+        return algorithm
+    variant = algorithm["with_threads"](threads)
+    for registered in algorithms:
+        if registered["name"] == variant["name"]:
+            return registered
+    return _threaded_algorithms.setdefault(variant["name"], variant)
+
+
+def find_algorithm(name: str) -> dict:
+    """Look up a registered algorithm, or build a pipeline or thread-count variant.
+
+    Args:
+        name: Algorithm name, pipeline spec (e.g. "delta|shuffle|zstd:3") or
+            name of a thread-count variant (e.g. "zstd-4-t16")
+
+    Returns:
+        Algorithm dictionary
+
+    Raises:
+        ValueError: If the name is neither a registered algorithm, a valid
+            pipeline spec nor a thread-count variant of a registered algorithm
+    """
+    for algorithm in algorithms:
+        if algorithm["name"] == name:
+            return algorithm
+    if is_pipeline_spec(name):
+        return make_pipeline_algorithm(name)
+    match = re.fullmatch(r".*-t(\d+)", name)
+    if match and int(match.group(1)) > 0:
+        for algorithm in algorithms:
+            if "with_threads" in algorithm:
+                variant = make_threaded_algorithm(algorithm, int(match.group(1)))
+                if variant["name"] == name:
+                    return variant
+    raise ValueError(f"Unknown algorithm: {name}")
@@ -1,12 +1,31 @@
 import numpy as np
 import os
+import struct
 from .markov_reconstruct import (
     markov_reconstruct as markov_reconstruct_cpp,
 )
 from .markov_predict import (
     markov_predict as markov_predict_cpp,
 )
+from .markov_order import select_markov_order
+from .markov_blocks import markov_block_predict, markov_block_reconstruct
 from .get_run_lengths import get_run_lengths
+from .delta import delta_encode, delta_decode
+from .ans_container import (
+    pack_ans_container,
+    unpack_ans_container,
+    pack_ans_mt_container,
+    unpack_ans_mt_container,
+    pack_markov_model,
+    unpack_markov_model,
+)
+from .ans_mt import (
+    ans_mt_encode as ans_mt_encode_cpp,
+    ans_mt_decode as ans_mt_decode_cpp,
+    count_symbols,
+    choose_table_bits,
+    quantize_symbol_counts,
+)
 
 
 SOURCE_FILE = "ans/__init__.py"
@@ -26,64 +45,13 @@ def ans_encode(x: np.ndarray) -> bytes:
     from simple_ans import ans_encode
 
     encoded = ans_encode(x)
-    if x.dtype == np.uint8:
-        dtype_code = 0
-    elif x.dtype == np.uint16:
-        dtype_code = 1
-    elif x.dtype == np.uint32:
-        dtype_code = 2
-    elif x.dtype == np.int16:
-        dtype_code = 3
-    elif x.dtype == np.int32:
-        dtype_code = 4
-    else:
-        raise ValueError(f"Unsupported dtype: {x.dtype}")
-    header = (
-        [
-            dtype_code,
-            encoded.num_bits,
-            encoded.signal_length,
-            encoded.state,
-            len(encoded.symbol_counts),
-        ]
-        + [c for c in encoded.symbol_counts]
-        + [v for v in encoded.symbol_values]
-    )
-    header_bytes = np.array(header, dtype=np.int64).tobytes()
-    header_size = np.uint32(len(header_bytes))
-    return header_size.tobytes() + header_bytes + encoded.bitstream
+    return pack_ans_container(encoded, str(x.dtype))
 
 
 def ans0_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
-    from simple_ans import ans_decode, EncodedSignal
-
-    header_size = np.frombuffer(x[:4], dtype=np.uint32)[0]
-    header = np.frombuffer(x[4 : 4 + header_size], dtype=np.int64)
-    dtype_code, num_bits, signal_length, state, num_symbols = header[:5]
-    symbol_counts = header[5 : 5 + num_symbols]
-    symbol_values = header[5 + num_symbols :]
-    bitstream = x[4 + header_size :]
-    if dtype_code == 0:
-        assert dtype == "uint8"
-    elif dtype_code == 1:
-        assert dtype == "uint16"
-    elif dtype_code == 2:
-        assert dtype == "uint32"
-    elif dtype_code == 3:
-        assert dtype == "int16"
-    elif dtype_code == 4:
-        assert dtype == "int32"
-    else:
-        raise ValueError(f"Unsupported dtype code: {dtype_code}")
-
-    encoded = EncodedSignal(
-        num_bits=int(num_bits),
-        signal_length=int(signal_length),
-        state=int(state),
-        symbol_counts=symbol_counts.astype(np.uint32),
-        symbol_values=symbol_values.astype(dtype),
-        bitstream=bitstream,
-    )
+    from simple_ans import ans_decode
+
+    encoded, _ = unpack_ans_container(x, dtype)
     return ans_decode(encoded).reshape(shape)
 
 
@@ -92,169 +60,46 @@ def ans_delta_encode(x: np.ndarray) -> bytes:
 
     assert x.ndim == 1
 
-    y = np.diff(x)
     # Encode just the differences
-    encoded = ans_encode(y)
-    if x.dtype == np.uint8:
-        dtype_code = 0
-    elif x.dtype == np.uint16:
-        dtype_code = 1
-    elif x.dtype == np.uint32:
-        dtype_code = 2
-    elif x.dtype == np.int16:
-        dtype_code = 3
-    elif x.dtype == np.int32:
-        dtype_code = 4
-    else:
-        raise ValueError(f"Unsupported dtype: {x.dtype}")
-    # Include x[0] in the header
-    header = (
-        [
-            dtype_code,
-            encoded.num_bits,
-            encoded.signal_length,
-            encoded.state,
-            len(encoded.symbol_counts),
-            x[0],  # Store first value in header
-        ]
-        + [c for c in encoded.symbol_counts]
-        + [v for v in encoded.symbol_values]
-    )
-    header_bytes = np.array(header, dtype=np.int64).tobytes()
-    header_size = np.uint32(len(header_bytes))
-    return header_size.tobytes() + header_bytes + encoded.bitstream
+    encoded = ans_encode(delta_encode(x)[1:])
+    # Store x[0] after the bitstream
+    return pack_ans_container(encoded, str(x.dtype), extra=x[:1].tobytes())
 
 
 def ans_delta_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
-    from simple_ans import ans_decode, EncodedSignal
+    from simple_ans import ans_decode
 
     assert len(shape) == 1
 
-    header_size = np.frombuffer(x[:4], dtype=np.uint32)[0]
-    header = np.frombuffer(x[4 : 4 + header_size], dtype=np.int64)
-    dtype_code, num_bits, signal_length, state, num_symbols, x0 = header[
-        :6
-    ]  # Extract x0 from header
-    symbol_counts = header[6 : 6 + num_symbols]
-    symbol_values = header[6 + num_symbols :]
-    bitstream = x[4 + header_size :]
-    if dtype_code == 0:
-        assert dtype == "uint8"
-    elif dtype_code == 1:
-        assert dtype == "uint16"
-    elif dtype_code == 2:
-        assert dtype == "uint32"
-    elif dtype_code == 3:
-        assert dtype == "int16"
-    elif dtype_code == 4:
-        assert dtype == "int32"
-    else:
-        raise ValueError(f"Unsupported dtype code: {dtype_code}")
-
-    encoded = EncodedSignal(
-        num_bits=int(num_bits),
-        signal_length=int(signal_length),
-        state=int(state),
-        symbol_counts=symbol_counts.astype(np.uint32),
-        symbol_values=symbol_values.astype(dtype),
-        bitstream=bitstream,
-    )
-    # Decode the differences
-    diffs = ans_decode(encoded)
-    # Insert x0 at the beginning and cumulatively sum the differences
-    return np.cumsum(np.insert(diffs, 0, x0))
+    encoded, extra = unpack_ans_container(x, dtype)
+    x0 = np.frombuffer(extra, dtype=dtype)[0]
+    # Decode the differences after x0, then sum them in place
+    output = np.empty(encoded.signal_length + 1, dtype=dtype)
+    output[0] = x0
+    output[1:] = ans_decode(encoded)
+    return delta_decode(output, out=output)
 
 
-def ans_markov_encode(x: np.ndarray) -> bytes:
+def ans_markov_encode(x: np.ndarray, M: int = 6) -> bytes:
     from simple_ans import ans_encode
 
     assert x.ndim == 1
 
-    coeffs, initial, resid = markov_predict_cpp(x, M=6, num_training_samples=10000)
-    # Encode just the differences
+    coeffs, initial, resid = markov_predict_cpp(x, M=M, num_training_samples=10000)
+    # Encode just the residuals
     encoded = ans_encode(resid)
-    if x.dtype == np.uint8:
-        dtype_code = 0
-    elif x.dtype == np.uint16:
-        dtype_code = 1
-    elif x.dtype == np.uint32:
-        dtype_code = 2
-    elif x.dtype == np.int16:
-        dtype_code = 3
-    elif x.dtype == np.int32:
-        dtype_code = 4
-    else:
-        raise ValueError(f"Unsupported dtype: {x.dtype}")
-    # Include x[0] in the header
-    header = (
-        [
-            dtype_code,
-            encoded.num_bits,
-            encoded.signal_length,
-            encoded.state,
-            len(encoded.symbol_counts),
-            len(coeffs),
-            len(initial),
-        ]
-        + [c for c in encoded.symbol_counts]
-        + [v for v in encoded.symbol_values]
-        + [c for c in coeffs]
-        + [v for v in initial]
+    return pack_ans_container(
+        encoded, str(x.dtype), extra=pack_markov_model(coeffs, initial)
     )
-    header_bytes = np.array(header, dtype=np.float64).tobytes()
-    header_size = np.uint32(len(header_bytes))
-    return header_size.tobytes() + header_bytes + encoded.bitstream
 
 
 def ans_markov_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
-    from simple_ans import ans_decode, EncodedSignal
+    from simple_ans import ans_decode
 
     assert len(shape) == 1
 
-    header_size = np.frombuffer(x[:4], dtype=np.uint32)[0]
-    header = np.frombuffer(x[4 : 4 + header_size], dtype=np.float64)
-    dtype_code, num_bits, signal_length, state, num_symbols, num_coeffs, num_initial = (
-        header[:7]
-    )
-    dtype_code = int(dtype_code)
-    num_bits = int(num_bits)
-    signal_length = int(signal_length)
-    state = int(state)
-    num_symbols = int(num_symbols)
-    num_coeffs = int(num_coeffs)
-    num_initial = int(num_initial)
-
-    pos = 7
-    symbol_counts = header[pos : pos + num_symbols]
-    pos += num_symbols
-    symbol_values = header[pos : pos + num_symbols]
-    pos += num_symbols
-    coeffs = header[pos : pos + num_coeffs].astype(np.float32)
-    pos += num_coeffs
-    initial = header[pos : pos + num_initial].astype(dtype)
-    pos += num_initial
-    bitstream = x[4 + header_size :]
-    if dtype_code == 0:
-        assert dtype == "uint8"
-    elif dtype_code == 1:
-        assert dtype == "uint16"
-    elif dtype_code == 2:
-        assert dtype == "uint32"
-    elif dtype_code == 3:
-        assert dtype == "int16"
-    elif dtype_code == 4:
-        assert dtype == "int32"
-    else:
-        raise ValueError(f"Unsupported dtype code: {dtype_code}")
-
-    encoded = EncodedSignal(
-        num_bits=int(num_bits),
-        signal_length=int(signal_length),
-        state=int(state),
-        symbol_counts=symbol_counts.astype(np.uint32),
-        symbol_values=symbol_values.astype(dtype),
-        bitstream=bitstream,
-    )
+    encoded, extra = unpack_ans_container(x, dtype)
+    coeffs, initial, _ = unpack_markov_model(extra, dtype)
 
     resid = ans_decode(encoded)
     output = markov_reconstruct_cpp(coeffs, initial, resid)
@@ -289,19 +134,6 @@ def ans_markov_sparse_encode(x: np.ndarray) -> bytes:
     )
     encoded = ans_encode(resid)
 
-    if x.dtype == np.uint8:
-        dtype_code = 0
-    elif x.dtype == np.uint16:
-        dtype_code = 1
-    elif x.dtype == np.uint32:
-        dtype_code = 2
-    elif x.dtype == np.int16:
-        dtype_code = 3
-    elif x.dtype == np.int32:
-        dtype_code = 4
-    else:
-        raise ValueError(f"Unsupported dtype: {x.dtype}")
-
     if run_lengths.dtype == np.uint8:
         run_length_dtype_code = 0
     elif run_lengths.dtype == np.uint16:
@@ -311,82 +143,31 @@ def ans_markov_sparse_encode(x: np.ndarray) -> bytes:
     else:
         raise ValueError(f"Unsupported run length dtype: {run_lengths.dtype}")
 
-    header = (
-        [
-            dtype_code,
-            encoded.num_bits,
-            len(encoded.bitstream),
-            encoded.signal_length,
-            encoded.state,
-            len(encoded.symbol_counts),
-            len(coeffs),
-            len(initial),
-            run_length_dtype_code,
-            len(run_lengths),
-        ]
-        + [c for c in encoded.symbol_counts]
-        + [v for v in encoded.symbol_values]
-        + [c for c in coeffs]
-        + [v for v in initial]
-    )
-    header_bytes = np.array(header, dtype=np.float64).tobytes()
-    header_size = np.uint32(len(header_bytes))
-
-    return (
-        header_size.tobytes() + header_bytes + encoded.bitstream + run_lengths.tobytes()
+    extra = (
+        pack_markov_model(coeffs, initial)
+        + struct.pack("<BQ", run_length_dtype_code, len(run_lengths))
+        + run_lengths.tobytes()
     )
+    return pack_ans_container(encoded, str(x.dtype), extra=extra)
 
 
 def ans_markov_sparse_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
-    from simple_ans import ans_decode, EncodedSignal
+    from simple_ans import ans_decode
 
     assert len(shape) == 1
 
-    header_size = np.frombuffer(x[:4], dtype=np.uint32)[0]
-    header = np.frombuffer(x[4 : 4 + header_size], dtype=np.float64)
-    (
-        dtype_code,
-        num_bits,
-        bitstream_length,
-        signal_length,
-        state,
-        num_symbols,
-        num_coeffs,
-        num_initial,
-        run_length_dtype_code,
-        num_run_lengths,
-    ) = header[:10]
-    dtype_code = int(dtype_code)
-    num_bits = int(num_bits)
-    bitstream_length = int(bitstream_length)
-    signal_length = int(signal_length)
-    state = int(state)
-    num_symbols = int(num_symbols)
-    num_coeffs = int(num_coeffs)
-    num_initial = int(num_initial)
-    run_length_dtype_code = int(run_length_dtype_code)
-    num_run_lengths = int(num_run_lengths)
-
-    pos = 10
-    symbol_counts = header[pos : pos + num_symbols]
-    pos += num_symbols
-    symbol_values = header[pos : pos + num_symbols]
-    pos += num_symbols
-    coeffs = header[pos : pos + num_coeffs].astype(np.float32)
-    pos += num_coeffs
-    initial = header[pos : pos + num_initial].astype(dtype)
-    pos += num_initial
-
-    bitstream_end = 4 + header_size + bitstream_length
-    bitstream = x[4 + header_size : bitstream_end]
+    encoded, extra = unpack_ans_container(x, dtype)
+    coeffs, initial, pos = unpack_markov_model(extra, dtype)
+    run_length_dtype_code, num_run_lengths = struct.unpack("<BQ", extra[pos : pos + 9])
+    pos += 9
 
     # Get run lengths from the remaining bytes
     if run_length_dtype_code == 0:
-        run_lengths = np.frombuffer(x[bitstream_end:], dtype=np.uint8)
+        run_lengths = np.frombuffer(extra[pos:], dtype=np.uint8)
     elif run_length_dtype_code == 1:
-        run_lengths = np.frombuffer(x[bitstream_end:], dtype=np.uint16)
+        run_lengths = np.frombuffer(extra[pos:], dtype=np.uint16)
     elif run_length_dtype_code == 2:
-        run_lengths = np.frombuffer(x[bitstream_end:], dtype=np.uint32)
+        run_lengths = np.frombuffer(extra[pos:], dtype=np.uint32)
     else:
         raise ValueError(f"Unsupported run length dtype code: {run_length_dtype_code}")
 
@@ -395,28 +176,6 @@ def ans_markov_sparse_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
             f"Expected {num_run_lengths} run lengths, got {len(run_lengths)}"
         )
 
-    if dtype_code == 0:
-        assert dtype == "uint8"
-    elif dtype_code == 1:
-        assert dtype == "uint16"
-    elif dtype_code == 2:
-        assert dtype == "uint32"
-    elif dtype_code == 3:
-        assert dtype == "int16"
-    elif dtype_code == 4:
-        assert dtype == "int32"
-    else:
-        raise ValueError(f"Unsupported dtype code: {dtype_code}")
-
-    encoded = EncodedSignal(
-        num_bits=int(num_bits),
-        signal_length=int(signal_length),
-        state=int(state),
-        symbol_counts=symbol_counts.astype(np.uint32),
-        symbol_values=symbol_values.astype(dtype),
-        bitstream=bitstream,
-    )
-
     # Decode residuals and reconstruct non-zero data
     resid = ans_decode(encoded)
     non_zero_data = markov_reconstruct_cpp(coeffs, initial, resid)
@@ -445,10 +204,149 @@ def ans_markov_sparse_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
     return output
 
 
+def ans_markov_block_encode(x: np.ndarray, block_size: int) -> bytes:
+    from simple_ans import ans_encode
+
+    assert x.ndim == 1
+
+    model, resid = markov_block_predict(x, M=6, block_size=block_size)
+    encoded = ans_encode(resid)
+    return pack_ans_container(encoded, str(x.dtype), extra=model)
+
+
+def ans_markov_block_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
+    from simple_ans import ans_decode
+
+    assert len(shape) == 1
+
+    encoded, model = unpack_ans_container(x, dtype)
+    resid = ans_decode(encoded)
+    return markov_block_reconstruct(model, resid)
+
+
+def _ans_mt_encode_signal(
+    x: np.ndarray, num_lanes: int, num_threads: int, extra: bytes = b""
+) -> bytes:
+    symbol_values, counts = count_symbols(x)
+    table_bits = choose_table_bits(len(symbol_values))
+    symbol_counts = quantize_symbol_counts(counts, table_bits)
+    states, word_counts, words = ans_mt_encode_cpp(
+        x, symbol_values, symbol_counts, table_bits, num_lanes, num_threads
+    )
+    return pack_ans_mt_container(
+        str(x.dtype),
+        len(x),
+        table_bits,
+        symbol_values,
+        symbol_counts,
+        states,
+        word_counts,
+        words,
+        extra=extra,
+    )
+
+
+def _ans_mt_decode_signal(x: bytes, dtype: str, num_threads: int) -> tuple:
+    encoded, extra = unpack_ans_mt_container(x, dtype)
+    signal = ans_mt_decode_cpp(
+        encoded["states"],
+        encoded["word_counts"],
+        encoded["words"],
+        encoded["symbol_values"],
+        encoded["symbol_counts"],
+        encoded["table_bits"],
+        encoded["signal_length"],
+        num_threads,
+    )
+    return signal, extra
+
+
+def ans_mt_encode(x: np.ndarray, num_lanes: int, num_threads: int) -> bytes:
+    return _ans_mt_encode_signal(x.reshape(-1), num_lanes, num_threads)
+
+
+def ans_mt_decode(x: bytes, dtype: str, shape: tuple, num_threads: int) -> np.ndarray:
+    signal, _ = _ans_mt_decode_signal(x, dtype, num_threads)
+    return signal.reshape(shape)
+
+
+def ans_markov_mt_encode(x: np.ndarray, num_lanes: int, num_threads: int) -> bytes:
+    assert x.ndim == 1
+
+    coeffs, initial, resid = markov_predict_cpp(
+        x, M=6, num_training_samples=10000, num_threads=num_threads
+    )
+    return _ans_mt_encode_signal(
+        resid, num_lanes, num_threads, extra=pack_markov_model(coeffs, initial)
+    )
+
+
+def ans_markov_mt_decode(
+    x: bytes, dtype: str, shape: tuple, num_threads: int
+) -> np.ndarray:
+    assert len(shape) == 1
+
+    resid, extra = _ans_mt_decode_signal(x, dtype, num_threads)
+    coeffs, initial, _ = unpack_markov_model(extra, dtype)
+    return markov_reconstruct_cpp(coeffs, initial, resid)
+
+
+def _ans_mt_variant(num_lanes: int, num_threads: int) -> dict:
+    return {
+        "name": f"ANS-mt-{num_lanes}-t{num_threads}",
+        "version": "1",
+        "encode": lambda x: ans_mt_encode(x, num_lanes, num_threads),
+        "decode": lambda x, dtype, shape: ans_mt_decode(x, dtype, shape, num_threads),
+        "description": f"Multi-lane rANS: {num_lanes} independent lanes sharing one frequency table, coded with {num_threads} thread(s).",
+        "tags": ["ANS", "integer"],
+        "threads": num_threads,
+        "with_threads": lambda n: _ans_mt_variant(num_lanes, n),
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+
+
+def _ans_markov_mt_variant(num_lanes: int, num_threads: int) -> dict:
+    return {
+        "name": f"ANS-markov-mt-{num_lanes}-t{num_threads}",
+        "version": "1",
+        "encode": lambda x: ans_markov_mt_encode(x, num_lanes, num_threads),
+        "decode": lambda x, dtype, shape: ans_markov_mt_decode(
+            x, dtype, shape, num_threads
+        ),
+        "description": f"Markov prediction with multi-lane rANS on the residuals: {num_lanes} lanes sharing one frequency table, coded with {num_threads} thread(s).",
+        "tags": ["ANS", "integer", "markov_prediction", "1d"],
+        "threads": num_threads,
+        "with_threads": lambda n: _ans_markov_mt_variant(num_lanes, n),
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+
+
+def _ans_mt_variants(num_lanes: int, num_threads: int) -> list:
+    return [
+        _ans_mt_variant(num_lanes, num_threads),
+        _ans_markov_mt_variant(num_lanes, num_threads),
+    ]
+
+
+def _ans_markov_block_variant(block_size: int, block_label: str) -> dict:
+    return {
+        "name": f"ANS-markov-block-{block_label}",
+        "version": "1",
+        "encode": lambda x: ans_markov_block_encode(x, block_size),
+        "decode": lambda x, dtype, shape: ans_markov_block_decode(x, dtype, shape),
+        "description": f"ANS compression via simple_ans with Markov prediction, refitting the coefficients for every block of {block_label} samples to follow non-stationary signals.",
+        "tags": ["ANS", "integer", "markov_prediction", "1d"],
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+
+
 algorithms = [
     {
         "name": "ANS",
-        "version": "3",
+        "version": "4",
         "encode": lambda x: ans_encode(x),
         "decode": lambda x, dtype, shape: ans0_decode(x, dtype, shape),
         "description": "ANS compression via simple_ans for efficient data compression.",
@@ -458,7 +356,7 @@ algorithms = [
     },
     {
         "name": "ANS-delta",
-        "version": "3",
+        "version": "5",
         "encode": lambda x: ans_delta_encode(x),
         "decode": lambda x, dtype, shape: ans_delta_decode(x, dtype, shape),
         "description": "ANS compression via simple_ans with delta encoding for improved compression of sequential data.",
@@ -468,7 +366,7 @@ algorithms = [
     },
     {
         "name": "ANS-markov",
-        "version": "6",
+        "version": "7",
         "encode": lambda x: ans_markov_encode(x),
         "decode": lambda x, dtype, shape: ans_markov_decode(x, dtype, shape),
         "description": "ANS compression via simple_ans with Markov prediction for exploiting temporal correlations in the data.",
@@ -478,7 +376,7 @@ algorithms = [
     },
     {
         "name": "ANS-markov-zrle",
-        "version": "6",
+        "version": "7",
         "encode": lambda x: ans_markov_sparse_encode(x),
         "decode": lambda x, dtype, shape: ans_markov_sparse_decode(x, dtype, shape),
         "description": "ANS compression via simple_ans with Markov prediction and zero run-length encoding for sparse data.",
@@ -486,4 +384,24 @@ algorithms = [
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
+    {
+        "name": "ANS-markov-auto",
+        "version": "2",
+        # The order is selected inside encode, so the encode time includes it
+        "encode": lambda x: ans_markov_encode(x, M=select_markov_order(x)),
+        "decode": lambda x, dtype, shape: ans_markov_decode(x, dtype, shape),
+        "description": "ANS compression via simple_ans with Markov prediction, choosing the model order that minimizes the residual entropy on a training window.",
+        "tags": ["ANS", "integer", "markov_prediction", "1d"],
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    },
+    _ans_markov_block_variant(4096, "4K"),
+    _ans_markov_block_variant(16384, "16K"),
+    _ans_markov_block_variant(65536, "64K"),
+] + [
+    # The lane count is fixed, so the encoded stream is identical for every
+    # thread count and the variants show the thread scaling of the coder
+    variant
+    for num_threads in [1, 2, 4, 8]
+    for variant in _ans_mt_variants(8, num_threads)
 ]
@@ -0,0 +1,342 @@
+import struct
+from typing import Any, Dict, Tuple
+import numpy as np
+
+
+# Fixed-size header of the ANS container:
+# dtype_code, signal_length, num_bits, state, num_symbols,
+# symbol_table_length (bytes), bitstream_length (bytes)
+HEADER_FORMAT = "<BQQQIIQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Fixed-size header of the multi-lane ANS container:
+# dtype_code, signal_length, table_bits, num_lanes, num_symbols,
+# symbol_table_length (bytes)
+MT_HEADER_FORMAT = "<BQBIII"
+MT_HEADER_SIZE = struct.calcsize(MT_HEADER_FORMAT)
+
+DTYPE_CODES = {
+    "uint8": 0,
+    "uint16": 1,
+    "uint32": 2,
+    "int16": 3,
+    "int32": 4,
+}
+
+
+def zigzag_encode(x: np.ndarray) -> np.ndarray:
+    """Map signed integers to unsigned ones (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...)."""
+    x = x.astype(np.int64)
+    return ((x << 1) ^ (x >> 63)).astype(np.uint64)
+
+
+def zigzag_decode(x: np.ndarray) -> np.ndarray:
+    """Inverse of zigzag_encode."""
+    x = x.astype(np.uint64)
+    return (x >> np.uint64(1)).astype(np.int64) ^ -(x & np.uint64(1)).astype(np.int64)
+
+
+def varint_encode(x: np.ndarray) -> bytes:
+    """Encode unsigned integers as LEB128 varints (7 bits per byte).
+
+    Args:
+        x: Array of unsigned integers
+
+    Returns:
+        The concatenated varints
+    """
+    x = np.asarray(x, dtype=np.uint64)
+    if len(x) == 0:
+        return b""
+    # Number of 7-bit groups needed for each value (at most 10 for uint64)
+    thresholds = np.uint64(1) << (7 * np.arange(1, 10, dtype=np.uint64))
+    num_groups = 1 + np.sum(x[:, None] >= thresholds[None, :], axis=1)
+
+    max_groups = int(num_groups.max())
+    groups = np.arange(max_groups)
+    shifts = (7 * groups).astype(np.uint64)
+    out = ((x[:, None] >> shifts[None, :]) & np.uint64(0x7F)).astype(np.uint8)
+    # Continuation bit on every group but the last of each value
+    out[groups[None, :] < (num_groups[:, None] - 1)] |= 0x80
+    return out[groups[None, :] < num_groups[:, None]].tobytes()
+
+
+def varint_decode(x: bytes, count: int) -> np.ndarray:
+    """Decode count LEB128 varints.
+
+    Args:
+        x: Bytes holding exactly count varints
+        count: Number of values
+
+    Returns:
+        Array of uint64 values
+    """
+    b = np.frombuffer(x, dtype=np.uint8)
+    if count == 0:
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero((b & 0x80) == 0)
+    if len(ends) != count or ends[-1] != len(b) - 1:
+        raise ValueError("Malformed varint data")
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    lengths = ends - starts + 1
+    position_in_value = np.arange(len(b)) - np.repeat(starts, lengths)
+    parts = (b & 0x7F).astype(np.uint64) << (7 * position_in_value).astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+
+def pack_symbol_table(symbol_values: np.ndarray, symbol_counts: np.ndarray) -> bytes:
+    """Serialize an ANS symbol table.
+
+    The symbol values are delta coded (differences are zigzag mapped to
+    handle any order) and the values and counts are stored as varints, which
+    takes a few bytes per symbol instead of 16.
+
+    Args:
+        symbol_values: Symbol values
+        symbol_counts: Symbol counts
+
+    Returns:
+        The serialized table
+    """
+    value_deltas = np.diff(np.asarray(symbol_values).astype(np.int64), prepend=0)
+    return varint_encode(
+        np.concatenate([zigzag_encode(value_deltas), np.asarray(symbol_counts)])
+    )
+
+
+def unpack_symbol_table(
+    x: bytes, num_symbols: int, dtype: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse a table written by pack_symbol_table.
+
+    Args:
+        x: The serialized table
+        num_symbols: Number of symbols
+        dtype: Data type of the symbol values
+
+    Returns:
+        Tuple containing:
+        - symbol_values: Symbol values
+        - symbol_counts: Symbol counts (uint32)
+    """
+    table = varint_decode(x, 2 * num_symbols)
+    symbol_values = np.cumsum(zigzag_decode(table[:num_symbols])).astype(dtype)
+    return symbol_values, table[num_symbols:].astype(np.uint32)
+
+
+def pack_ans_container(encoded, dtype: str, extra: bytes = b"") -> bytes:
+    """Serialize a simple_ans EncodedSignal in the compact ANS container.
+
+    The container holds a fixed struct header, the symbol table (see
+    pack_symbol_table), the bitstream and optional extra bytes (e.g. a
+    prediction model).
+
+    Args:
+        encoded: EncodedSignal returned by simple_ans.ans_encode
+        dtype: Data type of the encoded signal
+        extra: Additional bytes appended after the bitstream
+
+    Returns:
+        The serialized container
+    """
+    if dtype not in DTYPE_CODES:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    symbol_table = pack_symbol_table(encoded.symbol_values, encoded.symbol_counts)
+    header = struct.pack(
+        HEADER_FORMAT,
+        DTYPE_CODES[dtype],
+        encoded.signal_length,
+        encoded.num_bits,
+        encoded.state,
+        len(encoded.symbol_values),
+        len(symbol_table),
+        len(encoded.bitstream),
+    )
+    return header + symbol_table + encoded.bitstream + extra
+
+
+def unpack_ans_container(x: bytes, dtype: str) -> Tuple[object, bytes]:
+    """Parse a container written by pack_ans_container.
+
+    Args:
+        x: The serialized container
+        dtype: Expected data type of the encoded signal
+
+    Returns:
+        Tuple containing:
+        - encoded: EncodedSignal to pass to simple_ans.ans_decode
+        - extra: The extra bytes stored after the bitstream
+    """
+    from simple_ans import EncodedSignal
+
+    (
+        dtype_code,
+        signal_length,
+        num_bits,
+        state,
+        num_symbols,
+        symbol_table_length,
+        bitstream_length,
+    ) = struct.unpack(HEADER_FORMAT, x[:HEADER_SIZE])
+    if DTYPE_CODES.get(dtype) != dtype_code:
+        raise ValueError(f"Encoded dtype code {dtype_code} does not match {dtype}")
+
+    pos = HEADER_SIZE
+    symbol_values, symbol_counts = unpack_symbol_table(
+        x[pos : pos + symbol_table_length], num_symbols, dtype
+    )
+    pos += symbol_table_length
+    bitstream = x[pos : pos + bitstream_length]
+    pos += bitstream_length
+
+    encoded = EncodedSignal(
+        num_bits=num_bits,
+        signal_length=signal_length,
+        state=state,
+        symbol_counts=symbol_counts,
+        symbol_values=symbol_values,
+        bitstream=bitstream,
+    )
+    return encoded, x[pos:]
+
+
+def pack_ans_mt_container(
+    dtype: str,
+    signal_length: int,
+    table_bits: int,
+    symbol_values: np.ndarray,
+    symbol_counts: np.ndarray,
+    states: np.ndarray,
+    word_counts: np.ndarray,
+    words: np.ndarray,
+    extra: bytes = b"",
+) -> bytes:
+    """Serialize the output of ans_mt_encode.
+
+    The container holds a fixed struct header, the symbol table (see
+    pack_symbol_table), the final state and the number of words of each lane,
+    the words of all lanes and optional extra bytes.
+
+    Args:
+        dtype: Data type of the encoded signal
+        signal_length: Length of the encoded signal
+        table_bits: log2 of the frequency table size
+        symbol_values: Symbol values
+        symbol_counts: Quantized symbol counts
+        states: Final lane states
+        word_counts: Number of words per lane
+        words: Concatenated 32-bit words
+        extra: Additional bytes appended after the words
+
+    Returns:
+        The serialized container
+    """
+    if dtype not in DTYPE_CODES:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    symbol_table = pack_symbol_table(symbol_values, symbol_counts)
+    header = struct.pack(
+        MT_HEADER_FORMAT,
+        DTYPE_CODES[dtype],
+        signal_length,
+        table_bits,
+        len(states),
+        len(symbol_values),
+        len(symbol_table),
+    )
+    return (
+        header
+        + symbol_table
+        + states.astype("<u8").tobytes()
+        + word_counts.astype("<u8").tobytes()
+        + words.astype("<u4").tobytes()
+        + extra
+    )
+
+
+def unpack_ans_mt_container(x: bytes, dtype: str) -> Tuple[Dict[str, Any], bytes]:
+    """Parse a container written by pack_ans_mt_container.
+
+    Args:
+        x: The serialized container
+        dtype: Expected data type of the encoded signal
+
+    Returns:
+        Tuple containing:
+        - encoded: Dictionary with signal_length, table_bits, symbol_values,
+          symbol_counts, states, word_counts and words
+        - extra: The extra bytes stored after the words
+    """
+    (
+        dtype_code,
+        signal_length,
+        table_bits,
+        num_lanes,
+        num_symbols,
+        symbol_table_length,
+    ) = struct.unpack(MT_HEADER_FORMAT, x[:MT_HEADER_SIZE])
+    if DTYPE_CODES.get(dtype) != dtype_code:
+        raise ValueError(f"Encoded dtype code {dtype_code} does not match {dtype}")
+
+    pos = MT_HEADER_SIZE
+    symbol_values, symbol_counts = unpack_symbol_table(
+        x[pos : pos + symbol_table_length], num_symbols, dtype
+    )
+    pos += symbol_table_length
+    states = np.frombuffer(x, dtype="<u8", count=num_lanes, offset=pos)
+    pos += 8 * num_lanes
+    word_counts = np.frombuffer(x, dtype="<u8", count=num_lanes, offset=pos)
+    pos += 8 * num_lanes
+    num_words = int(word_counts.sum())
+    words = np.frombuffer(x, dtype="<u4", count=num_words, offset=pos)
+    pos += 4 * num_words
+    encoded = {
+        "signal_length": signal_length,
+        "table_bits": table_bits,
+        "symbol_values": symbol_values,
+        "symbol_counts": symbol_counts,
+        "states": states,
+        "word_counts": word_counts,
+        "words": words,
+    }
+    return encoded, x[pos:]
+
+
+def pack_markov_model(coeffs: np.ndarray, initial: np.ndarray) -> bytes:
+    """Serialize Markov prediction coefficients and initial values.
+
+    Args:
+        coeffs: float32 coefficients (the last one is the bias term)
+        initial: Initial values of the signal (len(coeffs) - 1 of them)
+
+    Returns:
+        uint32 number of coefficients, the coefficients and the initial values
+    """
+    return (
+        struct.pack("<I", len(coeffs))
+        + coeffs.astype(np.float32).tobytes()
+        + initial.tobytes()
+    )
+
+
+def unpack_markov_model(x: bytes, dtype: str) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Parse a model written by pack_markov_model.
+
+    Args:
+        x: Bytes starting with the serialized model
+        dtype: Data type of the initial values
+
+    Returns:
+        Tuple containing:
+        - coeffs: float32 coefficients
+        - initial: Initial values
+        - size: Number of bytes used by the model
+    """
+    (num_coeffs,) = struct.unpack("<I", x[:4])
+    pos = 4
+    coeffs = np.frombuffer(x[pos : pos + 4 * num_coeffs], dtype=np.float32)
+    pos += 4 * num_coeffs
+    itemsize = np.dtype(dtype).itemsize
+    num_initial = max(num_coeffs - 1, 0)
+    initial = np.frombuffer(x[pos : pos + itemsize * num_initial], dtype=dtype)
+    pos += itemsize * num_initial
+    return coeffs, initial, pos
@@ -0,0 +1,30 @@
+#include "ans_mt.hpp"
+
+#include <string>
+
+namespace py = pybind11;
+
+template <typename T> void register_ans_mt(py::module &m, const char *suffix) {
+  m.def((std::string("ans_mt_encode_") + suffix).c_str(),
+        &ans_mt_encode_impl<T>,
+        "Encode a signal as independent rANS lanes sharing one frequency "
+        "table; returns the final lane states, the number of words per lane "
+        "and the concatenated words",
+        py::arg("x"), py::arg("symbol_values"), py::arg("symbol_counts"),
+        py::arg("table_bits"), py::arg("num_lanes"), py::arg("num_threads"));
+  m.def((std::string("ans_mt_decode_") + suffix).c_str(),
+        &ans_mt_decode_impl<T>, "Decode a signal encoded with ans_mt_encode",
+        py::arg("states"), py::arg("word_counts"), py::arg("words"),
+        py::arg("symbol_values"), py::arg("symbol_counts"),
+        py::arg("table_bits"), py::arg("signal_length"),
+        py::arg("num_threads"));
+}
+
+PYBIND11_MODULE(ans_mt_cpp_ext, m) {
+  m.doc() = "C++ implementation of multi-lane rANS coding using pybind11";
+  register_ans_mt<uint8_t>(m, "uint8");
+  register_ans_mt<uint16_t>(m, "uint16");
+  register_ans_mt<uint32_t>(m, "uint32");
+  register_ans_mt<int16_t>(m, "int16");
+  register_ans_mt<int32_t>(m, "int32");
+}
@@ -0,0 +1,264 @@
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <cstdint>
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <stdexcept>
+#include <thread>
+#include <tuple>
+#include <vector>
+
+namespace py = pybind11;
+
+// rANS with a 64-bit state and 32-bit renormalization. The state is kept in
+// [ANS_MT_L, ANS_MT_L << 32), so at most one word is emitted or consumed per
+// symbol.
+static const uint64_t ANS_MT_L = 1ull << 31;
+
+// Run f(lane) for every lane, distributing the lanes over num_threads threads.
+// Plain std::thread is used (rather than an OpenMP pool) so that the
+// extension stays safe to call in processes forked from the benchmark runner.
+template <typename F>
+void ans_mt_for_each_lane(size_t num_lanes, size_t num_threads, F f) {
+  num_threads = std::max<size_t>(1, std::min(num_threads, num_lanes));
+  if (num_threads == 1) {
+    for (size_t lane = 0; lane < num_lanes; lane++) {
+      f(lane);
+    }
+    return;
+  }
+  std::vector<std::thread> threads;
+  for (size_t t = 0; t < num_threads; t++) {
+    threads.emplace_back([t, num_threads, num_lanes, &f]() {
+      for (size_t lane = t; lane < num_lanes; lane += num_threads) {
+        f(lane);
+      }
+    });
+  }
+  for (auto &thread : threads) {
+    thread.join();
+  }
+}
+
+// Lanes are contiguous blocks of the signal of (almost) equal length
+inline size_t ans_mt_lane_start(size_t lane, size_t num_lanes, size_t N) {
+  return lane * N / num_lanes;
+}
+
+template <typename T>
+std::tuple<py::array_t<uint64_t>, py::array_t<uint64_t>, py::array_t<uint32_t>>
+ans_mt_encode_impl(py::array_t<T> x, py::array_t<T> symbol_values,
+                   py::array_t<uint32_t> symbol_counts, int table_bits,
+                   size_t num_lanes, size_t num_threads) {
+  auto x_buf = x.request();
+  const T *x_ptr = static_cast<const T *>(x_buf.ptr);
+  size_t N = x_buf.shape[0];
+  auto values_buf = symbol_values.request();
+  const T *values_ptr = static_cast<const T *>(values_buf.ptr);
+  size_t num_symbols = values_buf.shape[0];
+  auto counts_buf = symbol_counts.request();
+  const uint32_t *counts_ptr = static_cast<const uint32_t *>(counts_buf.ptr);
+
+  if (num_lanes == 0) {
+    throw std::invalid_argument("num_lanes must be positive");
+  }
+  if (table_bits < 1 || table_bits > 24) {
+    throw std::invalid_argument("table_bits must be between 1 and 24");
+  }
+  if (static_cast<size_t>(counts_buf.shape[0]) != num_symbols) {
+    throw std::invalid_argument(
+        "symbol_values and symbol_counts differ in size");
+  }
+
+  // Cumulative counts
+  std::vector<uint32_t> starts(num_symbols);
+  uint64_t total = 0;
+  for (size_t s = 0; s < num_symbols; s++) {
+    if (s > 0 && !(values_ptr[s - 1] < values_ptr[s])) {
+      throw std::invalid_argument("symbol_values must be sorted and unique");
+    }
+    if (counts_ptr[s] == 0) {
+      throw std::invalid_argument("symbol_counts must be positive");
+    }
+    starts[s] = static_cast<uint32_t>(total);
+    total += counts_ptr[s];
+  }
+  if (total != (1ull << table_bits)) {
+    throw std::invalid_argument("symbol_counts must sum to 2^table_bits");
+  }
+
+  // Map values to symbol indices with a dense table when the value range is
+  // small, and with a binary search otherwise
+  std::vector<int32_t> dense_index;
+  int64_t min_value = num_symbols > 0 ? static_cast<int64_t>(values_ptr[0]) : 0;
+  if (num_symbols > 0) {
+    int64_t range =
+        static_cast<int64_t>(values_ptr[num_symbols - 1]) - min_value + 1;
+    if (range <= (1 << 24)) {
+      dense_index.assign(range, -1);
+      for (size_t s = 0; s < num_symbols; s++) {
+        dense_index[static_cast<int64_t>(values_ptr[s]) - min_value] =
+            static_cast<int32_t>(s);
+      }
+    }
+  }
+
+  std::vector<uint64_t> states(num_lanes);
+  std::vector<std::vector<uint32_t>> lane_words(num_lanes);
+  std::atomic<bool> unknown_symbol(false);
+
+  {
+    py::gil_scoped_release release;
+    ans_mt_for_each_lane(num_lanes, num_threads, [&](size_t lane) {
+      size_t a = ans_mt_lane_start(lane, num_lanes, N);
+      size_t b = ans_mt_lane_start(lane + 1, num_lanes, N);
+      std::vector<uint32_t> &words = lane_words[lane];
+      words.reserve((b - a) / 2 + 16);
+      uint64_t state = ANS_MT_L;
+      // rANS encodes in reverse so that decoding runs forward
+      for (size_t i = b; i-- > a;) {
+        int64_t s;
+        if (!dense_index.empty()) {
+          int64_t offset = static_cast<int64_t>(x_ptr[i]) - min_value;
+          s = (offset >= 0 && offset < static_cast<int64_t>(dense_index.size()))
+                  ? dense_index[offset]
+                  : -1;
+        } else {
+          const T *it =
+              std::lower_bound(values_ptr, values_ptr + num_symbols, x_ptr[i]);
+          s = (it != values_ptr + num_symbols && *it == x_ptr[i])
+                  ? it - values_ptr
+                  : -1;
+        }
+        if (s < 0) {
+          unknown_symbol = true;
+          return;
+        }
+        uint64_t freq = counts_ptr[s];
+        uint64_t state_max = ((ANS_MT_L >> table_bits) << 32) * freq;
+        if (state >= state_max) {
+          words.push_back(static_cast<uint32_t>(state));
+          state >>= 32;
+        }
+        state = ((state / freq) << table_bits) + (state % freq) + starts[s];
+      }
+      std::reverse(words.begin(), words.end());
+      states[lane] = state;
+    });
+  }
+  if (unknown_symbol) {
+    throw std::invalid_argument("Signal contains a value not in symbol_values");
+  }
+
+  size_t total_words = 0;
+  for (const auto &words : lane_words) {
+    total_words += words.size();
+  }
+  std::vector<ssize_t> lanes_shape = {static_cast<ssize_t>(num_lanes)};
+  std::vector<ssize_t> words_shape = {static_cast<ssize_t>(total_words)};
+  py::array_t<uint64_t> states_array(lanes_shape);
+  py::array_t<uint64_t> word_counts_array(lanes_shape);
+  py::array_t<uint32_t> words_array(words_shape);
+  uint64_t *states_out =
+      static_cast<uint64_t *>(states_array.request(true).ptr);
+  uint64_t *counts_out =
+      static_cast<uint64_t *>(word_counts_array.request(true).ptr);
+  uint32_t *words_out = static_cast<uint32_t *>(words_array.request(true).ptr);
+  for (size_t lane = 0; lane < num_lanes; lane++) {
+    states_out[lane] = states[lane];
+    counts_out[lane] = lane_words[lane].size();
+    std::copy(lane_words[lane].begin(), lane_words[lane].end(), words_out);
+    words_out += lane_words[lane].size();
+  }
+  return std::make_tuple(states_array, word_counts_array, words_array);
+}
+
+template <typename T>
+py::array_t<T>
+ans_mt_decode_impl(py::array_t<uint64_t> states,
+                   py::array_t<uint64_t> word_counts,
+                   py::array_t<uint32_t> words, py::array_t<T> symbol_values,
+                   py::array_t<uint32_t> symbol_counts, int table_bits,
+                   size_t signal_length, size_t num_threads) {
+  auto states_buf = states.request();
+  const uint64_t *states_ptr = static_cast<const uint64_t *>(states_buf.ptr);
+  size_t num_lanes = states_buf.shape[0];
+  const uint64_t *word_counts_ptr =
+      static_cast<const uint64_t *>(word_counts.request().ptr);
+  auto words_buf = words.request();
+  const uint32_t *words_ptr = static_cast<const uint32_t *>(words_buf.ptr);
+  size_t num_words = words_buf.shape[0];
+  auto values_buf = symbol_values.request();
+  const T *values_ptr = static_cast<const T *>(values_buf.ptr);
+  size_t num_symbols = values_buf.shape[0];
+  const uint32_t *counts_ptr =
+      static_cast<const uint32_t *>(symbol_counts.request().ptr);
+
+  if (table_bits < 1 || table_bits > 24) {
+    throw std::invalid_argument("table_bits must be between 1 and 24");
+  }
+
+  // Slot -> symbol lookup table, and cumulative counts
+  uint32_t table_size = 1u << table_bits;
+  std::vector<uint32_t> slot_to_symbol(table_size);
+  std::vector<uint32_t> starts(num_symbols);
+  uint64_t total = 0;
+  for (size_t s = 0; s < num_symbols; s++) {
+    starts[s] = static_cast<uint32_t>(total);
+    if (total + counts_ptr[s] > table_size) {
+      throw std::invalid_argument("symbol_counts exceed 2^table_bits");
+    }
+    std::fill(slot_to_symbol.begin() + total,
+              slot_to_symbol.begin() + total + counts_ptr[s],
+              static_cast<uint32_t>(s));
+    total += counts_ptr[s];
+  }
+  if (total != table_size) {
+    throw std::invalid_argument("symbol_counts must sum to 2^table_bits");
+  }
+
+  // Word offset of each lane
+  std::vector<size_t> word_offsets(num_lanes + 1, 0);
+  for (size_t lane = 0; lane < num_lanes; lane++) {
+    word_offsets[lane + 1] = word_offsets[lane] + word_counts_ptr[lane];
+  }
+  if (word_offsets[num_lanes] != num_words) {
+    throw std::invalid_argument("word_counts do not match the number of words");
+  }
+
+  std::vector<ssize_t> output_shape = {static_cast<ssize_t>(signal_length)};
+  py::array_t<T> output(output_shape);
+  T *out_ptr = static_cast<T *>(output.request(true).ptr);
+  uint64_t mask = table_size - 1;
+  std::atomic<bool> corrupt(false);
+
+  {
+    py::gil_scoped_release release;
+    ans_mt_for_each_lane(num_lanes, num_threads, [&](size_t lane) {
+      size_t a = ans_mt_lane_start(lane, num_lanes, signal_length);
+      size_t b = ans_mt_lane_start(lane + 1, num_lanes, signal_length);
+      const uint32_t *word = words_ptr + word_offsets[lane];
+      const uint32_t *word_end = words_ptr + word_offsets[lane + 1];
+      uint64_t state = states_ptr[lane];
+      for (size_t i = a; i < b; i++) {
+        uint32_t slot = static_cast<uint32_t>(state & mask);
+        uint32_t s = slot_to_symbol[slot];
+        out_ptr[i] = values_ptr[s];
+        state = counts_ptr[s] * (state >> table_bits) + slot - starts[s];
+        if (state < ANS_MT_L) {
+          if (word == word_end) {
+            corrupt = true;
+            return;
+          }
+          state = (state << 32) | *word++;
+        }
+      }
+    });
+  }
+  if (corrupt) {
+    throw std::invalid_argument("ANS stream is truncated");
+  }
+  return output;
+}
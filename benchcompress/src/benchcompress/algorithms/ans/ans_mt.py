@@ -0,0 +1,181 @@
+import numpy as np
+from .ans_mt_cpp_ext import (
+    ans_mt_encode_uint8,
+    ans_mt_encode_uint16,
+    ans_mt_encode_uint32,
+    ans_mt_encode_int16,
+    ans_mt_encode_int32,
+    ans_mt_decode_uint8,
+    ans_mt_decode_uint16,
+    ans_mt_decode_uint32,
+    ans_mt_decode_int16,
+    ans_mt_decode_int32,
+)
+
+_encoders = {
+    "uint8": ans_mt_encode_uint8,
+    "uint16": ans_mt_encode_uint16,
+    "uint32": ans_mt_encode_uint32,
+    "int16": ans_mt_encode_int16,
+    "int32": ans_mt_encode_int32,
+}
+_decoders = {
+    "uint8": ans_mt_decode_uint8,
+    "uint16": ans_mt_decode_uint16,
+    "uint32": ans_mt_decode_uint32,
+    "int16": ans_mt_decode_int16,
+    "int32": ans_mt_decode_int32,
+}
+
+
+def count_symbols(x: np.ndarray) -> tuple:
+    """Count the occurrences of each distinct value in a signal.
+
+    Args:
+        x: Input signal
+
+    Returns:
+        tuple: (sorted distinct values (same dtype as input), counts (int64))
+    """
+    if len(x) == 0:
+        return np.zeros(1, dtype=x.dtype), np.ones(1, dtype=np.int64)
+    min_value = int(x.min())
+    max_value = int(x.max())
+    if max_value - min_value < (1 << 24):
+        # Dense counting is much faster than sorting for small value ranges
+        counts = np.bincount((x.astype(np.int64) - min_value))
+        values = np.flatnonzero(counts)
+        return (values + min_value).astype(x.dtype), counts[values]
+    values, counts = np.unique(x, return_counts=True)
+    return values, counts.astype(np.int64)
+
+
+def choose_table_bits(num_symbols: int) -> int:
+    """Choose the precision of the frequency table for an alphabet size.
+
+    Args:
+        num_symbols: Number of distinct symbols
+
+    Returns:
+        int: log2 of the frequency table size (between 16 and 24)
+    """
+    table_bits = max(16, int(np.ceil(np.log2(max(num_symbols, 1)))) + 2)
+    if table_bits > 24:
+        if num_symbols > (1 << 24):
+            raise ValueError(f"Too many distinct symbols: {num_symbols}")
+        table_bits = 24
+    return table_bits
+
+
+def quantize_symbol_counts(counts: np.ndarray, table_bits: int) -> np.ndarray:
+    """Scale symbol counts to sum to 2^table_bits, keeping every count positive.
+
+    Args:
+        counts: Symbol counts
+        table_bits: log2 of the frequency table size
+
+    Returns:
+        np.ndarray: Quantized counts (uint32)
+    """
+    total = 1 << table_bits
+    if len(counts) > total:
+        raise ValueError(f"Cannot fit {len(counts)} symbols in a table of {total}")
+    scaled = np.maximum(1, np.floor(counts * (total / counts.sum()))).astype(np.int64)
+    excess = int(scaled.sum()) - total
+    if excess < 0:
+        scaled[np.argmax(scaled)] -= excess
+    elif excess > 0:
+        # Rounding every count up to at least 1 overshot the table size. Take
+        # the excess from the counts in proportion to what they can spare,
+        # then the remainder one at a time from the largest counts.
+        available = scaled - 1
+        scaled -= available * excess // available.sum()
+        remaining = int(scaled.sum()) - total
+        largest = np.argsort(scaled, kind="stable")[::-1][:remaining]
+        scaled[largest] -= 1
+    return scaled.astype(np.uint32)
+
+
+def ans_mt_encode(
+    x: np.ndarray,
+    symbol_values: np.ndarray,
+    symbol_counts: np.ndarray,
+    table_bits: int,
+    num_lanes: int,
+    num_threads: int,
+) -> tuple:
+    """Encode a signal as independent rANS lanes using C++ implementation.
+
+    The signal is split into num_lanes contiguous blocks. Each block is coded
+    with its own ANS state, but all of them share one frequency table, so the
+    lanes can be encoded (and later decoded) in parallel.
+
+    Args:
+        x: Input signal (uint8, uint16, uint32, int16 or int32)
+        symbol_values: Sorted distinct values of the signal (same dtype)
+        symbol_counts: Quantized counts (uint32) summing to 2^table_bits
+        table_bits: log2 of the frequency table size
+        num_lanes: Number of independent lanes
+        num_threads: Number of threads used for encoding
+
+    Returns:
+        tuple: (final lane states (uint64), number of words per lane (uint64),
+            concatenated 32-bit words (uint32))
+
+    Raises:
+        ValueError: If the dtype is not supported
+    """
+    dtype = str(x.dtype)
+    if dtype not in _encoders:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    return _encoders[dtype](
+        x,
+        np.asarray(symbol_values, dtype=dtype),
+        np.asarray(symbol_counts, dtype=np.uint32),
+        table_bits,
+        num_lanes,
+        num_threads,
+    )
+
+
+def ans_mt_decode(
+    states: np.ndarray,
+    word_counts: np.ndarray,
+    words: np.ndarray,
+    symbol_values: np.ndarray,
+    symbol_counts: np.ndarray,
+    table_bits: int,
+    signal_length: int,
+    num_threads: int,
+) -> np.ndarray:
+    """Decode a signal encoded with ans_mt_encode using C++ implementation.
+
+    Args:
+        states: Final lane states (uint64)
+        word_counts: Number of words per lane (uint64)
+        words: Concatenated 32-bit words (uint32)
+        symbol_values: Sorted distinct values (determines the output dtype)
+        symbol_counts: Quantized counts (uint32)
+        table_bits: log2 of the frequency table size
+        signal_length: Length of the decoded signal
+        num_threads: Number of threads used for decoding
+
+    Returns:
+        np.ndarray: Decoded signal (same dtype as symbol_values)
+
+    Raises:
+        ValueError: If the dtype is not supported
+    """
+    dtype = str(symbol_values.dtype)
+    if dtype not in _decoders:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    return _decoders[dtype](
+        np.asarray(states, dtype=np.uint64),
+        np.asarray(word_counts, dtype=np.uint64),
+        np.asarray(words, dtype=np.uint32),
+        symbol_values,
+        np.asarray(symbol_counts, dtype=np.uint32),
+        table_bits,
+        signal_length,
+        num_threads,
+    )
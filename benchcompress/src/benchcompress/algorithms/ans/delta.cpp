@@ -0,0 +1,26 @@
+#include "delta.hpp"
+
+#include <string>
+
+namespace py = pybind11;
+
+template <typename T> void register_delta(py::module &m, const char *suffix) {
+  // noconvert on out: a converted copy would receive the result instead of
+  // the caller's array
+  m.def((std::string("delta_encode_") + suffix).c_str(), &delta_encode_impl<T>,
+        "Compute the first value followed by the differences of consecutive "
+        "values, with wrap-around, into out",
+        py::arg("x"), py::arg("out").noconvert());
+  m.def((std::string("delta_decode_") + suffix).c_str(), &delta_decode_impl<T>,
+        "Compute the cumulative sum of y, with wrap-around, into out",
+        py::arg("y"), py::arg("out").noconvert());
+}
+
+PYBIND11_MODULE(delta_cpp_ext, m) {
+  m.doc() = "C++ implementation of delta encoding and decoding using pybind11";
+  register_delta<uint8_t>(m, "uint8");
+  register_delta<uint16_t>(m, "uint16");
+  register_delta<uint32_t>(m, "uint32");
+  register_delta<int16_t>(m, "int16");
+  register_delta<int32_t>(m, "int32");
+}
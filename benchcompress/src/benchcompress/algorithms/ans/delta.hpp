@@ -0,0 +1,74 @@
+#pragma once
+
+#include <cstdint>
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <stdexcept>
+#include <type_traits>
+
+namespace py = pybind11;
+
+// The kernels index the arrays directly, so they must be contiguous
+template <typename T>
+using delta_array = py::array_t<T, py::array::c_style | py::array::forcecast>;
+
+// The arithmetic is done on the unsigned type of the same width, so that
+// differences and sums wrap around exactly like the stored integers do (signed
+// overflow is undefined behavior in C++)
+
+// out[0] = x[0], out[i] = x[i] - x[i - 1]. out may be the same array as x.
+template <typename T>
+py::array_t<T> delta_encode_impl(delta_array<T> x, delta_array<T> out) {
+  using U = typename std::make_unsigned<T>::type;
+  auto x_buf = x.request();
+  auto out_buf = out.request(true);
+  if (x_buf.ndim != 1 || out_buf.ndim != 1 ||
+      x_buf.shape[0] != out_buf.shape[0]) {
+    throw std::invalid_argument(
+        "x and out must be 1-D arrays of the same length");
+  }
+  const T *x_ptr = static_cast<const T *>(x_buf.ptr);
+  T *out_ptr = static_cast<T *>(out_buf.ptr);
+  size_t N = x_buf.shape[0];
+
+  {
+    py::gil_scoped_release release;
+    // Going backwards reads x[i - 1] before it is overwritten when the
+    // difference is computed in place
+    for (size_t i = N; i-- > 1;) {
+      out_ptr[i] = static_cast<T>(static_cast<U>(x_ptr[i]) -
+                                  static_cast<U>(x_ptr[i - 1]));
+    }
+    if (N > 0) {
+      out_ptr[0] = x_ptr[0];
+    }
+  }
+  return out;
+}
+
+// Inverse of delta_encode_impl: out[i] = y[0] + ... + y[i]. out may be the
+// same array as y.
+template <typename T>
+py::array_t<T> delta_decode_impl(delta_array<T> y, delta_array<T> out) {
+  using U = typename std::make_unsigned<T>::type;
+  auto y_buf = y.request();
+  auto out_buf = out.request(true);
+  if (y_buf.ndim != 1 || out_buf.ndim != 1 ||
+      y_buf.shape[0] != out_buf.shape[0]) {
+    throw std::invalid_argument(
+        "y and out must be 1-D arrays of the same length");
+  }
+  const T *y_ptr = static_cast<const T *>(y_buf.ptr);
+  T *out_ptr = static_cast<T *>(out_buf.ptr);
+  size_t N = y_buf.shape[0];
+
+  {
+    py::gil_scoped_release release;
+    U sum = 0;
+    for (size_t i = 0; i < N; i++) {
+      sum += static_cast<U>(y_ptr[i]);
+      out_ptr[i] = static_cast<T>(sum);
+    }
+  }
+  return out;
+}
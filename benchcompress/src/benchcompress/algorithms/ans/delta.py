@@ -0,0 +1,79 @@
+import numpy as np
+from typing import Optional
+from .delta_cpp_ext import (
+    delta_encode_uint8,
+    delta_encode_uint16,
+    delta_encode_uint32,
+    delta_encode_int16,
+    delta_encode_int32,
+    delta_decode_uint8,
+    delta_decode_uint16,
+    delta_decode_uint32,
+    delta_decode_int16,
+    delta_decode_int32,
+)
+
+_encoders = {
+    "uint8": delta_encode_uint8,
+    "uint16": delta_encode_uint16,
+    "uint32": delta_encode_uint32,
+    "int16": delta_encode_int16,
+    "int32": delta_encode_int32,
+}
+_decoders = {
+    "uint8": delta_decode_uint8,
+    "uint16": delta_decode_uint16,
+    "uint32": delta_decode_uint32,
+    "int16": delta_decode_int16,
+    "int32": delta_decode_int32,
+}
+
+
+def delta_encode(x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Delta encode a signal using C++ implementation.
+
+    The output holds the first value followed by the differences of
+    consecutive values, computed with wrap-around in the dtype of the signal.
+
+    Args:
+        x: Input signal (uint8, uint16, uint32, int16 or int32)
+        out: Optional preallocated output (same dtype and length as x, may be x
+            itself to encode in place)
+
+    Returns:
+        np.ndarray: Delta encoded signal (same dtype as input)
+
+    Raises:
+        ValueError: If the dtype is not supported
+    """
+    dtype = str(x.dtype)
+    if dtype not in _encoders:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    if out is None:
+        out = np.empty_like(x)
+    return _encoders[dtype](x, out)
+
+
+def delta_decode(y: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Invert delta_encode (cumulative sum with wrap-around) using C++ implementation.
+
+    Unlike np.cumsum, the sum is accumulated in the dtype of the input, so the
+    output keeps that dtype and no wider intermediate array is allocated.
+
+    Args:
+        y: Delta encoded signal (uint8, uint16, uint32, int16 or int32)
+        out: Optional preallocated output (same dtype and length as y, may be y
+            itself to decode in place)
+
+    Returns:
+        np.ndarray: Decoded signal (same dtype as input)
+
+    Raises:
+        ValueError: If the dtype is not supported
+    """
+    dtype = str(y.dtype)
+    if dtype not in _decoders:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    if out is None:
+        out = np.empty_like(y)
+    return _decoders[dtype](y, out)
@@ -0,0 +1,117 @@
+import struct
+from typing import Tuple
+import numpy as np
+from .markov_predict import markov_predict
+from .markov_reconstruct import markov_reconstruct
+
+# M, block_size, num_blocks
+BLOCK_MODEL_HEADER_FORMAT = "<IQI"
+BLOCK_MODEL_HEADER_SIZE = struct.calcsize(BLOCK_MODEL_HEADER_FORMAT)
+
+
+def _block_bounds(num_samples: int, M: int, block_size: int, num_blocks: int) -> list:
+    # Blocks partition the predicted samples [M - 1, num_samples); the last
+    # block also holds the remaining samples
+    K = M - 1
+    bounds = []
+    for b in range(num_blocks):
+        start = K + b * block_size
+        end = num_samples if b == num_blocks - 1 else start + block_size
+        bounds.append((start, end))
+    return bounds
+
+
+def markov_block_predict(
+    x: np.ndarray, M: int, block_size: int, num_training_samples: int = 10000
+) -> Tuple[bytes, np.ndarray]:
+    """Markov prediction with coefficients refitted for every block of samples.
+
+    The first M - 1 samples are stored as they are. The remaining samples are
+    split into blocks of block_size samples, and a separate set of
+    coefficients is fitted for each block. The prediction of the first
+    samples of a block uses the last samples of the previous block, so the
+    residuals are as long as for a single global model.
+
+    Args:
+        x: Input signal (int16 or int32)
+        M: Number of previous samples used for prediction, plus one
+        block_size: Number of samples per block
+        num_training_samples: Maximum number of samples used to fit each block
+
+    Returns:
+        tuple: (serialized model with the coefficients of every block and the
+            initial values, residuals (same dtype as input))
+    """
+    K = M - 1
+    if len(x) < M:
+        raise ValueError(f"Signal of length {len(x)} is too short for M={M}")
+    num_blocks = max(1, (len(x) - K) // block_size)
+
+    coeffs = np.empty((num_blocks, M), dtype=np.float32)
+    resid = np.empty(len(x) - K, dtype=x.dtype)
+    for b, (start, end) in enumerate(_block_bounds(len(x), M, block_size, num_blocks)):
+        block_coeffs, _, block_resid = markov_predict(
+            x[start - K : end], M=M, num_training_samples=num_training_samples
+        )
+        coeffs[b] = block_coeffs
+        resid[start - K : end - K] = block_resid
+
+    model = (
+        struct.pack(BLOCK_MODEL_HEADER_FORMAT, M, block_size, num_blocks)
+        + coeffs.tobytes()
+        + x[:K].tobytes()
+    )
+    return model, resid
+
+
+def markov_block_model_size(x: bytes, dtype: str) -> int:
+    """Number of bytes used by a model written by markov_block_predict.
+
+    Args:
+        x: Bytes starting with the serialized model
+        dtype: Data type of the signal
+
+    Returns:
+        int: Size of the model in bytes
+    """
+    M, _, num_blocks = struct.unpack(
+        BLOCK_MODEL_HEADER_FORMAT, x[:BLOCK_MODEL_HEADER_SIZE]
+    )
+    return (
+        BLOCK_MODEL_HEADER_SIZE
+        + 4 * num_blocks * M
+        + np.dtype(dtype).itemsize * (M - 1)
+    )
+
+
+def markov_block_reconstruct(model: bytes, resid: np.ndarray) -> np.ndarray:
+    """Reconstruct a signal from the output of markov_block_predict.
+
+    Args:
+        model: Serialized model returned by markov_block_predict
+        resid: Residuals (int16 or int32)
+
+    Returns:
+        np.ndarray: Reconstructed signal (same dtype as resid)
+    """
+    M, block_size, num_blocks = struct.unpack(
+        BLOCK_MODEL_HEADER_FORMAT, model[:BLOCK_MODEL_HEADER_SIZE]
+    )
+    K = M - 1
+    pos = BLOCK_MODEL_HEADER_SIZE
+    coeffs = np.frombuffer(model, dtype=np.float32, count=num_blocks * M, offset=pos)
+    coeffs = coeffs.reshape(num_blocks, M)
+    pos += 4 * num_blocks * M
+    initial = np.frombuffer(model, dtype=resid.dtype, count=K, offset=pos)
+
+    output = np.empty(len(resid) + K, dtype=resid.dtype)
+    output[:K] = initial
+    for b, (start, end) in enumerate(
+        _block_bounds(len(output), M, block_size, num_blocks)
+    ):
+        # Each block continues from the last M - 1 reconstructed samples
+        block = markov_reconstruct(
+            coeffs[b], output[start - K : start], resid[start - K : end - K]
+        )
+        output[start:end] = block[K:]
+    return output
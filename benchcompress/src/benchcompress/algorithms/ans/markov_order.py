@@ -0,0 +1,58 @@
+from typing import Sequence
+import numpy as np
+from .markov_predict import markov_predict
+
+DEFAULT_CANDIDATE_ORDERS = (2, 3, 4, 5, 6, 7, 8, 9)
+
+# Budget of the order selection, in window samples summed over the evaluated
+# candidates (all the default candidates on a full window, a few milliseconds)
+DEFAULT_MAX_EVALUATED_SAMPLES = len(DEFAULT_CANDIDATE_ORDERS) * 65536
+
+
+def select_markov_order(
+    x: np.ndarray,
+    candidate_orders: Sequence[int] = DEFAULT_CANDIDATE_ORDERS,
+    window_length: int = 65536,
+    max_evaluated_samples: int = DEFAULT_MAX_EVALUATED_SAMPLES,
+) -> int:
+    """Choose the Markov model order giving the smallest residual entropy.
+
+    Each candidate order is fitted on a contiguous window from the middle of
+    the signal, and the entropy per sample of its residuals is computed.
+    Candidates are evaluated in the given order while the window samples
+    evaluated so far stay within max_evaluated_samples; the first one is
+    always evaluated. The budget is counted in samples rather than time, so
+    that the same signal always gets the same order. Ties go to the earlier
+    candidate.
+
+    Args:
+        x: Input signal (int16 or int32)
+        candidate_orders: Values of M to evaluate
+        window_length: Number of samples used for the evaluation
+        max_evaluated_samples: Maximum number of window samples evaluated,
+            summed over the candidates
+
+    Returns:
+        int: Selected value of M
+
+    Raises:
+        ValueError: If the signal is shorter than every candidate order
+    """
+    from ..._analysis import compute_entropy_per_sample
+
+    start = max(0, (len(x) - window_length) // 2)
+    window = x[start : start + window_length]
+    candidates = [M for M in candidate_orders if M <= len(window)]
+    if not candidates:
+        raise ValueError(f"Signal of length {len(x)} is too short for every order")
+
+    num_candidates = max(1, max_evaluated_samples // len(window))
+    best_order, best_entropy = None, np.inf
+    for M in candidates[:num_candidates]:
+        _, _, resid = markov_predict(window, M=M, num_threads=1)
+        # Skip the samples the larger orders cannot predict, so every
+        # candidate is scored on the same samples
+        entropy = compute_entropy_per_sample(resid[max(candidates) - M :])
+        if entropy < best_entropy:
+            best_order, best_entropy = M, entropy
+    return best_order
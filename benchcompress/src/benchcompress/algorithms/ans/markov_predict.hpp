@@ -1,17 +1,73 @@
 #pragma once
 
 #include <Eigen/Dense>
+#include <algorithm>
 #include <cmath>
 #include <iostream>
 #include <pybind11/eigen.h>
 #include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
+#include <thread>
+#include <vector>
 
 namespace py = pybind11;
 
+// Number of samples processed together by markov_residuals_range
+static const size_t MARKOV_BLOCK_SIZE = 256;
+
+// Minimum number of samples per thread, below which extra threads do not pay
+// off
+static const size_t MARKOV_MIN_SAMPLES_PER_THREAD = 1 << 16;
+
+// Compute resid[i] = x[i + K] - round(prediction(x[i], ..., x[i + K - 1]))
+// for i in [begin, end), where K = M - 1.
+//
+// The loops are interchanged compared to a per-sample dot product: for a
+// block of samples, each tap is applied to the whole block before the next
+// tap. The inner loop then runs over independent samples and vectorizes,
+// while every prediction is still accumulated as
+// ((0 + c[0] x[i]) + c[1] x[i + 1]) + ... + bias, in the same order as in
+// markov_reconstruct_impl. As long as the compiler does not contract the
+// multiply-adds (-ffp-contract=off), the residuals are bit-identical to the
+// sequential computation.
+template <typename T>
+void markov_residuals_range(const T *x_ptr, const float *coeffs_ptr, size_t K,
+                            T *resid_ptr, size_t begin, size_t end) {
+  const size_t B = MARKOV_BLOCK_SIZE;
+  std::vector<float> x_block(B + K);
+  std::vector<float> prediction(B);
+  const float bias = coeffs_ptr[K];
+
+  for (size_t i0 = begin; i0 < end; i0 += B) {
+    size_t n = std::min(B, end - i0);
+    // Convert the samples used by this block to float once
+    for (size_t k = 0; k < n + K - 1; k++) {
+      x_block[k] = static_cast<float>(x_ptr[i0 + k]);
+    }
+    float *pred = prediction.data();
+    const float *xb = x_block.data();
+    for (size_t k = 0; k < n; k++) {
+      pred[k] = 0.0f;
+    }
+    for (size_t j = 0; j < K; j++) {
+      const float c = coeffs_ptr[j];
+      const float *xj = xb + j;
+      for (size_t k = 0; k < n; k++) {
+        pred[k] += c * xj[k];
+      }
+    }
+    for (size_t k = 0; k < n; k++) {
+      float rounded_prediction = std::round(pred[k] + bias);
+      resid_ptr[i0 + k] =
+          x_ptr[i0 + k + K] - static_cast<T>(rounded_prediction);
+    }
+  }
+}
+
 template <typename T>
 std::tuple<py::array_t<float>, py::array_t<T>, py::array_t<T>>
-markov_predict_impl(py::array_t<T> x, size_t M, size_t num_training_samples) {
+markov_predict_impl(py::array_t<T> x, size_t M, size_t num_training_samples,
+                    size_t num_threads) {
   // Get array buffer
   auto x_buf = x.request();
   T *x_ptr = static_cast<T *>(x_buf.ptr);
@@ -74,15 +130,26 @@ markov_predict_impl(py::array_t<T> x, size_t M, size_t num_training_samples) {
   py::buffer_info resid_buf = residuals.request(true);
   T *resid_ptr = static_cast<T *>(resid_buf.ptr);
 
-  for (size_t i = 0; i < resid_size; i++) {
-    float prediction = 0.0f;
-    for (size_t j = 0; j < M - 1; j++) {
-      float term = coeffs_ptr[j] * static_cast<float>(x_ptr[i + j]);
-      prediction += term;
+  // Split the samples into one contiguous range per thread
+  num_threads = std::max<size_t>(
+      1, std::min(num_threads, resid_size / MARKOV_MIN_SAMPLES_PER_THREAD));
+  {
+    py::gil_scoped_release release;
+    if (num_threads == 1) {
+      markov_residuals_range(x_ptr, coeffs_ptr, M - 1, resid_ptr, 0,
+                             resid_size);
+    } else {
+      std::vector<std::thread> threads;
+      for (size_t t = 0; t < num_threads; t++) {
+        size_t begin = t * resid_size / num_threads;
+        size_t end = (t + 1) * resid_size / num_threads;
+        threads.emplace_back(markov_residuals_range<T>, x_ptr, coeffs_ptr,
+                             M - 1, resid_ptr, begin, end);
+      }
+      for (auto &thread : threads) {
+        thread.join();
+      }
     }
-    prediction += coeffs_ptr[M - 1]; // bias term
-    float rounded_prediction = std::round(prediction);
-    resid_ptr[i] = x_ptr[i + M - 1] - static_cast<T>(rounded_prediction);
   }
 
   return std::make_tuple(coeffs_array, initial, residuals);
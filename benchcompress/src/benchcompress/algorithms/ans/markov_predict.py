@@ -2,7 +2,12 @@ import numpy as np
 from .markov_predict_cpp_ext import markov_predict_int16, markov_predict_int32
 
 
-def markov_predict(x: np.ndarray, M: int, num_training_samples: int = 10000) -> tuple:
+def markov_predict(
+    x: np.ndarray,
+    M: int,
+    num_training_samples: int = 10000,
+    num_threads: int = 1,
+) -> tuple:
     """Predict signal using Markov model and return coefficients, initial values and residuals using C++ implementation.
 
     Args:
@@ -10,6 +15,8 @@ def markov_predict(x: np.ndarray, M: int, num_training_samples: int = 10000) ->
         M: Number of previous samples to use for prediction
         num_training_samples: Maximum number of samples to use for fitting the model coefficients (default: 10000).
                             Using fewer samples speeds up model fitting on large inputs while maintaining accuracy.
+        num_threads: Number of threads used to compute the residuals (default: 1). Only algorithms
+                     declaring "threads" should pass more. The residuals do not depend on the number of threads.
 
     Returns:
         tuple: (coefficients (float32), initial_values (same dtype as input), residuals (same dtype as input))
@@ -19,8 +26,8 @@ def markov_predict(x: np.ndarray, M: int, num_training_samples: int = 10000) ->
     """
     # Check input dtype and call appropriate implementation
     if x.dtype == np.int16:
-        return markov_predict_int16(x, M, num_training_samples)
+        return markov_predict_int16(x, M, num_training_samples, num_threads)
     elif x.dtype == np.int32:
-        return markov_predict_int32(x, M, num_training_samples)
+        return markov_predict_int32(x, M, num_training_samples, num_threads)
     else:
         raise ValueError(f"Input array must be int16 or int32, got {x.dtype}")
@@ -7,6 +7,38 @@
 
 namespace py = pybind11;
 
+// Reconstruction loop for a fixed number of taps K = M - 1. The last K
+// samples are kept as floats in a small window, which the compiler keeps in
+// registers once the loops over K are unrolled. The arithmetic is the same,
+// in the same order, as in the generic loop below.
+template <typename T, size_t K>
+void markov_reconstruct_fixed(const float *coeffs_ptr, float bias,
+                              const T *resid_ptr, T *output_ptr,
+                              size_t resid_size) {
+  float c[K];
+  float window[K];
+  for (size_t j = 0; j < K; j++) {
+    c[j] = coeffs_ptr[j];
+    window[j] = static_cast<float>(output_ptr[j]);
+  }
+
+  for (size_t i = 0; i < resid_size; i++) {
+    float prediction = 0.0f;
+    for (size_t j = 0; j < K; j++) {
+      prediction += c[j] * window[j];
+    }
+    prediction += bias;
+    float rounded_prediction = std::round(prediction);
+    T final_value =
+        static_cast<T>(rounded_prediction + static_cast<float>(resid_ptr[i]));
+    output_ptr[i + K] = final_value;
+    for (size_t j = 0; j + 1 < K; j++) {
+      window[j] = window[j + 1];
+    }
+    window[K - 1] = static_cast<float>(final_value);
+  }
+}
+
 template <typename T>
 py::array_t<T> markov_reconstruct_impl(py::array_t<float> coeffs,
                                        py::array_t<T> initial,
@@ -38,26 +70,63 @@ py::array_t<T> markov_reconstruct_impl(py::array_t<float> coeffs,
 
   size_t resid_size = resid_buf.shape[0];
 
+  // Bias term is the last coefficient
+  const float bias = coeffs_ptr[coeffs_buf.shape[0] - 1];
+
   // Reconstruct signal iteratively
-  for (size_t i = 0; i < resid_size; i++) {
-    float prediction = 0.0f;
+  {
+    py::gil_scoped_release release;
+    switch (M - 1) {
+    case 2:
+      markov_reconstruct_fixed<T, 2>(coeffs_ptr, bias, resid_ptr, output_ptr,
+                                     resid_size);
+      break;
+    case 3:
+      markov_reconstruct_fixed<T, 3>(coeffs_ptr, bias, resid_ptr, output_ptr,
+                                     resid_size);
+      break;
+    case 4:
+      markov_reconstruct_fixed<T, 4>(coeffs_ptr, bias, resid_ptr, output_ptr,
+                                     resid_size);
+      break;
+    case 5:
+      markov_reconstruct_fixed<T, 5>(coeffs_ptr, bias, resid_ptr, output_ptr,
+                                     resid_size);
+      break;
+    case 6:
+      markov_reconstruct_fixed<T, 6>(coeffs_ptr, bias, resid_ptr, output_ptr,
+                                     resid_size);
+      break;
+    case 7:
+      markov_reconstruct_fixed<T, 7>(coeffs_ptr, bias, resid_ptr, output_ptr,
+                                     resid_size);
+      break;
+    case 8:
+      markov_reconstruct_fixed<T, 8>(coeffs_ptr, bias, resid_ptr, output_ptr,
+                                     resid_size);
+      break;
+    default:
+      for (size_t i = 0; i < resid_size; i++) {
+        float prediction = 0.0f;
 
-    // Calculate prediction using coefficients (excluding bias term)
-    for (size_t j = 0; j < M - 1; j++) {
-      float term = coeffs_ptr[j] * static_cast<float>(output_ptr[i + j]);
-      prediction += term;
-    }
+        // Calculate prediction using coefficients (excluding bias term)
+        for (size_t j = 0; j < M - 1; j++) {
+          float term = coeffs_ptr[j] * static_cast<float>(output_ptr[i + j]);
+          prediction += term;
+        }
 
-    // Add bias term separately
-    prediction += coeffs_ptr[coeffs_buf.shape[0] - 1];
+        // Add bias term separately
+        prediction += bias;
 
-    // Round prediction to nearest integer
-    float rounded_prediction = std::round(prediction);
+        // Round prediction to nearest integer
+        float rounded_prediction = std::round(prediction);
 
-    // Add residual and store result
-    T final_value =
-        static_cast<T>(rounded_prediction + static_cast<float>(resid_ptr[i]));
-    output_ptr[i + M - 1] = final_value;
+        // Add residual and store result
+        T final_value = static_cast<T>(rounded_prediction +
+                                       static_cast<float>(resid_ptr[i]));
+        output_ptr[i + M - 1] = final_value;
+      }
+    }
   }
 
   return output;
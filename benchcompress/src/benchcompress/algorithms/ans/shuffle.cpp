@@ -0,0 +1,26 @@
+#include "shuffle.hpp"
+
+namespace py = pybind11;
+
+PYBIND11_MODULE(shuffle_cpp_ext, m) {
+  m.doc() = "C++ implementation of byte and bit shuffle filters using pybind11";
+  m.def(
+      "byte_shuffle",
+      [](shuffle_array x, size_t itemsize) {
+        return byte_shuffle_impl(x, itemsize, false);
+      },
+      "Group the bytes of the samples by significance", py::arg("x"),
+      py::arg("itemsize"));
+  m.def(
+      "byte_unshuffle",
+      [](shuffle_array y, size_t itemsize) {
+        return byte_shuffle_impl(y, itemsize, true);
+      },
+      "Invert byte_shuffle", py::arg("y"), py::arg("itemsize"));
+  m.def("bit_shuffle", &bit_shuffle_impl,
+        "Group the bits of the samples by significance, block by block",
+        py::arg("x"), py::arg("itemsize"), py::arg("block_length"));
+  m.def("bit_unshuffle", &bit_unshuffle_impl, "Invert bit_shuffle",
+        py::arg("y"), py::arg("itemsize"), py::arg("num_samples"),
+        py::arg("block_length"));
+}
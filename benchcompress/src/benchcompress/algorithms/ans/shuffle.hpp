@@ -0,0 +1,198 @@
+#pragma once
+
+#include <algorithm>
+#include <cstdint>
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <stdexcept>
+
+namespace py = pybind11;
+
+using shuffle_array =
+    py::array_t<uint8_t, py::array::c_style | py::array::forcecast>;
+
+// Byte shuffle: out[j * N + i] = in[i * itemsize + j] for N samples
+template <size_t S>
+void byte_shuffle_fixed(const uint8_t *in, uint8_t *out, size_t N) {
+  for (size_t i = 0; i < N; i++) {
+    for (size_t j = 0; j < S; j++) {
+      out[j * N + i] = in[i * S + j];
+    }
+  }
+}
+
+template <size_t S>
+void byte_unshuffle_fixed(const uint8_t *in, uint8_t *out, size_t N) {
+  for (size_t i = 0; i < N; i++) {
+    for (size_t j = 0; j < S; j++) {
+      out[i * S + j] = in[j * N + i];
+    }
+  }
+}
+
+inline void byte_shuffle_generic(const uint8_t *in, uint8_t *out, size_t N,
+                                 size_t itemsize, bool inverse) {
+  switch (itemsize) {
+  case 2:
+    return inverse ? byte_unshuffle_fixed<2>(in, out, N)
+                   : byte_shuffle_fixed<2>(in, out, N);
+  case 4:
+    return inverse ? byte_unshuffle_fixed<4>(in, out, N)
+                   : byte_shuffle_fixed<4>(in, out, N);
+  case 8:
+    return inverse ? byte_unshuffle_fixed<8>(in, out, N)
+                   : byte_shuffle_fixed<8>(in, out, N);
+  default:
+    for (size_t i = 0; i < N; i++) {
+      for (size_t j = 0; j < itemsize; j++) {
+        if (inverse) {
+          out[i * itemsize + j] = in[j * N + i];
+        } else {
+          out[j * N + i] = in[i * itemsize + j];
+        }
+      }
+    }
+  }
+}
+
+// Transpose an 8x8 bit matrix stored in a 64-bit word, where bit c of byte r
+// moves to bit r of byte c
+inline uint64_t transpose_8x8_bits(uint64_t x) {
+  uint64_t t;
+  t = (x ^ (x >> 7)) & 0x00AA00AA00AA00AAull;
+  x = x ^ t ^ (t << 7);
+  t = (x ^ (x >> 14)) & 0x0000CCCC0000CCCCull;
+  x = x ^ t ^ (t << 14);
+  t = (x ^ (x >> 28)) & 0x00000000F0F0F0F0ull;
+  x = x ^ t ^ (t << 28);
+  return x;
+}
+
+// Bit shuffle of one block of N samples. Plane p = 8 * j + k holds bit k of
+// byte j of every sample, packed 8 samples per byte (least significant bit
+// first); the planes are row_bytes = ceil(N / 8) bytes long and zero padded.
+// Words are assembled byte by byte, so the layout does not depend on the
+// endianness of the machine.
+inline void bit_shuffle_block(const uint8_t *in, uint8_t *out, size_t N,
+                              size_t itemsize) {
+  size_t row_bytes = (N + 7) / 8;
+  for (size_t j = 0; j < itemsize; j++) {
+    for (size_t g = 0; g < row_bytes; g++) {
+      size_t count = std::min<size_t>(8, N - 8 * g);
+      uint64_t word = 0;
+      for (size_t s = 0; s < count; s++) {
+        word |= static_cast<uint64_t>(in[(8 * g + s) * itemsize + j])
+                << (8 * s);
+      }
+      word = transpose_8x8_bits(word);
+      for (size_t k = 0; k < 8; k++) {
+        out[(8 * j + k) * row_bytes + g] =
+            static_cast<uint8_t>(word >> (8 * k));
+      }
+    }
+  }
+}
+
+inline void bit_unshuffle_block(const uint8_t *in, uint8_t *out, size_t N,
+                                size_t itemsize) {
+  size_t row_bytes = (N + 7) / 8;
+  for (size_t j = 0; j < itemsize; j++) {
+    for (size_t g = 0; g < row_bytes; g++) {
+      size_t count = std::min<size_t>(8, N - 8 * g);
+      uint64_t word = 0;
+      for (size_t k = 0; k < 8; k++) {
+        word |= static_cast<uint64_t>(in[(8 * j + k) * row_bytes + g])
+                << (8 * k);
+      }
+      word = transpose_8x8_bits(word);
+      for (size_t s = 0; s < count; s++) {
+        out[(8 * g + s) * itemsize + j] = static_cast<uint8_t>(word >> (8 * s));
+      }
+    }
+  }
+}
+
+// Size in bytes of the bit shuffled representation of num_samples samples
+inline size_t bit_shuffle_size(size_t num_samples, size_t itemsize,
+                               size_t block_length) {
+  size_t full_blocks = num_samples / block_length;
+  size_t remainder = num_samples % block_length;
+  return 8 * itemsize *
+         (full_blocks * ((block_length + 7) / 8) + (remainder + 7) / 8);
+}
+
+inline void check_shuffle_args(size_t itemsize, size_t block_length) {
+  if (itemsize == 0) {
+    throw std::invalid_argument("itemsize must be positive");
+  }
+  if (block_length == 0 || block_length % 8 != 0) {
+    throw std::invalid_argument(
+        "block_length must be a positive multiple of 8");
+  }
+}
+
+inline py::array_t<uint8_t> byte_shuffle_impl(shuffle_array x, size_t itemsize,
+                                              bool inverse) {
+  if (itemsize == 0) {
+    throw std::invalid_argument("itemsize must be positive");
+  }
+  auto x_buf = x.request();
+  size_t num_bytes = x_buf.size;
+  if (num_bytes % itemsize != 0) {
+    throw std::invalid_argument("Size is not a multiple of itemsize");
+  }
+  py::array_t<uint8_t> output(static_cast<ssize_t>(num_bytes));
+  const uint8_t *in = static_cast<const uint8_t *>(x_buf.ptr);
+  uint8_t *out = static_cast<uint8_t *>(output.request(true).ptr);
+  {
+    py::gil_scoped_release release;
+    byte_shuffle_generic(in, out, num_bytes / itemsize, itemsize, inverse);
+  }
+  return output;
+}
+
+inline py::array_t<uint8_t> bit_shuffle_impl(shuffle_array x, size_t itemsize,
+                                             size_t block_length) {
+  check_shuffle_args(itemsize, block_length);
+  auto x_buf = x.request();
+  if (static_cast<size_t>(x_buf.size) % itemsize != 0) {
+    throw std::invalid_argument("Size is not a multiple of itemsize");
+  }
+  size_t num_samples = x_buf.size / itemsize;
+  size_t output_size = bit_shuffle_size(num_samples, itemsize, block_length);
+  py::array_t<uint8_t> output(static_cast<ssize_t>(output_size));
+  const uint8_t *in = static_cast<const uint8_t *>(x_buf.ptr);
+  uint8_t *out = static_cast<uint8_t *>(output.request(true).ptr);
+  {
+    py::gil_scoped_release release;
+    for (size_t start = 0; start < num_samples; start += block_length) {
+      size_t N = std::min(block_length, num_samples - start);
+      bit_shuffle_block(in + start * itemsize, out, N, itemsize);
+      out += 8 * itemsize * ((N + 7) / 8);
+    }
+  }
+  return output;
+}
+
+inline py::array_t<uint8_t> bit_unshuffle_impl(shuffle_array y, size_t itemsize,
+                                               size_t num_samples,
+                                               size_t block_length) {
+  check_shuffle_args(itemsize, block_length);
+  auto y_buf = y.request();
+  if (static_cast<size_t>(y_buf.size) !=
+      bit_shuffle_size(num_samples, itemsize, block_length)) {
+    throw std::invalid_argument("Size does not match the number of samples");
+  }
+  py::array_t<uint8_t> output(static_cast<ssize_t>(num_samples * itemsize));
+  const uint8_t *in = static_cast<const uint8_t *>(y_buf.ptr);
+  uint8_t *out = static_cast<uint8_t *>(output.request(true).ptr);
+  {
+    py::gil_scoped_release release;
+    for (size_t start = 0; start < num_samples; start += block_length) {
+      size_t N = std::min(block_length, num_samples - start);
+      bit_unshuffle_block(in, out + start * itemsize, N, itemsize);
+      in += 8 * itemsize * ((N + 7) / 8);
+    }
+  }
+  return output;
+}
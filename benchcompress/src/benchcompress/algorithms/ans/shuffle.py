@@ -0,0 +1,94 @@
+import numpy as np
+from . import shuffle_cpp_ext
+
+# Number of samples transposed together by the bit shuffle
+BITSHUFFLE_BLOCK_LENGTH = 1 << 16
+
+
+def _as_bytes(x: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(x).reshape(-1).view(np.uint8)
+
+
+def byte_shuffle(x: np.ndarray) -> np.ndarray:
+    """Group the bytes of the samples by significance using C++ implementation.
+
+    The output holds byte 0 of every sample, then byte 1 of every sample,
+    and so on.
+
+    Args:
+        x: Input array of any fixed-size dtype
+
+    Returns:
+        np.ndarray: Shuffled bytes (uint8, 1-D)
+    """
+    return shuffle_cpp_ext.byte_shuffle(_as_bytes(x), x.dtype.itemsize)
+
+
+def byte_unshuffle(y: np.ndarray, dtype: str, shape: tuple) -> np.ndarray:
+    """Invert byte_shuffle using C++ implementation.
+
+    Args:
+        y: Shuffled bytes (uint8)
+        dtype: Data type of the original array
+        shape: Shape of the original array
+
+    Returns:
+        np.ndarray: Original array
+    """
+    output = shuffle_cpp_ext.byte_unshuffle(_as_bytes(y), np.dtype(dtype).itemsize)
+    return output.view(dtype).reshape(shape)
+
+
+def bit_shuffle(x: np.ndarray) -> np.ndarray:
+    """Group the bits of the samples by significance using C++ implementation.
+
+    The samples are processed in blocks of BITSHUFFLE_BLOCK_LENGTH. Within a
+    block, the output holds bit 0 of every sample packed into bytes, then
+    bit 1 of every sample, and so on (bits are numbered from the least
+    significant bit of the first byte in memory).
+
+    Args:
+        x: Input array of any fixed-size dtype
+
+    Returns:
+        np.ndarray: Shuffled bits (uint8, 1-D)
+    """
+    return shuffle_cpp_ext.bit_shuffle(
+        _as_bytes(x), x.dtype.itemsize, BITSHUFFLE_BLOCK_LENGTH
+    )
+
+
+def bit_unshuffle(y: np.ndarray, dtype: str, shape: tuple) -> np.ndarray:
+    """Invert bit_shuffle using C++ implementation.
+
+    Args:
+        y: Shuffled bits (uint8)
+        dtype: Data type of the original array
+        shape: Shape of the original array
+
+    Returns:
+        np.ndarray: Original array
+    """
+    output = shuffle_cpp_ext.bit_unshuffle(
+        _as_bytes(y),
+        np.dtype(dtype).itemsize,
+        int(np.prod(shape)),
+        BITSHUFFLE_BLOCK_LENGTH,
+    )
+    return output.view(dtype).reshape(shape)
+
+
+def bit_shuffle_size(dtype: str, shape: tuple) -> int:
+    """Number of bytes produced by bit_shuffle for an array.
+
+    Args:
+        dtype: Data type of the array
+        shape: Shape of the array
+
+    Returns:
+        int: Size of the shuffled bits in bytes
+    """
+    itemsize = np.dtype(dtype).itemsize
+    num_blocks, remainder = divmod(int(np.prod(shape)), BITSHUFFLE_BLOCK_LENGTH)
+    row_bytes = num_blocks * (BITSHUFFLE_BLOCK_LENGTH // 8) + (remainder + 7) // 8
+    return 8 * itemsize * row_bytes
@@ -0,0 +1,294 @@
+import numpy as np
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+from ..zlib import zlib_encode, zlib_decode
+from ..zstd import zstd_encode, zstd_decode
+from ..lz4 import lz4_encode, lz4_decode
+from ..brotli import brotli_encode, brotli_decode
+from ..bzip2 import bzip2_encode, bzip2_decode
+from ..lzma import lzma_encode, lzma_decode
+
+
+SOURCE_FILE = "blocked/__init__.py"
+
+
+def _load_long_description():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    md_path = os.path.join(current_dir, "blocked.md")
+    with open(md_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+LONG_DESCRIPTION = _load_long_description()
+
+HEADER_FORMAT = "QQQ"  # num_chunks, chunk_length, num_rows
+
+# Thread pools are reused across calls so that thread startup is not timed.
+# They are keyed by process id because a forked child does not inherit the
+# parent's threads.
+_thread_pools: Dict[Tuple[int, int], ThreadPoolExecutor] = {}
+
+
+def _get_thread_pool(num_threads: int) -> ThreadPoolExecutor:
+    key = (os.getpid(), num_threads)
+    if key not in _thread_pools:
+        _thread_pools[key] = ThreadPoolExecutor(max_workers=num_threads)
+    return _thread_pools[key]
+
+
+def _map_chunks(fn: Callable, items: list, num_threads: int) -> list:
+    if num_threads == 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    return list(_get_thread_pool(num_threads).map(fn, items))
+
+
+def _num_chunks(num_rows: int, chunk_length: int) -> int:
+    # The remainder is merged into the last chunk rather than stored as a
+    # short chunk of its own, since some algorithms (e.g. the Markov
+    # predictors) cannot encode very short arrays
+    if num_rows == 0:
+        return 0
+    return max(1, num_rows // chunk_length)
+
+
+def _chunk_start(i: int, chunk_length: int) -> int:
+    return i * chunk_length
+
+
+def _chunk_stop(i: int, chunk_length: int, num_chunks: int, num_rows: int) -> int:
+    return num_rows if i == num_chunks - 1 else (i + 1) * chunk_length
+
+
+def blocked_encode(
+    x: np.ndarray,
+    encode_chunk: Callable[[np.ndarray], bytes],
+    *,
+    chunk_length: int,
+    num_threads: int,
+) -> bytes:
+    """Compress an array as independent chunks along its first axis.
+
+    Args:
+        x: Input array
+        encode_chunk: Function compressing one chunk (an array of rows) to
+            bytes
+        chunk_length: Number of rows (elements, for 1D arrays) per chunk
+        num_threads: Number of threads used to compress chunks
+
+    Returns:
+        Header, frame index and compressed chunks
+    """
+    num_rows = x.shape[0]
+    num_chunks = _num_chunks(num_rows, chunk_length)
+    chunks = [
+        x[
+            _chunk_start(i, chunk_length) : _chunk_stop(
+                i, chunk_length, num_chunks, num_rows
+            )
+        ]
+        for i in range(num_chunks)
+    ]
+    payloads = _map_chunks(encode_chunk, chunks, num_threads)
+
+    header = struct.pack(HEADER_FORMAT, len(payloads), chunk_length, num_rows)
+    sizes = np.array([len(p) for p in payloads], dtype=np.uint64)
+    return header + sizes.tobytes() + b"".join(payloads)
+
+
+def read_blocked_index(x: bytes) -> Tuple[int, int, np.ndarray, int]:
+    """Parse the header and frame index of a blocked stream.
+
+    Args:
+        x: Blocked stream produced by blocked_encode
+
+    Returns:
+        Tuple containing:
+        - chunk_length: Number of rows per chunk (the last one also holds the
+          remaining rows)
+        - num_rows: Total number of rows
+        - offsets: Byte offsets of the chunks (num_chunks + 1 entries)
+        - data_start: Byte offset of the first chunk
+    """
+    header_size = struct.calcsize(HEADER_FORMAT)
+    num_chunks, chunk_length, num_rows = struct.unpack(HEADER_FORMAT, x[:header_size])
+    sizes = np.frombuffer(x[header_size : header_size + 8 * num_chunks], np.uint64)
+    offsets = np.zeros(num_chunks + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return chunk_length, num_rows, offsets, header_size + 8 * num_chunks
+
+
+def _decode_chunks(
+    x: bytes,
+    dtype: str,
+    shape: tuple,
+    decode_chunk: Callable[[bytes, str, tuple], np.ndarray],
+    start: int,
+    stop: int,
+    num_threads: int,
+) -> np.ndarray:
+    chunk_length, num_rows, offsets, data_start = read_blocked_index(x)
+    if num_rows != shape[0]:
+        raise ValueError(f"Blocked stream has {num_rows} rows, expected {shape[0]}")
+    start = max(0, min(start, num_rows))
+    stop = max(start, min(stop, num_rows))
+    output = np.empty((stop - start, *shape[1:]), dtype=dtype)
+    view = memoryview(x)
+
+    num_chunks = len(offsets) - 1
+
+    def decode_one(i: int) -> None:
+        chunk_start = _chunk_start(i, chunk_length)
+        chunk_stop = _chunk_stop(i, chunk_length, num_chunks, num_rows)
+        payload = view[data_start + offsets[i] : data_start + offsets[i + 1]]
+        chunk = decode_chunk(
+            bytes(payload), dtype, (chunk_stop - chunk_start, *shape[1:])
+        )
+        # Copy the part of the chunk that overlaps [start, stop)
+        lo = max(start, chunk_start)
+        hi = min(stop, chunk_stop)
+        output[lo - start : hi - start] = chunk[lo - chunk_start : hi - chunk_start]
+
+    if stop > start:
+        first_chunk = min(start // chunk_length, num_chunks - 1)
+        last_chunk = min((stop - 1) // chunk_length, num_chunks - 1)
+        _map_chunks(decode_one, list(range(first_chunk, last_chunk + 1)), num_threads)
+    return output
+
+
+def blocked_decode(
+    x: bytes,
+    dtype: str,
+    shape: tuple,
+    decode_chunk: Callable[[bytes, str, tuple], np.ndarray],
+    *,
+    num_threads: int,
+) -> np.ndarray:
+    """Decompress a stream produced by blocked_encode.
+
+    Args:
+        x: Blocked stream
+        dtype: Data type of the original array
+        shape: Shape of the original array
+        decode_chunk: Function decompressing one chunk, called as
+            decode_chunk(payload, dtype, chunk_shape)
+        num_threads: Number of threads used to decompress chunks
+
+    Returns:
+        The decompressed array
+    """
+    return _decode_chunks(x, dtype, shape, decode_chunk, 0, shape[0], num_threads)
+
+
+def blocked_decode_range(
+    x: bytes,
+    dtype: str,
+    shape: tuple,
+    start: int,
+    stop: int,
+    decode_chunk: Callable[[bytes, str, tuple], np.ndarray],
+    *,
+    num_threads: int = 1,
+) -> np.ndarray:
+    """Decompress only rows [start, stop) of a stream produced by blocked_encode.
+
+    The frame index is used to locate the chunks overlapping the range, so
+    only those chunks are decompressed.
+
+    Args:
+        x: Blocked stream
+        dtype: Data type of the original array
+        shape: Shape of the original array
+        start: First row to decode
+        stop: End of the range (exclusive)
+        decode_chunk: Function decompressing one chunk, called as
+            decode_chunk(payload, dtype, chunk_shape)
+        num_threads: Number of threads used to decompress chunks
+
+    Returns:
+        Array holding rows [start, stop) of the original array
+    """
+    return _decode_chunks(x, dtype, shape, decode_chunk, start, stop, num_threads)
+
+
+def _flat_decode_range(
+    x: bytes,
+    dtype: str,
+    shape: tuple,
+    start: int,
+    stop: int,
+    decode: Callable,
+    num_threads: int,
+) -> np.ndarray:
+    # Rows [start, stop) of the original array in terms of flat elements
+    row_size = int(np.prod(shape[1:]))
+    flat = blocked_decode_range(
+        x,
+        dtype,
+        (int(np.prod(shape)),),
+        start * row_size,
+        stop * row_size,
+        decode,
+        num_threads=num_threads,
+    )
+    return flat.reshape((-1, *shape[1:]))
+
+
+def _parse_size(label: str) -> int:
+    units = {"K": 1024, "M": 1024 * 1024}
+    return int(label[:-1]) * units[label[-1]]
+
+
+def _blocked_variant(
+    codec: str,
+    level: int,
+    encode: Callable,
+    decode: Callable,
+    chunk_label: str,
+    num_threads: int,
+) -> dict:
+    chunk_bytes = _parse_size(chunk_label)
+    return {
+        "name": f"{codec}-{level}-blocked-{chunk_label}-t{num_threads}",
+        "version": "1",
+        # Byte codecs see the array as a flat sequence of elements
+        "encode": lambda x: blocked_encode(
+            x.reshape(-1),
+            lambda c: encode(c, level),
+            chunk_length=max(1, chunk_bytes // x.itemsize),
+            num_threads=num_threads,
+        ),
+        "decode": lambda x, dtype, shape: blocked_decode(
+            x, dtype, (int(np.prod(shape)),), decode, num_threads=num_threads
+        ).reshape(shape),
+        "decode_range": lambda x, dtype, shape, start, stop: _flat_decode_range(
+            x, dtype, shape, start, stop, decode, num_threads
+        ),
+        "description": f"{codec} level {level} on independent {chunk_label}B chunks compressed with {num_threads} thread(s).",
+        "tags": [codec, "blocked"],
+        "threads": num_threads,
+        "with_threads": lambda n: _blocked_variant(
+            codec, level, encode, decode, chunk_label, n
+        ),
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+
+
+# (codec, level, encode, decode, [(chunk size, threads), ...])
+_variant_specs = [
+    ("zstd", 3, zstd_encode, zstd_decode, [("1M", 1), ("1M", 8), ("256K", 8)]),
+    ("zstd", 19, zstd_encode, zstd_decode, [("1M", 1), ("1M", 8), ("256K", 8)]),
+    ("lz4", 0, lz4_encode, lz4_decode, [("1M", 1), ("1M", 8), ("256K", 8)]),
+    ("zlib", 5, zlib_encode, zlib_decode, [("1M", 1), ("1M", 8), ("256K", 8)]),
+    ("brotli", 6, brotli_encode, brotli_decode, [("1M", 1), ("1M", 8)]),
+    ("bzip2", 9, bzip2_encode, bzip2_decode, [("1M", 1), ("1M", 8)]),
+    ("lzma", 6, lzma_encode, lzma_decode, [("1M", 8)]),
+]
+
+algorithms = [
+    _blocked_variant(codec, level, encode, decode, chunk_label, num_threads)
+    for codec, level, encode, decode, layouts in _variant_specs
+    for chunk_label, num_threads in layouts
+]
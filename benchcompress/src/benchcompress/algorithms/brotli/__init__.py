@@ -1,6 +1,7 @@
 import numpy as np
 import brotli
 import os
+from ..ans.delta import delta_encode, delta_decode
 
 
 SOURCE_FILE = "brotli/__init__.py"
@@ -18,8 +19,7 @@ LONG_DESCRIPTION = _load_long_description()
 
 def brotli_delta_encode(x: np.ndarray, level: int) -> bytes:
     assert x.ndim == 1
-    y = np.diff(x)
-    y = np.insert(y, 0, x[0])
+    y = delta_encode(x)
     buf = y.tobytes()
     compressed = brotli.compress(buf, quality=level)
     return compressed
@@ -29,7 +29,7 @@ def brotli_delta_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
     assert len(shape) == 1
     buf = brotli.decompress(x)
     y = np.frombuffer(buf, dtype=dtype)
-    return np.cumsum(y)
+    return delta_decode(y)
 
 
 def brotli_encode(x: np.ndarray, level: int) -> bytes:
@@ -87,7 +87,7 @@ algorithms = [
     },
     {
         "name": "brotli-11-delta",
-        "version": "1",
+        "version": "2",
         "encode": lambda x: brotli_delta_encode(x, level=11),
         "decode": lambda x, dtype, shape: brotli_delta_decode(x, dtype, shape),
         "description": "Brotli compression at level 11 with delta encoding.",
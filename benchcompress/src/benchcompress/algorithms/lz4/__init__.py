@@ -1,5 +1,6 @@
 import numpy as np
 import os
+from ..ans.delta import delta_encode, delta_decode
 
 
 SOURCE_FILE = "lz4/__init__.py"
@@ -35,8 +36,7 @@ def lz4_delta_encode(x: np.ndarray, level: int) -> bytes:
     import lz4.frame
 
     assert x.ndim == 1
-    y = np.diff(x)
-    y = np.insert(y, 0, x[0])
+    y = delta_encode(x)
     buf = y.tobytes()
     compressed = lz4.frame.compress(buf, compression_level=level)
     return compressed
@@ -49,7 +49,7 @@ def lz4_delta_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
 
     buf = lz4.frame.decompress(x)
     y = np.frombuffer(buf, dtype=dtype)
-    return np.cumsum(y)
+    return delta_decode(y)
 
 
 algorithms = [
@@ -95,7 +95,7 @@ algorithms = [
     },
     {
         "name": "lz4-16-delta",
-        "version": "1",
+        "version": "2",
         "encode": lambda x: lz4_delta_encode(x, level=16),
         "decode": lambda x, dtype, shape: lz4_delta_decode(x, dtype, shape),
         "description": "LZ4 compression at level 16 with delta encoding.",
@@ -1,5 +1,6 @@
 import numpy as np
 import os
+from ..ans.delta import delta_encode, delta_decode
 
 
 SOURCE_FILE = "lzma/__init__.py"
@@ -19,8 +20,7 @@ def lzma_delta_encode(x: np.ndarray, preset: int) -> bytes:
     import lzma
 
     assert x.ndim == 1
-    y = np.diff(x)
-    y = np.insert(y, 0, x[0])
+    y = delta_encode(x)
     buf = y.tobytes()
     compressed = lzma.compress(buf, preset=preset)
     return compressed
@@ -33,7 +33,7 @@ def lzma_delta_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
 
     buf = lzma.decompress(x)
     y = np.frombuffer(buf, dtype=dtype)
-    return np.cumsum(y)
+    return delta_decode(y)
 
 
 def lzma_encode(x: np.ndarray, preset: int) -> bytes:
@@ -65,7 +65,7 @@ algorithms = [
     },
     {
         "name": "lzma-9-delta",
-        "version": "1",
+        "version": "2",
         "encode": lambda x: lzma_delta_encode(x, preset=9),
         "decode": lambda x, dtype, shape: lzma_delta_decode(x, dtype, shape),
         "description": "LZMA compression at preset 9 with delta encoding for improved compression of sequential data.",
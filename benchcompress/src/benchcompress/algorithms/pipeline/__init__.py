@@ -0,0 +1,368 @@
+import numpy as np
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from ..zstd import zstd_encode, zstd_decode
+from ..lz4 import lz4_encode, lz4_decode
+from ..zlib import zlib_encode, zlib_decode
+from ..brotli import brotli_encode, brotli_decode
+from ..lzma import lzma_encode, lzma_decode
+from ..bzip2 import bzip2_encode, bzip2_decode
+from ..ans import ans_mt_encode, ans_mt_decode
+from ..ans.delta import delta_encode, delta_decode
+from ..ans.shuffle import (
+    byte_shuffle,
+    byte_unshuffle,
+    bit_shuffle,
+    bit_unshuffle,
+    bit_shuffle_size,
+)
+
+
+SOURCE_FILE = "pipeline/__init__.py"
+
+
+def _load_long_description():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    md_path = os.path.join(current_dir, "pipeline.md")
+    with open(md_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+LONG_DESCRIPTION = _load_long_description()
+
+STAGE_SEPARATOR = "|"
+LEVEL_SEPARATOR = ":"
+
+
+def _delta_forward(x: np.ndarray, in_place: bool) -> np.ndarray:
+    flat = x.reshape(-1)
+    return delta_encode(flat, out=flat if in_place else None).reshape(x.shape)
+
+
+def _delta_inverse(y: np.ndarray, dtype: str, shape: tuple) -> np.ndarray:
+    # Codec outputs backed by the compressed buffer are read-only, while the
+    # outputs of the other stages are fresh arrays that can be reused
+    flat = y.reshape(-1)
+    out = flat if flat.flags.writeable else None
+    return delta_decode(flat, out=out).reshape(shape)
+
+
+def _num_bytes(dtype: str, shape: tuple) -> int:
+    return int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+
+# Invertible array -> array stages. "forward" takes the array and whether it
+# may be overwritten, "inverse" takes the stage output and the dtype and
+# shape of the stage input, and "layout" maps the dtype and shape of the stage
+# input to those of its output, so that no header is needed to decode.
+TRANSFORMS: Dict[str, Dict[str, Any]] = {
+    "delta": {
+        "version": "1",
+        "forward": _delta_forward,
+        "inverse": _delta_inverse,
+        "layout": lambda dtype, shape: (dtype, shape),
+        "description": "differences of consecutive values",
+        "tags": ["delta_encoding", "1d"],
+    },
+    "shuffle": {
+        "version": "1",
+        "forward": lambda x, in_place: byte_shuffle(x),
+        "inverse": byte_unshuffle,
+        "layout": lambda dtype, shape: ("uint8", (_num_bytes(dtype, shape),)),
+        "description": "byte shuffle",
+        "tags": ["shuffle"],
+    },
+    "bitshuffle": {
+        "version": "1",
+        "forward": lambda x, in_place: bit_shuffle(x),
+        "inverse": bit_unshuffle,
+        "layout": lambda dtype, shape: ("uint8", (bit_shuffle_size(dtype, shape),)),
+        "description": "bit shuffle",
+        "tags": ["bitshuffle"],
+    },
+}
+
+# Terminal stages: "encode" takes the array and the level, "decode" the same
+# arguments as an algorithm's decode. "levels" is None for codecs without a
+# level.
+CODECS: Dict[str, Dict[str, Any]] = {
+    "zstd": {
+        "version": "1",
+        "encode": zstd_encode,
+        "decode": zstd_decode,
+        "levels": range(1, 23),
+        "default_level": 3,
+        "tags": ["zstd"],
+    },
+    "lz4": {
+        "version": "1",
+        "encode": lz4_encode,
+        "decode": lz4_decode,
+        "levels": range(0, 17),
+        "default_level": 0,
+        "tags": ["lz4"],
+    },
+    "zlib": {
+        "version": "1",
+        "encode": zlib_encode,
+        "decode": zlib_decode,
+        "levels": range(0, 10),
+        "default_level": 6,
+        "tags": ["zlib"],
+    },
+    "brotli": {
+        "version": "1",
+        "encode": brotli_encode,
+        "decode": brotli_decode,
+        "levels": range(0, 12),
+        "default_level": 6,
+        "tags": ["brotli"],
+    },
+    "lzma": {
+        "version": "1",
+        "encode": lzma_encode,
+        "decode": lzma_decode,
+        "levels": range(0, 10),
+        "default_level": 6,
+        "tags": ["lzma"],
+    },
+    "bzip2": {
+        "version": "1",
+        "encode": bzip2_encode,
+        "decode": bzip2_decode,
+        "levels": range(1, 10),
+        "default_level": 9,
+        "tags": ["bzip2"],
+    },
+    "ans": {
+        "version": "1",
+        # Multi-lane rANS, which unlike simple_ans also accepts uint8 input
+        "encode": lambda x, level: ans_mt_encode(x.reshape(-1), 8, 1),
+        "decode": lambda x, dtype, shape: ans_mt_decode(x, dtype, shape, 1),
+        "levels": None,
+        "default_level": None,
+        "tags": ["ANS", "integer"],
+    },
+}
+
+# Default grid: every transform chain is combined with every codec
+DEFAULT_GRID_TRANSFORMS = [
+    "",
+    "delta",
+    "shuffle",
+    "bitshuffle",
+    "delta|shuffle",
+    "delta|bitshuffle",
+]
+DEFAULT_GRID_CODECS = [
+    "zstd:1",
+    "zstd:3",
+    "zstd:9",
+    "zstd:19",
+    "lz4:0",
+    "lz4:9",
+    "zlib:1",
+    "zlib:6",
+    "zlib:9",
+    "brotli:1",
+    "brotli:6",
+    "brotli:11",
+    "lzma:6",
+    "bzip2:9",
+    "ans",
+]
+
+
+def parse_pipeline(spec: str) -> Tuple[List[str], str, Optional[int]]:
+    """Parse a pipeline spec such as "delta|shuffle|zstd:3".
+
+    A spec is a list of stages separated by "|": any number of transforms
+    followed by exactly one codec, optionally with a level after ":". The
+    codec's default level is used when the level is omitted.
+
+    Args:
+        spec: Pipeline spec
+
+    Returns:
+        tuple: (transform names, codec name, codec level or None)
+
+    Raises:
+        ValueError: If the spec is not a valid pipeline
+    """
+    stages = [stage.strip() for stage in spec.split(STAGE_SEPARATOR)]
+    if any(stage == "" for stage in stages):
+        raise ValueError(f"Empty stage in pipeline: {spec!r}")
+    *transforms, codec_stage = stages
+    for transform in transforms:
+        if transform not in TRANSFORMS:
+            raise ValueError(
+                f"Unknown transform {transform!r} in pipeline {spec!r}. "
+                f"Available transforms: {', '.join(TRANSFORMS)}"
+            )
+
+    codec_name, _, level_text = codec_stage.partition(LEVEL_SEPARATOR)
+    if codec_name not in CODECS:
+        raise ValueError(
+            f"Pipeline {spec!r} must end with a codec. "
+            f"Available codecs: {', '.join(CODECS)}"
+        )
+    codec = CODECS[codec_name]
+    if not level_text:
+        return transforms, codec_name, codec["default_level"]
+    if codec["levels"] is None:
+        raise ValueError(f"Codec {codec_name!r} does not take a level")
+    try:
+        level = int(level_text)
+    except ValueError:
+        raise ValueError(f"Invalid level {level_text!r} in pipeline {spec!r}")
+    if level not in codec["levels"]:
+        raise ValueError(
+            f"Level {level} is out of range for {codec_name} "
+            f"({codec['levels'].start}-{codec['levels'].stop - 1})"
+        )
+    return transforms, codec_name, level
+
+
+def format_pipeline(
+    transforms: List[str], codec_name: str, level: Optional[int]
+) -> str:
+    """Build the canonical spec of a pipeline.
+
+    Args:
+        transforms: Transform names
+        codec_name: Codec name
+        level: Codec level, or None for codecs without a level
+
+    Returns:
+        str: Pipeline spec, with the codec level always written out
+    """
+    codec_stage = codec_name if level is None else f"{codec_name}:{level}"
+    return STAGE_SEPARATOR.join(transforms + [codec_stage])
+
+
+def is_pipeline_spec(name: str) -> bool:
+    """Check whether a name is a valid pipeline spec.
+
+    Args:
+        name: Algorithm name or pipeline spec
+
+    Returns:
+        bool: True if the name parses as a pipeline
+    """
+    try:
+        parse_pipeline(name)
+    except ValueError:
+        return False
+    return True
+
+
+def pipeline_encode(
+    x: np.ndarray, transforms: List[str], codec_name: str, level: Optional[int]
+) -> bytes:
+    for i, transform in enumerate(transforms):
+        # The input array belongs to the caller; later stages own their input
+        x = TRANSFORMS[transform]["forward"](x, i > 0)
+    return CODECS[codec_name]["encode"](x, level)
+
+
+def pipeline_decode(
+    x: bytes,
+    dtype: str,
+    shape: tuple,
+    transforms: List[str],
+    codec_name: str,
+    level: Optional[int],
+) -> np.ndarray:
+    # dtype and shape of the array entering each stage
+    layouts = [(dtype, tuple(shape))]
+    for transform in transforms:
+        layouts.append(TRANSFORMS[transform]["layout"](*layouts[-1]))
+
+    y = CODECS[codec_name]["decode"](x, *layouts[-1])
+    for transform, layout in zip(transforms[::-1], layouts[-2::-1]):
+        y = TRANSFORMS[transform]["inverse"](y, *layout)
+    return y
+
+
+# Pipelines are built once per spec, so that looking a spec up twice returns
+# the same algorithm dictionary, like the registered algorithms
+_pipeline_algorithms: Dict[str, Dict[str, Any]] = {}
+
+
+def make_pipeline_algorithm(spec: str) -> Dict[str, Any]:
+    """Build the algorithm dictionary of a pipeline spec.
+
+    The algorithm is named by the canonical spec, and its version combines the
+    versions of its stages, so cached results are kept per pipeline and are
+    invalidated when any of its stages changes.
+
+    Args:
+        spec: Pipeline spec, e.g. "delta|shuffle|zstd:3"
+
+    Returns:
+        Algorithm dictionary
+
+    Raises:
+        ValueError: If the spec is not a valid pipeline
+    """
+    transforms, codec_name, level = parse_pipeline(spec)
+    name = format_pipeline(transforms, codec_name, level)
+    if name in _pipeline_algorithms:
+        return _pipeline_algorithms[name]
+
+    codec_stage = codec_name if level is None else f"{codec_name} at level {level}"
+    steps = [TRANSFORMS[transform]["description"] for transform in transforms]
+    tags: List[str] = []
+    for stage in [TRANSFORMS[transform] for transform in transforms] + [
+        CODECS[codec_name]
+    ]:
+        tags += [tag for tag in stage["tags"] if tag not in tags]
+    algorithm = {
+        "name": name,
+        "version": ".".join(
+            [TRANSFORMS[transform]["version"] for transform in transforms]
+            + [CODECS[codec_name]["version"]]
+        ),
+        "encode": lambda x: pipeline_encode(x, transforms, codec_name, level),
+        "decode": lambda x, dtype, shape: pipeline_decode(
+            x, dtype, shape, transforms, codec_name, level
+        ),
+        "description": (
+            f"Pipeline: {', then '.join(steps)}, then {codec_stage}."
+            if steps
+            else f"Pipeline: {codec_stage}."
+        ),
+        "tags": tags + ["pipeline"],
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+    _pipeline_algorithms[name] = algorithm
+    return algorithm
+
+
+def generate_pipeline_grid(
+    transforms: Optional[List[str]] = None, codecs: Optional[List[str]] = None
+) -> List[str]:
+    """Generate the pipeline specs of every transform chain and codec pair.
+
+    Args:
+        transforms: Transform chains, e.g. "delta|shuffle" ("" for none)
+            (default: DEFAULT_GRID_TRANSFORMS)
+        codecs: Codec stages, e.g. "zstd:3" (default: DEFAULT_GRID_CODECS)
+
+    Returns:
+        List of canonical pipeline specs
+
+    Raises:
+        ValueError: If a combination is not a valid pipeline
+    """
+    if transforms is None:
+        transforms = DEFAULT_GRID_TRANSFORMS
+    if codecs is None:
+        codecs = DEFAULT_GRID_CODECS
+    specs = []
+    for chain in transforms:
+        for codec in codecs:
+            spec = f"{chain}{STAGE_SEPARATOR}{codec}" if chain else codec
+            specs.append(format_pipeline(*parse_pipeline(spec)))
+    return specs
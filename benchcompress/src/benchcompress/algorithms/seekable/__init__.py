@@ -0,0 +1,82 @@
+import os
+from typing import Any, Dict, List
+from ..blocked import blocked_encode, blocked_decode, blocked_decode_range
+from ..zstd import algorithms as zstd_algorithms
+from ..lz4 import algorithms as lz4_algorithms
+from ..zlib import algorithms as zlib_algorithms
+from ..ans import algorithms as ans_algorithms
+
+
+SOURCE_FILE = "seekable/__init__.py"
+
+
+def _load_long_description():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    md_path = os.path.join(current_dir, "seekable.md")
+    with open(md_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+LONG_DESCRIPTION = _load_long_description()
+
+
+def make_seekable_algorithm(
+    algorithm: Dict[str, Any], chunk_length: int, chunk_label: str
+) -> Dict[str, Any]:
+    """Wrap a registered algorithm in the seekable chunked container.
+
+    Args:
+        algorithm: Algorithm dictionary to wrap
+        chunk_length: Number of samples (rows along the first axis) per chunk
+        chunk_label: Short label for the chunk size used in the name, e.g. "100K"
+
+    Returns:
+        Algorithm dictionary whose encoded stream supports decode_range
+    """
+    encode_chunk = algorithm["encode"]
+    decode_chunk = algorithm["decode"]
+    return {
+        "name": f"{algorithm['name']}-seekable-{chunk_label}",
+        # Changes to the wrapped algorithm must invalidate cached results
+        "version": f"{algorithm['version']}.1",
+        "encode": lambda x: blocked_encode(
+            x, encode_chunk, chunk_length=chunk_length, num_threads=1
+        ),
+        "decode": lambda x, dtype, shape: blocked_decode(
+            x, dtype, shape, decode_chunk, num_threads=1
+        ),
+        "decode_range": lambda x, dtype, shape, start, stop: blocked_decode_range(
+            x, dtype, shape, start, stop, decode_chunk
+        ),
+        "description": f"{algorithm['name']} on independently decodable chunks of {chunk_label} samples, with a chunk offsets table for random access.",
+        "tags": algorithm.get("tags", []) + ["seekable"],
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+
+
+def _find_algorithm(algorithms: List[Dict[str, Any]], name: str) -> Dict[str, Any]:
+    for algorithm in algorithms:
+        if algorithm["name"] == name:
+            return algorithm
+    raise KeyError(f"Algorithm {name} not found")
+
+
+_base_algorithms = zstd_algorithms + lz4_algorithms + zlib_algorithms + ans_algorithms
+
+algorithms = [
+    make_seekable_algorithm(_find_algorithm(_base_algorithms, name), 100_000, "100K")
+    for name in [
+        "zstd-4",
+        "zstd-22",
+        "zstd-22-delta",
+        "zstd-22-markov",
+        "lz4-0",
+        "zlib-5",
+        "ANS-delta",
+        "ANS-markov",
+    ]
+] + [
+    make_seekable_algorithm(_find_algorithm(_base_algorithms, name), 10_000, "10K")
+    for name in ["zstd-22", "ANS-markov"]
+]
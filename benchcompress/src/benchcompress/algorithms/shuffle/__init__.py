@@ -0,0 +1,145 @@
+import numpy as np
+import os
+from typing import Any, Callable, Dict, List
+from ..zstd import algorithms as zstd_algorithms
+from ..lz4 import algorithms as lz4_algorithms
+from ..zlib import algorithms as zlib_algorithms
+from ..brotli import algorithms as brotli_algorithms
+from ..lzma import algorithms as lzma_algorithms
+from ..bzip2 import algorithms as bzip2_algorithms
+from ..ans.shuffle import (
+    byte_shuffle,
+    byte_unshuffle,
+    bit_shuffle,
+    bit_unshuffle,
+    bit_shuffle_size,
+)
+
+
+SOURCE_FILE = "shuffle/__init__.py"
+
+
+def _load_long_description():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    md_path = os.path.join(current_dir, "shuffle.md")
+    with open(md_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+LONG_DESCRIPTION = _load_long_description()
+
+# name suffix -> (filter, inverse filter, size of the filtered bytes)
+FILTERS: Dict[str, tuple] = {
+    "shuffle": (
+        byte_shuffle,
+        byte_unshuffle,
+        lambda dtype, shape: int(np.prod(shape)) * np.dtype(dtype).itemsize,
+    ),
+    "bitshuffle": (bit_shuffle, bit_unshuffle, bit_shuffle_size),
+}
+
+
+def apply_filter(
+    filter_name: str,
+    encode: Callable[[np.ndarray], bytes],
+    x: np.ndarray,
+) -> bytes:
+    """Shuffle an array and encode the shuffled bytes.
+
+    Args:
+        filter_name: Name of the filter ("shuffle" or "bitshuffle")
+        encode: Encode function of an algorithm
+        x: Input array
+
+    Returns:
+        bytes: Encoded shuffled bytes
+    """
+    forward, _, _ = FILTERS[filter_name]
+    return encode(forward(x))
+
+
+def invert_filter(
+    filter_name: str,
+    decode: Callable[[bytes, str, tuple], np.ndarray],
+    x: bytes,
+    dtype: str,
+    shape: tuple,
+) -> np.ndarray:
+    """Decode shuffled bytes written by apply_filter and unshuffle them.
+
+    Args:
+        filter_name: Name of the filter ("shuffle" or "bitshuffle")
+        decode: Decode function of the algorithm used by apply_filter
+        x: Encoded bytes
+        dtype: Data type of the original array
+        shape: Shape of the original array
+
+    Returns:
+        np.ndarray: Original array
+    """
+    _, inverse, size = FILTERS[filter_name]
+    y = decode(x, "uint8", (size(dtype, shape),))
+    return inverse(y, dtype, shape)
+
+
+def make_shuffle_algorithm(
+    algorithm: Dict[str, Any], filter_name: str
+) -> Dict[str, Any]:
+    """Wrap a registered byte codec with a shuffle pre-filter.
+
+    Args:
+        algorithm: Algorithm dictionary of a byte codec (one that accepts
+            uint8 arrays)
+        filter_name: Name of the filter ("shuffle" or "bitshuffle")
+
+    Returns:
+        Algorithm dictionary that compresses the shuffled bytes
+    """
+    encode = algorithm["encode"]
+    decode = algorithm["decode"]
+    label = "byte" if filter_name == "shuffle" else "bit"
+    return {
+        "name": f"{algorithm['name']}-{filter_name}",
+        # Changes to the wrapped algorithm must invalidate cached results
+        "version": f"{algorithm['version']}.1",
+        "encode": lambda x: apply_filter(filter_name, encode, x),
+        "decode": lambda x, dtype, shape: invert_filter(
+            filter_name, decode, x, dtype, shape
+        ),
+        "description": f"{algorithm['name']} applied after a {label} shuffle, which groups the {label}s of the samples by significance.",
+        "tags": algorithm.get("tags", []) + [filter_name],
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+
+
+def _find_algorithm(algorithms: List[Dict[str, Any]], name: str) -> Dict[str, Any]:
+    for algorithm in algorithms:
+        if algorithm["name"] == name:
+            return algorithm
+    raise KeyError(f"Algorithm {name} not found")
+
+
+_base_algorithms = (
+    zstd_algorithms
+    + lz4_algorithms
+    + zlib_algorithms
+    + brotli_algorithms
+    + lzma_algorithms
+    + bzip2_algorithms
+)
+
+algorithms = [
+    make_shuffle_algorithm(_find_algorithm(_base_algorithms, name), filter_name)
+    for filter_name in ["shuffle", "bitshuffle"]
+    for name in [
+        "zstd-4",
+        "zstd-22",
+        "lz4-0",
+        "lz4-16",
+        "zlib-5",
+        "brotli-6",
+        "lzma-9",
+        "bzip2-9",
+    ]
+]
@@ -1,5 +1,6 @@
 import numpy as np
 import os
+from ..ans.delta import delta_encode, delta_decode
 
 
 SOURCE_FILE = "zlib/__init__.py"
@@ -35,8 +36,7 @@ def zlib_delta_encode(x: np.ndarray, level: int) -> bytes:
     import zlib
 
     assert x.ndim == 1
-    y = np.diff(x)
-    y = np.insert(y, 0, x[0])
+    y = delta_encode(x)
     buf = y.tobytes()
     compressed = zlib.compress(buf, level=level)
     return compressed
@@ -49,7 +49,7 @@ def zlib_delta_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
 
     buf = zlib.decompress(x)
     y = np.frombuffer(buf, dtype=dtype)
-    return np.cumsum(y)
+    return delta_decode(y)
 
 
 algorithms = [
@@ -105,7 +105,7 @@ algorithms = [
     },
     {
         "name": "zlib-9-delta",
-        "version": "1",
+        "version": "2",
         "encode": lambda x: zlib_delta_encode(x, level=9),
         "decode": lambda x, dtype, shape: zlib_delta_decode(x, dtype, shape),
         "description": "Zlib DEFLATE compression at level 9 with delta encoding.",
@@ -2,7 +2,14 @@ import numpy as np
 import os
 from ..ans.markov_reconstruct import markov_reconstruct as markov_reconstruct_cpp
 from ..ans.markov_predict import markov_predict as markov_predict_cpp
+from ..ans.markov_blocks import (
+    markov_block_predict,
+    markov_block_reconstruct,
+    markov_block_model_size,
+)
+from ..ans.markov_order import select_markov_order
 from ..ans.get_run_lengths import get_run_lengths
+from ..ans.delta import delta_encode, delta_decode
 
 
 SOURCE_FILE = "zstd/__init__.py"
@@ -23,8 +30,7 @@ def zstd_delta_encode(x: np.ndarray, level: int) -> bytes:
 
     assert x.ndim == 1
 
-    y = np.diff(x)
-    y = np.insert(y, 0, x[0])
+    y = delta_encode(x)
     buf = y.tobytes()
     compressor = zstd.ZstdCompressor(level=level)
     compressed = compressor.compress(buf)
@@ -39,14 +45,16 @@ def zstd_delta_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
     decompressor = zstd.ZstdDecompressor()
     buf = decompressor.decompress(x)
     y = np.frombuffer(buf, dtype=dtype)
-    return np.cumsum(y)
+    return delta_decode(y)
 
 
-def zstd_encode(x: np.ndarray, level: int) -> bytes:
+def zstd_encode(x: np.ndarray, level: int, threads: int = 1) -> bytes:
     import zstandard as zstd
 
     buf = x.tobytes()
-    compressor = zstd.ZstdCompressor(level=level)
+    # threads=0 is zstd's single-threaded mode, while threads=1 would already
+    # hand the input to one worker thread
+    compressor = zstd.ZstdCompressor(level=level, threads=threads if threads > 1 else 0)
     compressed = compressor.compress(buf)
     return compressed
 
@@ -60,12 +68,12 @@ def zstd_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
     return y.reshape(shape)
 
 
-def zstd_markov_encode(x: np.ndarray, level: int) -> bytes:
+def zstd_markov_encode(x: np.ndarray, level: int, M: int = 6) -> bytes:
     import zstandard as zstd
     import struct
 
     assert x.ndim == 1
-    coeffs, initial, resid = markov_predict_cpp(x, M=6, num_training_samples=10000)
+    coeffs, initial, resid = markov_predict_cpp(x, M=M, num_training_samples=10000)
 
     # Convert coeffs and initial to bytes
     coeffs_bytes = coeffs.tobytes()
@@ -110,6 +118,28 @@ def zstd_markov_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
     return output
 
 
+def zstd_markov_block_encode(x: np.ndarray, level: int, block_size: int) -> bytes:
+    import zstandard as zstd
+
+    assert x.ndim == 1
+    model, resid = markov_block_predict(x, M=6, block_size=block_size)
+
+    # The model records its own size, so the residuals follow it directly
+    compressor = zstd.ZstdCompressor(level=level)
+    return model + compressor.compress(resid.tobytes())
+
+
+def zstd_markov_block_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
+    import zstandard as zstd
+
+    assert len(shape) == 1
+
+    model_size = markov_block_model_size(x, dtype)
+    decompressor = zstd.ZstdDecompressor()
+    resid = np.frombuffer(decompressor.decompress(x[model_size:]), dtype=dtype)
+    return markov_block_reconstruct(x[:model_size], resid)
+
+
 def zstd_markov_zrle_encode(x: np.ndarray, level: int) -> bytes:
     import zstandard as zstd
     import struct
@@ -232,6 +262,36 @@ def zstd_markov_zrle_decode(x: bytes, dtype: str, shape: tuple) -> np.ndarray:
     return np.concatenate(segments)
 
 
+def _zstd_markov_block_variant(block_size: int, block_label: str) -> dict:
+    return {
+        "name": f"zstd-22-markov-block-{block_label}",
+        "version": "1",
+        "encode": lambda x: zstd_markov_block_encode(
+            x, level=22, block_size=block_size
+        ),
+        "decode": lambda x, dtype, shape: zstd_markov_block_decode(x, dtype, shape),
+        "description": f"Zstandard compression at level 22 with Markov prediction, refitting the coefficients for every block of {block_label} samples to follow non-stationary signals.",
+        "tags": ["zstd", "markov_prediction", "1d"],
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+
+
+def _zstd_threaded_variant(level: int, threads: int) -> dict:
+    return {
+        "name": f"zstd-{level}-t{threads}",
+        "version": "1",
+        "encode": lambda x: zstd_encode(x, level=level, threads=threads),
+        "decode": lambda x, dtype, shape: zstd_decode(x, dtype, shape),
+        "description": f"Zstandard compression at level {level} with zstd's native multithreading on {threads} thread(s).",
+        "tags": ["zstd"],
+        "threads": threads,
+        "with_threads": lambda n: _zstd_threaded_variant(level, n),
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    }
+
+
 algorithms = [
     {
         "name": "zstd-4",
@@ -240,6 +300,8 @@ algorithms = [
         "decode": lambda x, dtype, shape: zstd_decode(x, dtype, shape),
         "description": "Zstandard compression at level 4 (fast compression).",
         "tags": ["zstd"],
+        "threads": 1,
+        "with_threads": lambda n: _zstd_threaded_variant(4, n),
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
@@ -250,6 +312,8 @@ algorithms = [
         "decode": lambda x, dtype, shape: zstd_decode(x, dtype, shape),
         "description": "Zstandard compression at level 7 (balanced speed/compression).",
         "tags": ["zstd"],
+        "threads": 1,
+        "with_threads": lambda n: _zstd_threaded_variant(7, n),
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
@@ -260,6 +324,8 @@ algorithms = [
         "decode": lambda x, dtype, shape: zstd_decode(x, dtype, shape),
         "description": "Zstandard compression at level 10 (better compression).",
         "tags": ["zstd"],
+        "threads": 1,
+        "with_threads": lambda n: _zstd_threaded_variant(10, n),
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
@@ -270,6 +336,8 @@ algorithms = [
         "decode": lambda x, dtype, shape: zstd_decode(x, dtype, shape),
         "description": "Zstandard compression at level 13 (high compression).",
         "tags": ["zstd"],
+        "threads": 1,
+        "with_threads": lambda n: _zstd_threaded_variant(13, n),
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
@@ -280,6 +348,8 @@ algorithms = [
         "decode": lambda x, dtype, shape: zstd_decode(x, dtype, shape),
         "description": "Zstandard compression at level 16 (very high compression).",
         "tags": ["zstd"],
+        "threads": 1,
+        "with_threads": lambda n: _zstd_threaded_variant(16, n),
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
@@ -290,6 +360,8 @@ algorithms = [
         "decode": lambda x, dtype, shape: zstd_decode(x, dtype, shape),
         "description": "Zstandard compression at level 19 (ultra high compression).",
         "tags": ["zstd"],
+        "threads": 1,
+        "with_threads": lambda n: _zstd_threaded_variant(19, n),
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
@@ -300,12 +372,14 @@ algorithms = [
         "decode": lambda x, dtype, shape: zstd_decode(x, dtype, shape),
         "description": "Zstandard compression at maximum level 22 (highest compression).",
         "tags": ["zstd"],
+        "threads": 1,
+        "with_threads": lambda n: _zstd_threaded_variant(22, n),
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
     {
         "name": "zstd-22-delta",
-        "version": "1",
+        "version": "2",
         "encode": lambda x: zstd_delta_encode(x, level=22),
         "decode": lambda x, dtype, shape: zstd_delta_decode(x, dtype, shape),
         "description": "Zstandard compression at level 22 with delta encoding for improved compression of sequential data.",
@@ -323,6 +397,17 @@ algorithms = [
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
+    {
+        "name": "zstd-22-markov-auto",
+        "version": "2",
+        # The order is selected inside encode, so the encode time includes it
+        "encode": lambda x: zstd_markov_encode(x, level=22, M=select_markov_order(x)),
+        "decode": lambda x, dtype, shape: zstd_markov_decode(x, dtype, shape),
+        "description": "Zstandard compression at level 22 with Markov prediction, choosing the model order that minimizes the residual entropy on a training window.",
+        "tags": ["zstd", "markov_prediction", "1d"],
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    },
     {
         "name": "zstd-22-markov-zrle",
         "version": "1",
@@ -333,4 +418,7 @@ algorithms = [
         "source_file": SOURCE_FILE,
         "long_description": LONG_DESCRIPTION,
     },
+    _zstd_markov_block_variant(4096, "4K"),
+    _zstd_markov_block_variant(16384, "16K"),
+    _zstd_markov_block_variant(65536, "64K"),
 ]
@@ -1,9 +1,32 @@
 #!/usr/bin/env python3
 
 import click
+import json
 from typing import List, Optional
-from .run_benchmarks.run_benchmarks import run_benchmarks
-from .algorithms import algorithms
+from .run_benchmarks.run_benchmarks import run_benchmarks, system_version
+from .run_benchmarks.pareto import compute_pareto_frontiers
+from .run_benchmarks.recommend import recommend_algorithm
+from .run_benchmarks.sampling import DEFAULT_NUM_CHUNKS, DEFAULT_CHUNK_SAMPLES
+from .run_benchmarks.thread_scaling import (
+    compute_thread_scaling,
+    default_thread_counts,
+)
+from .run_benchmarks.size_scaling import (
+    DEFAULT_MAX_CALL_TIME,
+    DEFAULT_SCALING_SIZES,
+    run_size_scaling,
+)
+from .run_benchmarks.dataset_store import prefetch_datasets
+from .run_benchmarks.results_index import open_results_index
+from .run_benchmarks.blob_store import collect_garbage, get_max_blob_store_size
+from .algorithms import algorithms, make_threaded_algorithm
+from .algorithms.pipeline import (
+    CODECS,
+    TRANSFORMS,
+    STAGE_SEPARATOR,
+    generate_pipeline_grid,
+    make_pipeline_algorithm,
+)
 from .datasets import datasets
 
 
@@ -57,6 +80,116 @@ def validate_datasets(ctx, param, value):
     return value
 
 
+def validate_pipelines(ctx, param, value):
+    if not value:
+        return None
+    pipelines = []
+    for spec in value:
+        try:
+            pipelines.append(make_pipeline_algorithm(spec))
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+    return pipelines
+
+
+def parse_levels(text: str) -> List[int]:
+    """Parse a list of levels such as 1..22 or 1..9,19,22"""
+    levels: List[int] = []
+    for part in text.split(","):
+        first, sep, last = part.strip().partition("..")
+        try:
+            if sep:
+                levels += range(int(first), int(last) + 1)
+            else:
+                levels.append(int(first))
+        except ValueError:
+            raise click.BadParameter(
+                f"Invalid levels: {text!r} (expected e.g. 1..22 or 1,3,5)",
+                param_hint="'--levels'",
+            )
+    return sorted(set(levels))
+
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_sizes(ctx, param, value):
+    """Parse a list of sizes in bytes such as 4K,64K,1M"""
+    if value is None:
+        return None
+    sizes = []
+    for part in value.split(","):
+        text = part.strip().upper()
+        if text.endswith("B"):
+            text = text[:-1]
+        unit = text[-1:] if text[-1:] in SIZE_UNITS else ""
+        try:
+            sizes.append(int(float(text[: len(text) - len(unit)]) * SIZE_UNITS[unit]))
+        except ValueError:
+            raise click.BadParameter(
+                f"Invalid size: {part!r} (expected e.g. 4K, 64K, 1M)"
+            )
+    return sizes
+
+
+def parse_size(ctx, param, value):
+    """Parse a single size in bytes such as 10G"""
+    if value is None:
+        return None
+    sizes = parse_sizes(ctx, param, value)
+    if len(sizes) != 1:
+        raise click.BadParameter(f"Expected a single size, got {value!r}")
+    return sizes[0]
+
+
+def parse_thread_counts(ctx, param, value):
+    """Parse a list of thread counts such as 1,2,4,8"""
+    if value is None:
+        return None
+    try:
+        counts = sorted({int(part) for part in value.split(",")})
+    except ValueError:
+        raise click.BadParameter(f"Invalid thread counts: {value!r}")
+    if counts[0] < 1:
+        raise click.BadParameter("Thread counts must be at least 1")
+    return counts
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count with a binary unit"""
+    for unit in ["G", "M", "K"]:
+        if num_bytes >= SIZE_UNITS[unit] and num_bytes % SIZE_UNITS[unit] == 0:
+            return f"{num_bytes // SIZE_UNITS[unit]} {unit}B"
+    return f"{num_bytes} B"
+
+
+def format_speed(result: dict, prefix: str) -> str:
+    """Format a throughput with its confidence interval, when available"""
+    text = f"{result[f'{prefix}_mb_per_sec']:.2f} MB/s"
+    if f"{prefix}_mb_per_sec_ci_low" in result:
+        text += (
+            f" (CI {result[f'{prefix}_mb_per_sec_ci_low']:.2f}"
+            f"-{result[f'{prefix}_mb_per_sec_ci_high']:.2f})"
+        )
+    return text
+
+
+def format_ratio(result: dict) -> str:
+    """Format a compression ratio with its confidence interval, when available"""
+    text = f"{result['compression_ratio']:.2f}x"
+    if "compression_ratio_ci_low" in result:
+        text += (
+            f" (CI {result['compression_ratio_ci_low']:.2f}"
+            f"-{result['compression_ratio_ci_high']:.2f})"
+        )
+    return text
+
+
+def format_bytes(num_bytes: int) -> str:
+    """Format a byte count in MB"""
+    return f"{num_bytes / (1024 * 1024):.2f} MB"
+
+
 @click.group()
 def cli():
     """Benchmark compression algorithms for scientific data arrays"""
@@ -71,6 +204,20 @@ def list():
         desc = alg.get("description", "No description")
         click.echo(f"  {alg['name']:<20} - {desc}")
 
+    click.echo("\nPipeline stages (e.g. delta|shuffle|zstd:3):")
+    click.echo(f"  Transforms: {', '.join(TRANSFORMS)}")
+    click.echo(
+        "  Codecs: "
+        + ", ".join(
+            (
+                name
+                if codec["levels"] is None
+                else f"{name}:{codec['levels'].start}-{codec['levels'].stop - 1}"
+            )
+            for name, codec in CODECS.items()
+        )
+    )
+
     click.echo("\nAvailable Datasets:")
     for ds in datasets:
         desc = ds.get("description", "No description")
@@ -85,6 +232,18 @@ def list():
     callback=validate_algorithms,
     help="Algorithm(s) to benchmark (can be specified multiple times)",
 )
+@click.option(
+    "--pipeline",
+    "-p",
+    multiple=True,
+    callback=validate_pipelines,
+    help="Pipeline spec(s) to benchmark, e.g. delta|shuffle|zstd:3 (can be specified multiple times)",
+)
+@click.option(
+    "--pipeline-grid",
+    is_flag=True,
+    help="Benchmark the default grid of transform chains and codecs",
+)
 @click.option(
     "--dataset",
     "-d",
@@ -100,10 +259,95 @@ def list():
 )
 @click.option("--quiet", "-q", is_flag=True, help="Reduce output verbosity")
 @click.option("--force", "-f", is_flag=True, help="Force re-run without using cache")
-def run(algorithm, dataset, cache_dir, quiet, force):
+@click.option(
+    "--estimate",
+    is_flag=True,
+    help="Estimate ratio and throughput from a sample of chunks, with error bars",
+)
+@click.option(
+    "--decode-only",
+    is_flag=True,
+    help="Rerun only decoding on the cached compressed data, keeping the encode "
+    "results (e.g. after a decoder upgrade)",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of benchmarks to run concurrently in separate processes",
+)
+@click.option(
+    "--pin-cores",
+    is_flag=True,
+    help="Pin each worker process to its own physical core",
+)
+@click.option(
+    "--max-jobs-per-numa-node",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Maximum number of concurrent benchmarks per NUMA node",
+)
+@click.option(
+    "--warmup-iterations",
+    default=None,
+    type=click.IntRange(min=0),
+    help="Untimed runs before timing each encode/decode (default: 1)",
+)
+@click.option(
+    "--min-trials",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Minimum number of timed trials (default: 5)",
+)
+@click.option(
+    "--max-trials",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Maximum number of timed trials (default: 1000)",
+)
+@click.option(
+    "--time-budget",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Keep running trials until this many seconds are spent (default: 1.0)",
+)
+def run(
+    algorithm,
+    pipeline,
+    pipeline_grid,
+    dataset,
+    cache_dir,
+    quiet,
+    force,
+    estimate,
+    decode_only,
+    jobs,
+    pin_cores,
+    max_jobs_per_numa_node,
+    warmup_iterations,
+    min_trials,
+    max_trials,
+    time_budget,
+):
     """Run benchmarks with specified options"""
-    # Filter algorithms and datasets
-    filtered_algorithms = filter_algorithms(algorithm)
+    if estimate and decode_only:
+        raise click.UsageError("--estimate and --decode-only cannot be combined")
+
+    # Filter algorithms and datasets. When only pipelines are given, the
+    # registered algorithms are not run.
+    pipeline_specs = [alg["name"] for alg in pipeline or []]
+    if pipeline_grid:
+        pipeline_specs += generate_pipeline_grid()
+    # Specs are canonical, so equivalent pipelines are only run once
+    pipelines = [
+        make_pipeline_algorithm(spec) for spec in dict.fromkeys(pipeline_specs)
+    ]
+    if algorithm or not pipelines:
+        filtered_algorithms = filter_algorithms(algorithm) + pipelines
+    else:
+        filtered_algorithms = pipelines
     filtered_datasets = filter_datasets(dataset)
 
     if not filtered_algorithms:
@@ -115,6 +359,17 @@ def run(algorithm, dataset, cache_dir, quiet, force):
         ctx = click.get_current_context()
         ctx.exit(1)
 
+    timing_policy = {
+        key: value
+        for key, value in [
+            ("warmup_iterations", warmup_iterations),
+            ("min_trials", min_trials),
+            ("max_trials", max_trials),
+            ("time_budget", time_budget),
+        ]
+        if value is not None
+    }
+
     # Run benchmarks with filtered options
     results = run_benchmarks(
         cache_dir=cache_dir,
@@ -122,18 +377,573 @@ def run(algorithm, dataset, cache_dir, quiet, force):
         selected_algorithms=filtered_algorithms,
         selected_datasets=filtered_datasets,
         force=force,
+        timing_policy=timing_policy,
+        estimate=estimate,
+        decode_only=decode_only,
+        jobs=jobs,
+        pin_cores=pin_cores,
+        max_jobs_per_numa_node=max_jobs_per_numa_node,
     )
 
     # Print summary
     click.echo("\nBenchmark Summary:")
     for result in results["results"]:
         click.echo(
-            f"\n{result['dataset']} + {result['algorithm']}:"
-            f"\n  Compression ratio: {result['compression_ratio']:.2f}x"
-            f"\n  Encode speed: {result['encode_mb_per_sec']:.2f} MB/s"
-            f"\n  Decode speed: {result['decode_mb_per_sec']:.2f} MB/s"
+            f"\n{result['dataset']} + {result['algorithm']}"
+            + (" (estimated)" if result.get("estimated") else "")
+            + f":\n  Compression ratio: {format_ratio(result)}"
+            f"\n  Encode speed: {format_speed(result, 'encode')}"
+            f"\n  Decode speed: {format_speed(result, 'decode')}"
+        )
+        if "random_access_time" in result:
+            click.echo(
+                f"  Random access ({result['random_access_window']:,} samples):"
+                f" {result['random_access_time']*1000:.2f} ms"
+                + ("" if result["random_access_seekable"] else " (full decode)")
+            )
+        if "encode_peak_bytes" in result:
+            click.echo(
+                f"  Peak memory: encode {format_bytes(result['encode_peak_bytes'])}"
+                f", decode {format_bytes(result['decode_peak_bytes'])}"
+            )
+
+
+@cli.command()
+@click.option(
+    "--codec",
+    "-c",
+    required=True,
+    type=click.Choice([name for name, codec in CODECS.items() if codec["levels"]]),
+    help="Codec whose levels are swept",
+)
+@click.option(
+    "--levels",
+    "-l",
+    default=None,
+    help="Levels to sweep, e.g. 1..22 or 1,3,5 (default: all levels of the codec)",
+)
+@click.option(
+    "--transforms",
+    "-t",
+    multiple=True,
+    help="Transform chain applied before the codec, e.g. delta|shuffle (can be specified multiple times, default: none)",
+)
+@click.option(
+    "--dataset",
+    "-d",
+    multiple=True,
+    callback=validate_datasets,
+    help="Dataset(s) to benchmark (can be specified multiple times)",
+)
+@click.option(
+    "--output",
+    "-o",
+    default="pareto_frontiers.json",
+    show_default=True,
+    type=click.Path(),
+    help="JSON file to write the frontiers to",
+)
+@click.option(
+    "--cache-dir",
+    default=".benchmark_cache",
+    help="Directory to store cached results",
+    type=click.Path(),
+)
+@click.option("--quiet", "-q", is_flag=True, help="Reduce output verbosity")
+@click.option("--force", "-f", is_flag=True, help="Force re-run without using cache")
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of benchmarks to run concurrently in separate processes",
+)
+@click.option(
+    "--time-budget",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Keep running trials until this many seconds are spent (default: 1.0)",
+)
+def sweep(
+    codec,
+    levels,
+    transforms,
+    dataset,
+    output,
+    cache_dir,
+    quiet,
+    force,
+    jobs,
+    time_budget,
+):
+    """Sweep the levels of a codec and report the ratio/speed Pareto frontiers"""
+    codec_levels = CODECS[codec]["levels"]
+    level_list = parse_levels(levels) if levels else list(codec_levels)
+    invalid = [level for level in level_list if level not in codec_levels]
+    if invalid:
+        raise click.BadParameter(
+            f"Level(s) {', '.join(map(str, invalid))} out of range for {codec} "
+            f"({codec_levels.start}-{codec_levels.stop - 1})",
+            param_hint="'--levels'",
+        )
+
+    chains = [chain.strip() for chain in transforms] or [""]
+    pipelines = []
+    for chain in chains:
+        for level in level_list:
+            codec_stage = f"{codec}:{level}"
+            spec = f"{chain}{STAGE_SEPARATOR}{codec_stage}" if chain else codec_stage
+            try:
+                pipelines.append(make_pipeline_algorithm(spec))
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="'--transforms'")
+
+    timing_policy = {} if time_budget is None else {"time_budget": time_budget}
+    # Each level is a pipeline, so results are cached per level like any
+    # other algorithm
+    results = run_benchmarks(
+        cache_dir=cache_dir,
+        verbose=not quiet,
+        selected_algorithms=pipelines,
+        selected_datasets=filter_datasets(dataset),
+        force=force,
+        timing_policy=timing_policy,
+        jobs=jobs,
+    )
+    frontiers = compute_pareto_frontiers(results["results"])
+
+    click.echo("\nPareto frontiers:")
+    for entry in frontiers:
+        for direction in ["encode", "decode"]:
+            click.echo(f"\n{entry['dataset']} (ratio vs {direction} speed):")
+            for point in entry[direction]:
+                click.echo(
+                    f"  {point['algorithm']:<30}"
+                    f" {point['compression_ratio']:>8.3f}x"
+                    f" {point[f'{direction}_mb_per_sec']:>10.2f} MB/s"
+                )
+
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "codec": codec,
+                "levels": level_list,
+                "transforms": chains,
+                "system_version": system_version,
+                "frontiers": frontiers,
+                "results": results["results"],
+            },
+            f,
+            indent=2,
+        )
+    click.echo(f"\nFrontiers written to {output}")
+
+
+@cli.command()
+@click.option(
+    "--dataset",
+    "-d",
+    required=True,
+    type=click.Choice(get_available_datasets()),
+    help="Dataset to recommend an algorithm for",
+)
+@click.option(
+    "--algorithm",
+    "-a",
+    multiple=True,
+    callback=validate_algorithms,
+    help="Candidate algorithm(s) (can be specified multiple times, default: all)",
+)
+@click.option(
+    "--min-encode-mbps",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Minimum encode throughput in MB/s",
+)
+@click.option(
+    "--min-decode-mbps",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Minimum decode throughput in MB/s",
+)
+@click.option(
+    "--min-ratio",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Minimum compression ratio",
+)
+@click.option(
+    "--num-chunks",
+    default=DEFAULT_NUM_CHUNKS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of chunks sampled from the dataset",
+)
+@click.option(
+    "--chunk-samples",
+    default=DEFAULT_CHUNK_SAMPLES,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Number of samples per chunk",
+)
+@click.option(
+    "--cache-dir",
+    default=".benchmark_cache",
+    help="Directory to store cached results",
+    type=click.Path(),
+)
+@click.option("--quiet", "-q", is_flag=True, help="Reduce output verbosity")
+def recommend(
+    dataset,
+    algorithm,
+    min_encode_mbps,
+    min_decode_mbps,
+    min_ratio,
+    num_chunks,
+    chunk_samples,
+    cache_dir,
+    quiet,
+):
+    """Recommend the best algorithm for a dataset under speed and ratio constraints"""
+    recommendation = recommend_algorithm(
+        filter_datasets([dataset])[0],
+        cache_dir=cache_dir,
+        min_encode_mbps=min_encode_mbps,
+        min_decode_mbps=min_decode_mbps,
+        min_compression_ratio=min_ratio,
+        candidates=filter_algorithms(algorithm),
+        num_chunks=num_chunks,
+        chunk_samples=chunk_samples,
+        verbose=not quiet,
+    )
+
+    click.echo(
+        f"\nEntropy bound (order 0): {recommendation['entropy_ratio_bound']:.3f}x"
+    )
+    if "delta_entropy_ratio_bound" in recommendation:
+        click.echo(
+            f"Entropy bound (differences): "
+            f"{recommendation['delta_entropy_ratio_bound']:.3f}x"
+        )
+    click.echo(f"\n  {'Algorithm':<30} {'Ratio':>8} {'Encode':>12} {'Decode':>12}")
+    for estimate in recommendation["candidates"]:
+        click.echo(
+            f"{'*' if estimate['meets_constraints'] else ' '} "
+            f"{estimate['algorithm']:<30}"
+            f" {estimate['compression_ratio']:>7.3f}x"
+            f" {estimate['encode_mb_per_sec']:>7.1f} MB/s"
+            f" {estimate['decode_mb_per_sec']:>7.1f} MB/s"
+            f" ({estimate['source']} throughput)"
         )
 
+    if recommendation["recommended"] is None:
+        click.echo("\nNo algorithm meets the constraints", err=True)
+        ctx = click.get_current_context()
+        ctx.exit(1)
+    click.echo(f"\nRecommended: {recommendation['recommended']}")
+
+
+@cli.command()
+@click.option(
+    "--algorithm",
+    "-a",
+    multiple=True,
+    callback=validate_algorithms,
+    help="Algorithm(s) to benchmark (can be specified multiple times)",
+)
+@click.option(
+    "--pipeline",
+    "-p",
+    multiple=True,
+    callback=validate_pipelines,
+    help="Pipeline spec(s) to benchmark (can be specified multiple times)",
+)
+@click.option(
+    "--dataset",
+    "-d",
+    multiple=True,
+    callback=validate_datasets,
+    help="Dataset(s) to benchmark (can be specified multiple times)",
+)
+@click.option(
+    "--sizes",
+    "-s",
+    default=None,
+    callback=parse_sizes,
+    help="Input sizes, e.g. 4K,64K,1M (default: "
+    + ",".join(format_size(size).replace(" ", "") for size in DEFAULT_SCALING_SIZES)
+    + ")",
+)
+@click.option(
+    "--max-call-time",
+    default=DEFAULT_MAX_CALL_TIME,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="Skip larger sizes once encoding and decoding take longer than this many seconds",
+)
+@click.option(
+    "--output",
+    "-o",
+    default="size_scaling.json",
+    show_default=True,
+    type=click.Path(),
+    help="JSON file to write the curves to",
+)
+@click.option(
+    "--cache-dir",
+    default=".benchmark_cache",
+    help="Directory to store cached results",
+    type=click.Path(),
+)
+@click.option("--quiet", "-q", is_flag=True, help="Reduce output verbosity")
+@click.option(
+    "--time-budget",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Keep running trials until this many seconds are spent (default: 1.0)",
+)
+def scaling(
+    algorithm,
+    pipeline,
+    dataset,
+    sizes,
+    max_call_time,
+    output,
+    cache_dir,
+    quiet,
+    time_budget,
+):
+    """Measure throughput versus input size on prefixes of the datasets
+
+    Synthetic datasets are generated at every size; real datasets stop at
+    their own size. Delta-encoding and Markov-prediction algorithms only
+    accept continuous datasets, of which ar1-0.99 is the synthetic one.
+    """
+    pipelines = pipeline or []
+    if algorithm or not pipelines:
+        filtered_algorithms = filter_algorithms(algorithm) + pipelines
+    else:
+        filtered_algorithms = pipelines
+    timing_policy = {} if time_budget is None else {"time_budget": time_budget}
+    report = run_size_scaling(
+        filtered_algorithms,
+        filter_datasets(dataset),
+        sizes=sizes,
+        cache_dir=cache_dir,
+        timing_policy=timing_policy,
+        max_call_time=max_call_time,
+        verbose=not quiet,
+    )
+
+    if not report["curves"]:
+        click.echo(
+            "\nNo compatible dataset/algorithm pairs; nothing was measured", err=True
+        )
+    click.echo("\nThroughput versus input size (MB/s):")
+    for curve in report["curves"]:
+        click.echo(f"\n{curve['dataset']} + {curve['algorithm']}:")
+        click.echo(f"  {'Size':>8} {'Ratio':>8} {'Encode':>10} {'Decode':>10}")
+        for point in curve["points"]:
+            click.echo(
+                f"  {format_size(point['size']):>8}"
+                f" {point['compression_ratio']:>7.3f}x"
+                f" {point['encode_mb_per_sec']:>10.2f}"
+                f" {point['decode_mb_per_sec']:>10.2f}"
+            )
+        for prefix in ["encode", "decode"]:
+            fit = curve[f"{prefix}_fit"]
+            if fit:
+                click.echo(
+                    f"  {prefix.capitalize()} overhead per call:"
+                    f" {fit['overhead_time'] * 1e6:.1f} us,"
+                    f" asymptotic {fit['asymptotic_mb_per_sec']:.2f} MB/s"
+                )
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    click.echo(f"\nCurves written to {output}")
+
+
+@cli.command()
+@click.option(
+    "--algorithm",
+    "-a",
+    multiple=True,
+    required=True,
+    callback=validate_algorithms,
+    help="Algorithm(s) with native threading (can be specified multiple times)",
+)
+@click.option(
+    "--dataset",
+    "-d",
+    multiple=True,
+    callback=validate_datasets,
+    help="Dataset(s) to benchmark (can be specified multiple times)",
+)
+@click.option(
+    "--threads",
+    "-t",
+    "thread_counts",
+    default=None,
+    callback=parse_thread_counts,
+    help="Thread counts, e.g. 1,2,4,8 (default: powers of two up to the number of CPUs)",
+)
+@click.option(
+    "--output",
+    "-o",
+    default="thread_scaling.json",
+    show_default=True,
+    type=click.Path(),
+    help="JSON file to write the curves to",
+)
+@click.option(
+    "--cache-dir",
+    default=".benchmark_cache",
+    help="Directory to store cached results",
+    type=click.Path(),
+)
+@click.option("--quiet", "-q", is_flag=True, help="Reduce output verbosity")
+@click.option("--force", "-f", is_flag=True, help="Force re-run without using cache")
+@click.option(
+    "--time-budget",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Keep running trials until this many seconds are spent (default: 1.0)",
+)
+def threads(
+    algorithm, dataset, thread_counts, output, cache_dir, quiet, force, time_budget
+):
+    """Benchmark algorithms with native threading across thread counts"""
+    thread_counts = thread_counts or default_thread_counts()
+    variants = {}
+    selected_algorithms = []
+    for base in filter_algorithms(algorithm):
+        if "with_threads" not in base:
+            raise click.BadParameter(
+                f"{base['name']} has no native threading",
+                param_hint="'--algorithm'",
+            )
+        for count in thread_counts:
+            variant = make_threaded_algorithm(base, count)
+            variants[variant["name"]] = (base["name"], count)
+            selected_algorithms.append(variant)
+
+    timing_policy = {} if time_budget is None else {"time_budget": time_budget}
+    # Benchmarks run one at a time so that they do not compete for cores
+    results = run_benchmarks(
+        cache_dir=cache_dir,
+        verbose=not quiet,
+        selected_algorithms=selected_algorithms,
+        selected_datasets=filter_datasets(dataset),
+        force=force,
+        timing_policy=timing_policy,
+    )
+    scaling = compute_thread_scaling(results["results"], variants)
+
+    click.echo("\nThread scaling (speedup, efficiency):")
+    for curve in scaling:
+        click.echo(f"\n{curve['dataset']} + {curve['algorithm']}:")
+        click.echo(f"  {'Threads':>7} {'Encode':>30} {'Decode':>30}")
+        for point in curve["points"]:
+            click.echo(
+                f"  {point['threads']:>7}"
+                + "".join(
+                    f" {point[f'{prefix}_mb_per_sec']:>10.2f} MB/s"
+                    f" {point[f'{prefix}_speedup']:>5.2f}x"
+                    f" {point[f'{prefix}_efficiency']:>5.0%}"
+                    for prefix in ["encode", "decode"]
+                )
+            )
+
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "thread_counts": thread_counts,
+                "num_cpus": default_thread_counts()[-1],
+                "curves": scaling,
+                "results": results["results"],
+            },
+            f,
+            indent=2,
+        )
+    click.echo(f"\nCurves written to {output}")
+
+
+@cli.group(name="datasets")
+def datasets_group():
+    """Manage the local dataset store"""
+    pass
+
+
+@datasets_group.command()
+@click.option(
+    "--dataset",
+    "-d",
+    multiple=True,
+    callback=validate_datasets,
+    help="Dataset(s) to prefetch (can be specified multiple times, default: all)",
+)
+@click.option(
+    "--cache-dir",
+    default=".benchmark_cache",
+    help="Directory to store cached results",
+    type=click.Path(),
+)
+@click.option("--force", "-f", is_flag=True, help="Recreate datasets already stored")
+@click.option(
+    "--verify", is_flag=True, help="Check stored datasets against their sha256"
+)
+def prefetch(dataset, cache_dir, force, verify):
+    """Materialize datasets into the local dataset store"""
+    filtered_datasets = filter_datasets(dataset)
+    click.echo(f"Prefetching {len(filtered_datasets)} dataset(s) into {cache_dir}")
+    prefetch_datasets(filtered_datasets, cache_dir, force=force, verify=verify)
+
+
+@cli.group()
+def cache():
+    """Manage the local results cache"""
+    pass
+
+
+@cache.command()
+@click.option(
+    "--cache-dir",
+    default=".benchmark_cache",
+    help="Directory to store cached results",
+    type=click.Path(),
+)
+@click.option(
+    "--max-size",
+    callback=parse_size,
+    help="Size cap of the blob store, e.g. 10G (default: "
+    "BENCHCOMPRESS_BLOB_STORE_MAX_SIZE or 20G)",
+)
+def gc(cache_dir, max_size):
+    """Garbage-collect the compressed-blob store and report reclaimed space"""
+    with open_results_index(cache_dir) as conn:
+        stats = collect_garbage(conn, cache_dir, max_size=max_size)
+    click.echo(
+        f"Moved {stats['legacy_files']} legacy compressed.dat file(s) into the "
+        f"blob store, reclaiming {format_bytes(stats['legacy_bytes_reclaimed'])}"
+    )
+    click.echo(
+        f"Removed {stats['orphan_blobs']} unreferenced blob(s): "
+        f"{format_bytes(stats['orphan_bytes'])}"
+    )
+    if stats["stray_bytes"]:
+        click.echo(f"Removed stray files: {format_bytes(stats['stray_bytes'])}")
+    cap = get_max_blob_store_size() if max_size is None else max_size
+    click.echo(
+        f"Evicted {stats['evicted_blobs']} least recently used blob(s) to fit "
+        f"{format_size(cap)}: {format_bytes(stats['evicted_bytes'])}"
+    )
+    click.echo(
+        f"\nReclaimed {format_bytes(stats['reclaimed_bytes'])}; the blob store "
+        f"holds {stats['num_blobs']} blob(s), {format_bytes(stats['size'])}"
+    )
+
 
 def main():
     cli()
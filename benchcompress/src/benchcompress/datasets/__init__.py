@@ -1,5 +1,6 @@
 from .bernoulli import datasets as bernoulli_datasets
 from .gaussian import datasets as gaussian_datasets
+from .autoregressive import datasets as autoregressive_datasets
 from .ecephys import datasets as ecephys_datasets
 from .seismic import datasets as seismic_datasets
 from .ieeg import datasets as ieeg_datasets
@@ -8,6 +9,7 @@ from .fmri import datasets as fmri_datasets
 datasets_list = [
     bernoulli_datasets,
     gaussian_datasets,
+    autoregressive_datasets,
     ecephys_datasets,
     seismic_datasets,
     ieeg_datasets,
@@ -0,0 +1,54 @@
+import numpy as np
+import os
+from scipy.signal import lfilter
+
+
+SOURCE_FILE = "autoregressive/__init__.py"
+
+
+def _load_long_description():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    md_path = os.path.join(current_dir, "autoregressive.md")
+    with open(md_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+LONG_DESCRIPTION = _load_long_description()
+
+
+def create_ar1_quantized(
+    *, n_samples: int, phi: float, stddev: float, seed: int
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, stddev, n_samples)
+    # x[t] = phi * x[t - 1] + noise[t]
+    x = lfilter([1.0], [1.0, -phi], noise)
+    x = np.clip(np.round(x), -32768, 32767).astype(np.int16)
+    return x
+
+
+tags = [
+    "autoregressive",
+    "integer",
+    "continuous",
+    "timeseries",
+    "1d",
+    "synthetic",
+]
+
+datasets = [
+    {
+        "name": "ar1-0.99",
+        "version": "1",
+        "create": lambda: create_ar1_quantized(
+            n_samples=1_000_000, phi=0.99, stddev=10, seed=0
+        ),
+        "create_sized": lambda n_samples: create_ar1_quantized(
+            n_samples=n_samples, phi=0.99, stddev=10, seed=0
+        ),
+        "description": "Rounded AR(1) process with φ=0.99 and innovation σ=10.",
+        "tags": tags,
+        "source_file": SOURCE_FILE,
+        "long_description": LONG_DESCRIPTION,
+    },
+]
@@ -28,6 +28,9 @@ datasets = [
         "name": "bernoulli-0.1",
         "version": "3",
         "create": lambda: create_bernoulli(n_samples=1_000_000, p=0.1, seed=0),
+        "create_sized": lambda n_samples: create_bernoulli(
+            n_samples=n_samples, p=0.1, seed=0
+        ),
         "description": "Binary sequence with 10% probability of ones.",
         "tags": tags,
         "source_file": SOURCE_FILE,
@@ -37,6 +40,9 @@ datasets = [
         "name": "bernoulli-0.2",
         "version": "3",
         "create": lambda: create_bernoulli(n_samples=1_000_000, p=0.2, seed=0),
+        "create_sized": lambda n_samples: create_bernoulli(
+            n_samples=n_samples, p=0.2, seed=0
+        ),
         "description": "Binary sequence with 20% probability of ones.",
         "tags": tags,
         "source_file": SOURCE_FILE,
@@ -46,6 +52,9 @@ datasets = [
         "name": "bernoulli-0.3",
         "version": "3",
         "create": lambda: create_bernoulli(n_samples=1_000_000, p=0.3, seed=0),
+        "create_sized": lambda n_samples: create_bernoulli(
+            n_samples=n_samples, p=0.3, seed=0
+        ),
         "description": "Binary sequence with 30% probability of ones.",
         "tags": tags,
         "source_file": SOURCE_FILE,
@@ -55,6 +64,9 @@ datasets = [
         "name": "bernoulli-0.4",
         "version": "3",
         "create": lambda: create_bernoulli(n_samples=1_000_000, p=0.4, seed=0),
+        "create_sized": lambda n_samples: create_bernoulli(
+            n_samples=n_samples, p=0.4, seed=0
+        ),
         "description": "Binary sequence with 40% probability of ones.",
         "tags": tags,
         "source_file": SOURCE_FILE,
@@ -64,6 +76,9 @@ datasets = [
         "name": "bernoulli-0.5",
         "version": "3",
         "create": lambda: create_bernoulli(n_samples=1_000_000, p=0.5, seed=0),
+        "create_sized": lambda n_samples: create_bernoulli(
+            n_samples=n_samples, p=0.5, seed=0
+        ),
         "description": "Binary sequence with 50% probability of ones and 50% probability of zeros.",
         "tags": tags,
         "source_file": SOURCE_FILE,
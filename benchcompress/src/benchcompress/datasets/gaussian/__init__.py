@@ -47,6 +47,9 @@ datasets = [
         "create": lambda: create_gaussian_quantized(
             n_samples=1_000_000, stddev=1, seed=0
         ),
+        "create_sized": lambda n_samples: create_gaussian_quantized(
+            n_samples=n_samples, stddev=1, seed=0
+        ),
         "description": "Rounded Gaussian integers with σ=1.",
         "tags": tags_quantized,
         "source_file": SOURCE_FILE,
@@ -58,6 +61,9 @@ datasets = [
         "create": lambda: create_gaussian_quantized(
             n_samples=1_000_000, stddev=2, seed=0
         ),
+        "create_sized": lambda n_samples: create_gaussian_quantized(
+            n_samples=n_samples, stddev=2, seed=0
+        ),
         "description": "Rounded Gaussian integers with σ=2.",
         "tags": tags_quantized,
         "source_file": SOURCE_FILE,
@@ -69,6 +75,9 @@ datasets = [
         "create": lambda: create_gaussian_quantized(
             n_samples=1_000_000, stddev=3, seed=0
         ),
+        "create_sized": lambda n_samples: create_gaussian_quantized(
+            n_samples=n_samples, stddev=3, seed=0
+        ),
         "description": "Rounded Gaussian integers with σ=3.",
         "tags": tags_quantized,
         "source_file": SOURCE_FILE,
@@ -80,6 +89,9 @@ datasets = [
         "create": lambda: create_gaussian_quantized(
             n_samples=1_000_000, stddev=5, seed=0
         ),
+        "create_sized": lambda n_samples: create_gaussian_quantized(
+            n_samples=n_samples, stddev=5, seed=0
+        ),
         "description": "Rounded Gaussian integers with σ=5.",
         "tags": tags_quantized,
         "source_file": SOURCE_FILE,
@@ -91,6 +103,9 @@ datasets = [
         "create": lambda: create_gaussian_quantized(
             n_samples=1_000_000, stddev=8, seed=0
         ),
+        "create_sized": lambda n_samples: create_gaussian_quantized(
+            n_samples=n_samples, stddev=8, seed=0
+        ),
         "description": "Rounded Gaussian integers with σ=8.",
         "tags": tags_quantized,
         "source_file": SOURCE_FILE,
@@ -100,6 +115,9 @@ datasets = [
         "name": "gaussian-flt1",
         "version": "1",
         "create": lambda: create_gaussian_float(n_samples=1_000_000, stddev=8, seed=0),
+        "create_sized": lambda n_samples: create_gaussian_float(
+            n_samples=n_samples, stddev=8, seed=0
+        ),
         "description": "Floating point Gaussian numbers with σ=1.",
         "tags": tags_float,
         "source_file": SOURCE_FILE,
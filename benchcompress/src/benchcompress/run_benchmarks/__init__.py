@@ -1 +1,2 @@
 from .run_benchmarks import run_benchmarks
+from .recommend import recommend_algorithm
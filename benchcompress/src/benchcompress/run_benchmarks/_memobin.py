@@ -1,6 +1,204 @@
+import os
 import json
+import threading
 import requests
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TypeVar, Union
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_MEMOBIN_BASE_URL = "https://tempory.net/f/memobin"
+DEFAULT_MEMOBIN_UPLOAD_API_URL = "https://hub.tempory.net/api/uploadFile"
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10.0, 120.0)
+
+# Retries of a request failing with a connection error or a 5xx/429 status,
+# after backoff_factor * 2 ** (retry - 1) seconds
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_FACTOR = 0.5
+
+# Maximum number of requests in flight (and pooled connections)
+DEFAULT_MAX_CONCURRENCY = 8
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MemobinClient:
+    """HTTP client for memobin, shared by all memobin requests.
+
+    Requests go through one requests.Session, so connections are kept alive
+    and pooled, with a timeout, and are retried with exponential backoff on
+    connection errors and 5xx/429 responses. map runs requests (or any
+    function making them) on a bounded pool of threads, so that at most
+    max_concurrency requests are in flight.
+
+    The session and the thread pool belong to the process that created them.
+    A forked child (e.g. a benchmark worker) gets a new session on its first
+    request, so that it never writes to the parent's pooled connections.
+
+    Args:
+        timeout: Timeout in seconds, or (connect, read) timeouts
+        max_retries: Maximum number of retries of a request
+        backoff_factor: Base delay of the exponential backoff, in seconds
+        max_concurrency: Maximum number of concurrent requests in map
+    """
+
+    def __init__(
+        self,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._max_retries = max_retries
+        self._backoff_factor = backoff_factor
+        self._pid = os.getpid()
+        self.session = self._create_session()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _create_session(self) -> requests.Session:
+        retry = Retry(
+            total=self._max_retries,
+            backoff_factor=self._backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # Uploads (POST for the signed URL, then PUT) are safe to repeat
+            allowed_methods=None,
+            # Return the last response instead of raising, so that callers
+            # handle status codes as without retries
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.max_concurrency,
+            pool_maxsize=self.max_concurrency,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _check_process(self) -> None:
+        # The sockets of the session are shared with the parent after a fork.
+        # They are dropped, not closed, since closing a TLS connection writes
+        # to it. The parent's threads and locks do not carry over either.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self.session = self._create_session()
+            self._executor = None
+            self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request through the pooled session, with timeout and retries.
+
+        Args:
+            method: HTTP method
+            url: URL
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            The response
+        """
+        self._check_process()
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Call fn on each item concurrently, with at most max_concurrency calls at once.
+
+        Args:
+            fn: Function making requests through this client
+            items: Items to call fn on
+
+        Returns:
+            Results in the order of items; the first exception is raised
+        """
+        self._check_process()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="memobin",
+                )
+        return list(self._executor.map(fn, items))
+
+    def close(self) -> None:
+        """Close the pooled connections and the thread pool."""
+        self._check_process()
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        self.session.close()
+
+
+_default_client: Optional[MemobinClient] = None
+_default_client_lock = threading.Lock()
+
+
+def _reset_default_client_lock() -> None:
+    # Another thread may hold the lock when the process forks
+    global _default_client_lock
+    _default_client_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_default_client_lock)
+
+
+def get_memobin_client() -> MemobinClient:
+    """Get the client used by the memobin functions, created on first use.
+
+    Timeouts and retries can be set with the MEMOBIN_TIMEOUT (seconds) and
+    MEMOBIN_MAX_RETRIES environment variables.
+
+    Returns:
+        The shared client
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            timeout = os.environ.get("MEMOBIN_TIMEOUT")
+            max_retries = os.environ.get("MEMOBIN_MAX_RETRIES")
+            _default_client = MemobinClient(
+                timeout=float(timeout) if timeout else DEFAULT_TIMEOUT,
+                max_retries=(int(max_retries) if max_retries else DEFAULT_MAX_RETRIES),
+            )
+        return _default_client
+
+
+def set_memobin_client(client: Optional[MemobinClient]) -> None:
+    """Replace the client used by the memobin functions (None: default client)."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+def get_memobin_base_url() -> str:
+    """Get the base URL of memobin files.
+
+    Set the MEMOBIN_BASE_URL environment variable to use another host, e.g. a
+    local stand-in server for testing.
+
+    Returns:
+        The base URL, without trailing slash
+    """
+    return os.environ.get("MEMOBIN_BASE_URL", DEFAULT_MEMOBIN_BASE_URL).rstrip("/")
+
+
+def get_memobin_upload_api_url() -> str:
+    """Get the URL of the API signing memobin uploads.
+
+    Set the MEMOBIN_UPLOAD_API_URL environment variable to use another host.
+
+    Returns:
+        The URL
+    """
+    return os.environ.get("MEMOBIN_UPLOAD_API_URL", DEFAULT_MEMOBIN_UPLOAD_API_URL)
 
 
 def create_signed_upload_url(
@@ -21,15 +219,15 @@ def create_signed_upload_url(
         ValueError: If the URL prefix is invalid
         requests.RequestException: If the API request fails
     """
-    prefix = "https://tempory.net/f/memobin/"
+    prefix = get_memobin_base_url() + "/"
     if not url.startswith(prefix):
         raise ValueError("Invalid url. Does not have proper prefix")
 
     file_path = url[len(prefix) :]
-    tempory_api_url = "https://hub.tempory.net/api/uploadFile"
 
-    response = requests.post(
-        tempory_api_url,
+    response = get_memobin_client().request(
+        "POST",
+        get_memobin_upload_api_url(),
         headers={
             "Content-Type": "application/json",
             "Authorization": f"Bearer {memobin_api_key}",
@@ -76,8 +274,21 @@ def construct_memobin_url(
     Returns:
         The constructed memobin URL
     """
-    path = f"{alg_name}/{dataset_name}/{alg_version}/{dataset_version}/{system_version}/{file_type}"
-    return f"https://tempory.net/f/memobin/{path}"
+    # Pipeline specs contain characters that are not allowed in URL paths
+    path = f"{quote(alg_name, safe='')}/{quote(dataset_name, safe='')}/{alg_version}/{dataset_version}/{system_version}/{file_type}"
+    return f"{get_memobin_base_url()}/{path}"
+
+
+def construct_manifest_url(system_version: str) -> str:
+    """Construct the memobin URL of the manifest of results for a system version.
+
+    Args:
+        system_version: Version of the system
+
+    Returns:
+        The constructed memobin URL
+    """
+    return f"{get_memobin_base_url()}/manifests/{system_version}/manifest.json.gz"
 
 
 def construct_dataset_url(
@@ -94,7 +305,7 @@ def construct_dataset_url(
         The constructed memobin URL for the dataset
     """
     path = f"datasets/{dataset_name}/{dataset_version}/{dataset_name}-{dataset_version}.{format}"
-    return f"https://tempory.net/f/memobin/{path}"
+    return f"{get_memobin_base_url()}/{path}"
 
 
 def upload_to_memobin(
@@ -122,8 +333,8 @@ def upload_to_memobin(
 
     upload_url = create_signed_upload_url(url, size, "benchcompress", memobin_api_key)
 
-    response = requests.put(
-        upload_url, data=data_bytes, headers={"Content-Type": content_type}
+    response = get_memobin_client().request(
+        "PUT", upload_url, data=data_bytes, headers={"Content-Type": content_type}
     )
 
     if not response.ok:
@@ -140,7 +351,7 @@ def exists_in_memobin(url: str) -> bool:
         True if the file exists, False otherwise
     """
     try:
-        response = requests.head(url)
+        response = get_memobin_client().request("HEAD", url)
         return (
             200 <= response.status_code < 300
         )  # Any 2xx status code indicates success
@@ -163,7 +374,7 @@ def download_from_memobin(url: str, as_json: bool = True) -> Optional[dict | byt
     """
     response = None
     try:
-        response = requests.get(url)
+        response = get_memobin_client().request("GET", url)
         if response.status_code == 404:
             return None
         response.raise_for_status()
@@ -0,0 +1,184 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import time
+import numpy as np
+from .benchmark_timing import DEFAULT_TIMING_POLICY
+from .sampling import DEFAULT_NUM_CHUNKS, DEFAULT_CHUNK_SAMPLES, sample_chunks
+
+# Chunks drawn by run_estimate_benchmark. More chunks than for a
+# recommendation, since the error bars come from the spread across chunks, and
+# larger ones, since codecs compress small inputs worse (shorter history,
+# different parameters for small sources), which biases the ratio low.
+DEFAULT_ESTIMATE_NUM_CHUNKS = 2 * DEFAULT_NUM_CHUNKS
+DEFAULT_ESTIMATE_CHUNK_SAMPLES = 4 * DEFAULT_CHUNK_SAMPLES
+
+
+def measure_chunks(
+    chunks: List[np.ndarray],
+    algorithm_name: str,
+    encode_fn: Callable,
+    decode_fn: Callable,
+) -> Dict[str, np.ndarray]:
+    """Encode and decode each chunk separately, timing every call.
+
+    One untimed encode/decode of the first chunk is run first (which also
+    triggers any JIT compilation), and every decoded chunk is checked against
+    the original.
+
+    Args:
+        chunks: Sampled chunks of an array
+        algorithm_name: Name of the algorithm
+        encode_fn: Compression function
+        decode_fn: Decompression function
+
+    Returns:
+        Dictionary of per-chunk arrays: original_sizes and compressed_sizes
+        (bytes), encode_times and decode_times (seconds)
+
+    Raises:
+        ValueError: If a chunk does not decode to the original data
+    """
+    decode_fn(encode_fn(chunks[0]), str(chunks[0].dtype), chunks[0].shape)
+
+    measurements: Dict[str, List[float]] = {
+        "original_sizes": [],
+        "compressed_sizes": [],
+        "encode_times": [],
+        "decode_times": [],
+    }
+    for chunk in chunks:
+        start = time.perf_counter()
+        encoded = encode_fn(chunk)
+        measurements["encode_times"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        decoded = decode_fn(encoded, str(chunk.dtype), chunk.shape)
+        measurements["decode_times"].append(time.perf_counter() - start)
+
+        if not np.array_equal(chunk, decoded):
+            raise ValueError(f"Decompression verification failed for {algorithm_name}")
+        measurements["original_sizes"].append(chunk.nbytes)
+        measurements["compressed_sizes"].append(len(encoded))
+    return {key: np.array(values) for key, values in measurements.items()}
+
+
+def _bootstrap_ratio_ci(
+    numerators: np.ndarray,
+    denominators: np.ndarray,
+    num_bootstrap: int,
+    confidence: float,
+) -> Tuple[float, float]:
+    """Bootstrap confidence interval of a ratio of sums over chunks."""
+    if len(numerators) < 2:
+        ratio = float(numerators.sum() / denominators.sum())
+        return ratio, ratio
+    rng = np.random.default_rng(0)
+    indices = rng.integers(0, len(numerators), size=(num_bootstrap, len(numerators)))
+    ratios = numerators[indices].sum(axis=1) / denominators[indices].sum(axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(ratios, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def run_estimate_benchmark(
+    data: np.ndarray,
+    algorithm_name: str,
+    encode_fn: Callable,
+    decode_fn: Callable,
+    verbose: bool = True,
+    timing_policy: Optional[Dict[str, Any]] = None,
+    num_chunks: int = DEFAULT_ESTIMATE_NUM_CHUNKS,
+    chunk_samples: int = DEFAULT_ESTIMATE_CHUNK_SAMPLES,
+) -> Dict[str, Any]:
+    """Estimate compression ratio and throughput from a sample of chunks.
+
+    Chunks are drawn by stratified sampling (see sample_chunks) and encoded
+    separately. The ratio and throughputs are extrapolated to the whole array
+    as ratios of sums over the chunks (total bytes over total compressed
+    bytes or total time), with bootstrap confidence intervals obtained by
+    resampling the chunks, so that the error bars reflect how much the data
+    varies across the array. Since each chunk is compressed on its own, the
+    ratio of codecs that benefit from a long history tends to be
+    underestimated; the error bars do not account for this bias.
+
+    Args:
+        data: Input numpy array
+        algorithm_name: Name of the algorithm being benchmarked
+        encode_fn: Compression function
+        decode_fn: Decompression function
+        verbose: Whether to print progress messages
+        timing_policy: Optional overrides for DEFAULT_TIMING_POLICY (only
+            num_bootstrap and confidence are used)
+        num_chunks: Number of chunks to sample
+        chunk_samples: Number of samples per chunk
+
+    Returns:
+        Result dictionary with the same main fields as
+        run_compression_benchmark (sizes and times extrapolated to the whole
+        array), compression_ratio_ci_low/high, and estimated set to True
+    """
+    policy = dict(DEFAULT_TIMING_POLICY)
+    if timing_policy is not None:
+        policy.update(timing_policy)
+    num_bootstrap = policy["num_bootstrap"]
+    confidence = policy["confidence"]
+
+    chunks = sample_chunks(data, num_chunks, chunk_samples)
+    if verbose:
+        print(f"  Estimating from {len(chunks)} chunk(s) of shape {chunks[0].shape}...")
+    m = measure_chunks(chunks, algorithm_name, encode_fn, decode_fn)
+
+    original_size = data.nbytes
+    sampled_size = int(m["original_sizes"].sum())
+    compression_ratio = float(sampled_size / m["compressed_sizes"].sum())
+    ratio_ci_low, ratio_ci_high = _bootstrap_ratio_ci(
+        m["original_sizes"], m["compressed_sizes"], num_bootstrap, confidence
+    )
+    result: Dict[str, Any] = {
+        "compression_ratio": compression_ratio,
+        "compression_ratio_ci_low": ratio_ci_low,
+        "compression_ratio_ci_high": ratio_ci_high,
+    }
+    for prefix in ["encode", "decode"]:
+        times = m[f"{prefix}_times"]
+        # Sizes in MB, so that sum(sizes_mb) / sum(times) is the throughput
+        sizes_mb = m["original_sizes"] / (1024 * 1024)
+        ci_low, ci_high = _bootstrap_ratio_ci(
+            sizes_mb, times, num_bootstrap, confidence
+        )
+        result.update(
+            {
+                f"{prefix}_time": float(times.sum()) * original_size / sampled_size,
+                f"{prefix}_mb_per_sec": float(sizes_mb.sum() / times.sum()),
+                f"{prefix}_mb_per_sec_ci_low": ci_low,
+                f"{prefix}_mb_per_sec_ci_high": ci_high,
+            }
+        )
+
+    if verbose:
+        print(
+            f"    Compression ratio: {compression_ratio:.2f}x "
+            f"(CI {ratio_ci_low:.2f}-{ratio_ci_high:.2f})"
+        )
+        for prefix in ["encode", "decode"]:
+            print(
+                f"    {prefix.capitalize()} throughput: "
+                f"{result[f'{prefix}_mb_per_sec']:.2f} MB/s "
+                f"(CI {result[f'{prefix}_mb_per_sec_ci_low']:.2f}-"
+                f"{result[f'{prefix}_mb_per_sec_ci_high']:.2f})"
+            )
+
+    result.update(
+        {
+            "original_size": original_size,
+            "compressed_size": int(round(original_size / compression_ratio)),
+            "array_shape": data.shape,
+            "array_dtype": str(data.dtype),
+            "timestamp": time.time(),
+            "cache_status": "new",
+            "estimated": True,
+            "estimate_num_chunks": len(chunks),
+            "estimate_chunk_shape": chunks[0].shape,
+            "estimate_sampled_size": sampled_size,
+        }
+    )
+    return result
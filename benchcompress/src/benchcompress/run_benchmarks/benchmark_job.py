@@ -0,0 +1,166 @@
+import os
+import time
+from typing import Any, Dict, Optional
+import numpy as np
+
+from ._memobin import construct_memobin_url, upload_to_memobin
+from .upload_dataset import upload_dataset_to_memobin
+from .cache_management import load_cached_encoding, save_result_to_cache
+from .benchmark_timing import run_compression_benchmark, run_decode_benchmark
+from .benchmark_estimate import run_estimate_benchmark
+
+
+def run_benchmark_job(
+    dataset: Dict[str, Any],
+    algorithm: Dict[str, Any],
+    data: np.ndarray,
+    *,
+    cache_dir: str,
+    system_version: str,
+    verbose: bool = True,
+    timing_policy: Optional[Dict[str, Any]] = None,
+    estimate: bool = False,
+    decode_only: bool = False,
+) -> Dict[str, Any]:
+    """Benchmark one algorithm on one materialized dataset and cache the result.
+
+    This is the unit of work shared by the serial and the parallel runners.
+    With estimate, the result is extrapolated from a sample of chunks (see
+    run_estimate_benchmark) and is cached locally only, flagged as estimated.
+    With decode_only, the cached compressed data of the full result is
+    decoded and verified again and only the decode fields of the result are
+    updated; pairs without cached compressed data are benchmarked in full.
+
+    Args:
+        dataset: Dataset dictionary
+        algorithm: Algorithm dictionary
+        data: The materialized dataset array
+        cache_dir: Directory to store cached results
+        system_version: Version of the benchmarking system
+        verbose: Whether to print progress messages
+        timing_policy: Optional overrides for the default timing policy
+        estimate: Whether to estimate the result from sampled chunks
+        decode_only: Whether to rerun only decoding on cached compressed data
+
+    Returns:
+        Benchmark result dictionary. A result uploaded to memobin has
+        memobin_uploaded set to True; the key is not part of the uploaded or
+        cached result and should be popped by the caller.
+    """
+    alg_name = algorithm["name"]
+    memobin_api_key = os.environ.get("MEMOBIN_API_KEY")
+    # Estimates are for local triage and are never shared
+    upload_enabled = os.environ.get("UPLOAD_TO_MEMOBIN") == "1" and not estimate
+
+    print(f"  Running benchmark for {alg_name} on {dataset['name']}...")
+
+    # Upload dataset to memobin if enabled
+    if memobin_api_key and upload_enabled:
+        try:
+            upload_dataset_to_memobin(
+                data,
+                dataset["name"],
+                dataset["version"],
+                memobin_api_key,
+                cache_dir,
+                verbose,
+            )
+        except Exception as e:
+            print(f"  Warning: Failed to upload dataset to memobin: {str(e)}")
+
+    cached = None
+    if decode_only:
+        cached = load_cached_encoding(
+            cache_dir,
+            dataset["name"],
+            alg_name,
+            algorithm["version"],
+            dataset["version"],
+            system_version,
+        )
+        if cached is None:
+            print("  No cached compressed data, running the full benchmark")
+
+    # Run the benchmark
+    if estimate:
+        result = run_estimate_benchmark(
+            data,
+            alg_name,
+            algorithm["encode"],
+            algorithm["decode"],
+            verbose,
+            timing_policy=timing_policy,
+        )
+        encoded = None
+    elif cached is not None:
+        cached_result, encoded = cached
+        print("  Decoding cached compressed data (encode fields are kept)")
+        result = {
+            **cached_result,
+            **run_decode_benchmark(
+                data,
+                encoded,
+                alg_name,
+                algorithm["decode"],
+                verbose,
+                timing_policy=timing_policy,
+                decode_range_fn=algorithm.get("decode_range"),
+            ),
+            # When the encode fields were measured
+            "encode_timestamp": cached_result.get(
+                "encode_timestamp", cached_result["timestamp"]
+            ),
+            "timestamp": time.time(),
+            "cache_status": "new",
+        }
+    else:
+        result, encoded = run_compression_benchmark(
+            data,
+            alg_name,
+            algorithm["encode"],
+            algorithm["decode"],
+            verbose,
+            timing_policy=timing_policy,
+            decode_range_fn=algorithm.get("decode_range"),
+        )
+
+    # Add metadata to result
+    result.update(
+        {
+            "dataset": dataset["name"],
+            "algorithm": alg_name,
+            "algorithm_version": algorithm["version"],
+            "dataset_version": dataset["version"],
+            "system_version": system_version,
+            "threads": algorithm.get("threads", 1),
+        }
+    )
+
+    # Save result and compressed data
+    digest = save_result_to_cache(result, encoded, cache_dir)
+    print(f"  Results saved to: {cache_dir}")
+    if digest is not None and verbose:
+        print(f"  Compressed data: blob {digest}")
+
+    # Upload to memobin if enabled
+    if memobin_api_key and upload_enabled:
+        try:
+            memobin_url = construct_memobin_url(
+                alg_name,
+                dataset["name"],
+                algorithm["version"],
+                dataset["version"],
+                system_version,
+            )
+            upload_to_memobin(
+                {"result": result},
+                memobin_url,
+                memobin_api_key,
+            )
+            result["memobin_uploaded"] = True
+            if verbose:
+                print("  Successfully uploaded to memobin")
+        except Exception as e:
+            print(f"  Warning: Failed to upload to memobin: {str(e)}")
+
+    return result
@@ -0,0 +1,134 @@
+import os
+import multiprocessing
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, if it can be determined."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss_bytes() -> Optional[int]:
+    """High-water mark of the resident set size of this process."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    if os.uname().sysname == "Darwin":
+        return max_rss
+    return max_rss * 1024
+
+
+def _python_peak_bytes(operation: Callable, args: tuple) -> int:
+    tracemalloc.start()
+    try:
+        operation(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _touch_pages(x: np.ndarray) -> None:
+    """Read every page of an array, so that it is resident in this process."""
+    if x.size == 0:
+        return
+    if x.flags.c_contiguous or x.flags.f_contiguous:
+        flat = x.reshape(-1, order="A").view(np.uint8)
+        flat[:: os.sysconf("SC_PAGE_SIZE")].sum()
+    else:
+        np.count_nonzero(x)
+
+
+def _measure_in_child(conn, operation: Callable, args: tuple) -> None:
+    try:
+        # Pages of memory-mapped or shared-memory inputs only count toward the
+        # RSS once touched, so they are touched before the baseline is taken.
+        # Otherwise the whole input would count as memory of the operation.
+        for arg in args:
+            if isinstance(arg, np.ndarray):
+                _touch_pages(arg)
+        # The RSS high-water mark of a freshly forked process starts at its
+        # current RSS, so the difference is the peak used by the operation
+        baseline = _current_rss_bytes()
+        if baseline is None:
+            baseline = _max_rss_bytes()
+        operation(*args)
+        max_rss = _max_rss_bytes()
+        rss_delta = None
+        if baseline is not None and max_rss is not None:
+            rss_delta = max(0, max_rss - baseline)
+
+        # tracemalloc has its own memory overhead, so it gets a separate run
+        python_peak = _python_peak_bytes(operation, args)
+        conn.send({"peak_rss_bytes": rss_delta, "peak_python_bytes": python_peak})
+    except Exception as e:
+        conn.send({"error": repr(e)})
+    finally:
+        conn.close()
+
+
+def measure_peak_memory(operation: Callable, *args) -> Dict[str, Any]:
+    """Measure the peak memory used by a single call of an operation.
+
+    The operation is run in a forked child process, so that the RSS
+    high-water mark reflects only this operation and not earlier work of the
+    benchmark process. Two quantities are measured:
+
+    - peak_rss_bytes: growth of the resident set size, which includes memory
+      allocated inside C libraries. Array arguments are made resident
+      before the baseline, so memory-mapped or shared-memory inputs are
+      not counted.
+    - peak_python_bytes: peak of allocations traced by tracemalloc (Python
+      objects and NumPy buffers)
+
+    peak_bytes is the larger of the two. Where fork is not available, the
+    operation runs in this process and only tracemalloc is used.
+
+    Args:
+        operation: Function to measure
+        *args: Arguments to pass to the operation
+
+    Returns:
+        Dictionary with peak_bytes, peak_rss_bytes (None if unavailable) and
+        peak_python_bytes
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=_measure_in_child, args=(child_conn, operation, args)
+        )
+        process.start()
+        child_conn.close()
+        try:
+            measurement = parent_conn.recv()
+        except EOFError:
+            measurement = {"error": f"exit code {process.exitcode}"}
+        process.join()
+        if "error" in measurement:
+            raise RuntimeError(
+                f"Memory measurement failed in child process: {measurement['error']}"
+            )
+    else:
+        measurement = {
+            "peak_rss_bytes": None,
+            "peak_python_bytes": _python_peak_bytes(operation, args),
+        }
+
+    measurement["peak_bytes"] = max(
+        measurement["peak_rss_bytes"] or 0, measurement["peak_python_bytes"]
+    )
+    return measurement
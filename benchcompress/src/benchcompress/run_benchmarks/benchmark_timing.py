@@ -1,87 +1,298 @@
-from typing import Any, Tuple, Callable, Dict
-from statistics import median
+from typing import Any, Tuple, Callable, Dict, Optional
 import time
 import numpy as np
+from .benchmark_memory import measure_peak_memory
+
+
+# Default policy for run_timed_trials. Trials are repeated until both
+# min_trials and time_budget (seconds) are reached, but never more than
+# max_trials times.
+DEFAULT_TIMING_POLICY = {
+    "warmup_iterations": 1,
+    "min_trials": 5,
+    "max_trials": 1000,
+    "time_budget": 1.0,
+    "num_bootstrap": 1000,
+    "confidence": 0.95,
+}
+
+# Number of samples read per random-access window (the chunk size requested
+# by the web UI's timeseries client)
+DEFAULT_RANDOM_ACCESS_WINDOW = 100_000
+
+# Trials slower than median + OUTLIER_THRESHOLD * (scaled MAD) are treated as
+# outliers (e.g. preemption or page faults) and excluded from the statistics
+OUTLIER_THRESHOLD = 5.0
+
+
+def _median_absolute_deviation(times: np.ndarray) -> float:
+    return float(np.median(np.abs(times - np.median(times))))
+
+
+def _bootstrap_median_ci(
+    times: np.ndarray, num_bootstrap: int, confidence: float
+) -> Tuple[float, float]:
+    """Bootstrap confidence interval for the median of the trial times."""
+    if len(times) < 2:
+        return float(times[0]), float(times[0])
+    rng = np.random.default_rng(0)
+    samples = rng.choice(times, size=(num_bootstrap, len(times)), replace=True)
+    medians = np.median(samples, axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(medians, [alpha, 1 - alpha])
+    return float(low), float(high)
 
 
 def run_timed_trials(
-    data: np.ndarray, operation: Callable, *args
-) -> Tuple[float, float, Any]:
-    """Run multiple trials of an operation until total time exceeds 1 second.
+    data: np.ndarray,
+    operation: Callable,
+    *args,
+    timing_policy: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Any]:
+    """Time repeated trials of an operation and summarize them robustly.
+
+    The operation is first run warmup_iterations times without timing. Timed
+    trials are then repeated until at least min_trials have been run and their
+    total time exceeds time_budget, or until max_trials is reached.
 
     Args:
         data: Input numpy array for calculating throughput
         operation: Function to benchmark
         *args: Arguments to pass to the operation
+        timing_policy: Optional overrides for DEFAULT_TIMING_POLICY
 
     Returns:
         Tuple containing:
-        - median_time: Median execution time across trials
-        - mb_per_sec: Throughput in MB/s
+        - stats: Dictionary with median_time, min_time, mad_time (seconds),
+          num_trials, num_outliers, mb_per_sec (from the median time),
+          mb_per_sec_best (from the min time) and mb_per_sec_ci_low/high
+          (bootstrap confidence interval of the median throughput)
         - result: Result from the last trial execution
     """
-    times = []
-    total_time = 0
+    policy = dict(DEFAULT_TIMING_POLICY)
+    if timing_policy is not None:
+        policy.update(timing_policy)
     array_size_mb = data.nbytes / (1024 * 1024)  # Convert to MB
 
     ret = None
-    while total_time < 1.0:
+    for _ in range(policy["warmup_iterations"]):
+        ret = operation(*args)
+
+    times = []
+    total_time = 0
+    while len(times) < policy["max_trials"] and (
+        len(times) < policy["min_trials"] or total_time < policy["time_budget"]
+    ):
         start_time = time.perf_counter()
         ret = operation(*args)  # Execute operation
         trial_time = time.perf_counter() - start_time
         times.append(trial_time)
         total_time += trial_time
 
-    median_time = median(times)
-    mb_per_sec = array_size_mb / median_time
-    return median_time, mb_per_sec, ret
+    all_times = np.array(times)
+    # 1.4826 scales the MAD to the standard deviation for normal data
+    cutoff = np.median(all_times) + OUTLIER_THRESHOLD * 1.4826 * (
+        _median_absolute_deviation(all_times)
+    )
+    kept_times = all_times[all_times <= cutoff]
 
+    median_time = float(np.median(kept_times))
+    min_time = float(np.min(kept_times))
+    ci_low_time, ci_high_time = _bootstrap_median_ci(
+        kept_times, policy["num_bootstrap"], policy["confidence"]
+    )
+    stats = {
+        "median_time": median_time,
+        "min_time": min_time,
+        "mad_time": _median_absolute_deviation(kept_times),
+        "num_trials": len(all_times),
+        "num_outliers": len(all_times) - len(kept_times),
+        "mb_per_sec": array_size_mb / median_time,
+        "mb_per_sec_best": array_size_mb / min_time,
+        # A slower time gives a lower throughput
+        "mb_per_sec_ci_low": array_size_mb / ci_high_time,
+        "mb_per_sec_ci_high": array_size_mb / ci_low_time,
+    }
+    return stats, ret
 
-def run_compression_benchmark(
+
+def _timing_result_fields(prefix: str, stats: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        f"{prefix}_time": stats["median_time"],
+        f"{prefix}_time_min": stats["min_time"],
+        f"{prefix}_time_mad": stats["mad_time"],
+        f"{prefix}_num_trials": stats["num_trials"],
+        f"{prefix}_num_outliers": stats["num_outliers"],
+        f"{prefix}_mb_per_sec": stats["mb_per_sec"],
+        f"{prefix}_mb_per_sec_best": stats["mb_per_sec_best"],
+        f"{prefix}_mb_per_sec_ci_low": stats["mb_per_sec_ci_low"],
+        f"{prefix}_mb_per_sec_ci_high": stats["mb_per_sec_ci_high"],
+    }
+
+
+def _rescale_stats(stats: Dict[str, Any], nbytes: int) -> Dict[str, Any]:
+    """Timing stats with the throughput relative to nbytes instead."""
+    # Ratio of nbytes to the size the throughput was computed for
+    scale = nbytes / (1024 * 1024) / (stats["mb_per_sec"] * stats["median_time"])
+    return {
+        **stats,
+        **{
+            key: stats[key] * scale
+            for key in [
+                "mb_per_sec",
+                "mb_per_sec_best",
+                "mb_per_sec_ci_low",
+                "mb_per_sec_ci_high",
+            ]
+        },
+    }
+
+
+def run_random_access_benchmark(
+    data: np.ndarray,
+    encoded: bytes,
+    decode_fn: Callable,
+    decode_range_fn: Optional[Callable] = None,
+    window: int = DEFAULT_RANDOM_ACCESS_WINDOW,
+    timing_policy: Optional[Dict[str, Any]] = None,
+    decode_stats: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Measure the latency of decoding a random window of samples.
+
+    Each trial decodes samples [a, a + window) for a different pseudo-random
+    a. Algorithms with a decode_range function decode only the window. The
+    others have to decode the full array, so their latency is the full decode
+    time: it is taken from decode_stats when the decode was already timed,
+    rather than timing every full decode a second time.
+
+    Args:
+        data: The original array
+        encoded: Compressed data bytes
+        decode_fn: Decompression function
+        decode_range_fn: Optional function decoding rows [start, stop), called
+            as decode_range_fn(encoded, dtype, shape, start, stop)
+        window: Number of samples (rows along the first axis) per window
+        timing_policy: Optional overrides for DEFAULT_TIMING_POLICY
+        decode_stats: Stats of verified full decodes (from run_timed_trials),
+            used instead of new trials when decode_range_fn is None
+
+    Returns:
+        Dictionary with random_access_* timing fields (throughput is relative
+        to the size of the window), random_access_window and
+        random_access_seekable
+
+    Raises:
+        ValueError: If a window does not decode to the original samples
+    """
+    dtype = str(data.dtype)
+    window = min(window, data.shape[0])
+    if decode_range_fn is None:
+        if decode_stats is None:
+            decode_stats, decoded = run_timed_trials(
+                data, decode_fn, encoded, dtype, data.shape, timing_policy=timing_policy
+            )
+            if not np.array_equal(decoded, data):
+                raise ValueError("Random-access decode failed for the full array")
+        return {
+            **_timing_result_fields(
+                "random_access", _rescale_stats(decode_stats, data[:window].nbytes)
+            ),
+            "random_access_window": window,
+            "random_access_seekable": False,
+        }
+
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, data.shape[0] - window + 1, size=64)
+
+    def decode_window(start: int) -> np.ndarray:
+        return decode_range_fn(encoded, dtype, data.shape, start, start + window)
+
+    # Verify a few windows, including the ones at both ends of the array
+    for start in [0, data.shape[0] - window, int(starts[0])]:
+        if not np.array_equal(decode_window(start), data[start : start + window]):
+            raise ValueError(f"Random-access decode failed for window at {start}")
+
+    trial_index = 0
+
+    def decode_next_window() -> np.ndarray:
+        nonlocal trial_index
+        start = int(starts[trial_index % len(starts)])
+        trial_index += 1
+        return decode_window(start)
+
+    stats, _ = run_timed_trials(
+        data[:window], decode_next_window, timing_policy=timing_policy
+    )
+    return {
+        **_timing_result_fields("random_access", stats),
+        "random_access_window": window,
+        "random_access_seekable": True,
+    }
+
+
+def _memory_result_fields(prefix: str, memory: Dict[str, Any]) -> Dict[str, Any]:
+    """Result fields of a peak memory measurement, e.g. decode_peak_bytes."""
+    return {
+        f"{prefix}_peak_bytes": memory["peak_bytes"],
+        f"{prefix}_peak_rss_bytes": memory["peak_rss_bytes"],
+        f"{prefix}_peak_python_bytes": memory["peak_python_bytes"],
+    }
+
+
+def run_decode_benchmark(
     data: np.ndarray,
+    encoded: bytes,
     algorithm_name: str,
-    encode_fn: Callable,
     decode_fn: Callable,
     verbose: bool = True,
-) -> Tuple[Dict[str, Any], bytes]:
-    """Run compression and decompression benchmarks for an algorithm.
+    timing_policy: Optional[Dict[str, Any]] = None,
+    measure_memory: bool = True,
+    decode_range_fn: Optional[Callable] = None,
+) -> Dict[str, Any]:
+    """Time decoding of compressed data and verify it against the original.
+
+    This is the decode half of run_compression_benchmark. It can also be run
+    on its own, on cached compressed data, when only the decoder changed.
 
     Args:
-        data: Input numpy array to compress
+        data: Original numpy array
+        encoded: Compressed data bytes
         algorithm_name: Name of the algorithm being benchmarked
-        encode_fn: Compression function
         decode_fn: Decompression function
         verbose: Whether to print progress messages
+        timing_policy: Optional overrides for DEFAULT_TIMING_POLICY
+        measure_memory: Whether to measure peak memory of one decode (in a
+            separate untimed run)
+        decode_range_fn: Optional function decoding a range of rows, used to
+            measure random-access latency
 
     Returns:
-        Tuple containing:
-        - result: Dictionary with benchmark metrics
-        - encoded: Compressed data bytes
+        Dictionary with the decode timing, random-access and (with
+        measure_memory) decode memory fields of a result
+
+    Raises:
+        ValueError: If the data does not decode to the original array
     """
-    original_size = len(data.tobytes())
     dtype = str(data.dtype)
-
-    if verbose:
-        print("  Encoding...")
-    encode_time, encode_mb_per_sec, encoded = run_timed_trials(data, encode_fn, data)
-    compressed_size = len(encoded)
-    compression_ratio = original_size / compressed_size
-
     if verbose:
-        print("  Compression complete:")
-        print(f"    Compressed size: {compressed_size:,} bytes")
-        print(f"    Compression ratio: {compression_ratio:.2f}x")
-        print(f"    Encode time: {encode_time*1000:.2f}ms")
-        print(f"    Encode throughput: {encode_mb_per_sec:.2f} MB/s")
         print("  Decoding...")
 
-    decode_time, decode_mb_per_sec, decoded = run_timed_trials(
-        data, decode_fn, encoded, dtype, data.shape
+    decode_stats, decoded = run_timed_trials(
+        data, decode_fn, encoded, dtype, data.shape, timing_policy=timing_policy
     )
 
     if verbose:
-        print(f"    Decode time: {decode_time*1000:.2f}ms")
-        print(f"    Decode throughput: {decode_mb_per_sec:.2f} MB/s")
+        print(
+            f"    Decode time: {decode_stats['median_time']*1000:.2f}ms "
+            f"(min {decode_stats['min_time']*1000:.2f}ms, "
+            f"MAD {decode_stats['mad_time']*1000:.2f}ms, "
+            f"{decode_stats['num_trials']} trials)"
+        )
+        print(
+            f"    Decode throughput: {decode_stats['mb_per_sec']:.2f} MB/s "
+            f"(CI {decode_stats['mb_per_sec_ci_low']:.2f}-"
+            f"{decode_stats['mb_per_sec_ci_high']:.2f})"
+        )
 
     # Verify correctness
     if len(data) != len(decoded):
@@ -101,12 +312,124 @@ def run_compression_benchmark(
     if verbose:
         print("  Verification successful!")
 
+    if verbose:
+        print("  Measuring random-access decode latency...")
+    random_access_fields = run_random_access_benchmark(
+        data,
+        encoded,
+        decode_fn,
+        decode_range_fn,
+        timing_policy=timing_policy,
+        decode_stats=decode_stats,
+    )
+    if verbose:
+        print(
+            f"    Random access ({random_access_fields['random_access_window']:,}"
+            f" samples): {random_access_fields['random_access_time']*1000:.2f}ms"
+            + ("" if decode_range_fn is not None else " (full decode)")
+        )
+
+    memory_fields: Dict[str, Any] = {}
+    if measure_memory:
+        if verbose:
+            print("  Measuring decode peak memory...")
+        memory = measure_peak_memory(decode_fn, encoded, dtype, data.shape)
+        memory_fields = _memory_result_fields("decode", memory)
+        if verbose:
+            print(
+                f"    Decode peak memory: {memory['peak_bytes']:,} bytes"
+                f" (Python allocations: {memory['peak_python_bytes']:,})"
+            )
+
+    return {
+        **_timing_result_fields("decode", decode_stats),
+        **random_access_fields,
+        **memory_fields,
+    }
+
+
+def run_compression_benchmark(
+    data: np.ndarray,
+    algorithm_name: str,
+    encode_fn: Callable,
+    decode_fn: Callable,
+    verbose: bool = True,
+    timing_policy: Optional[Dict[str, Any]] = None,
+    measure_memory: bool = True,
+    decode_range_fn: Optional[Callable] = None,
+) -> Tuple[Dict[str, Any], bytes]:
+    """Run compression and decompression benchmarks for an algorithm.
+
+    Args:
+        data: Input numpy array to compress
+        algorithm_name: Name of the algorithm being benchmarked
+        encode_fn: Compression function
+        decode_fn: Decompression function
+        verbose: Whether to print progress messages
+        timing_policy: Optional overrides for DEFAULT_TIMING_POLICY
+        measure_memory: Whether to measure peak memory of one encode and one
+            decode (in separate untimed runs)
+        decode_range_fn: Optional function decoding a range of rows, used to
+            measure random-access latency
+
+    Returns:
+        Tuple containing:
+        - result: Dictionary with benchmark metrics
+        - encoded: Compressed data bytes
+    """
+    original_size = len(data.tobytes())
+    dtype = str(data.dtype)
+
+    if verbose:
+        print("  Encoding...")
+    encode_stats, encoded = run_timed_trials(
+        data, encode_fn, data, timing_policy=timing_policy
+    )
+    compressed_size = len(encoded)
+    compression_ratio = original_size / compressed_size
+
+    if verbose:
+        print("  Compression complete:")
+        print(f"    Compressed size: {compressed_size:,} bytes")
+        print(f"    Compression ratio: {compression_ratio:.2f}x")
+        print(
+            f"    Encode time: {encode_stats['median_time']*1000:.2f}ms "
+            f"(min {encode_stats['min_time']*1000:.2f}ms, "
+            f"MAD {encode_stats['mad_time']*1000:.2f}ms, "
+            f"{encode_stats['num_trials']} trials)"
+        )
+        print(
+            f"    Encode throughput: {encode_stats['mb_per_sec']:.2f} MB/s "
+            f"(CI {encode_stats['mb_per_sec_ci_low']:.2f}-"
+            f"{encode_stats['mb_per_sec_ci_high']:.2f})"
+        )
+
+    memory_fields: Dict[str, Any] = {}
+    if measure_memory:
+        if verbose:
+            print("  Measuring encode peak memory...")
+        memory = measure_peak_memory(encode_fn, data)
+        memory_fields = _memory_result_fields("encode", memory)
+        if verbose:
+            print(
+                f"    Encode peak memory: {memory['peak_bytes']:,} bytes"
+                f" (Python allocations: {memory['peak_python_bytes']:,})"
+            )
+
     result = {
         "compression_ratio": compression_ratio,
-        "encode_time": encode_time,
-        "decode_time": decode_time,
-        "encode_mb_per_sec": encode_mb_per_sec,
-        "decode_mb_per_sec": decode_mb_per_sec,
+        **_timing_result_fields("encode", encode_stats),
+        **memory_fields,
+        **run_decode_benchmark(
+            data,
+            encoded,
+            algorithm_name,
+            decode_fn,
+            verbose,
+            timing_policy=timing_policy,
+            measure_memory=measure_memory,
+            decode_range_fn=decode_range_fn,
+        ),
         "original_size": original_size,
         "compressed_size": compressed_size,
         "array_shape": data.shape,
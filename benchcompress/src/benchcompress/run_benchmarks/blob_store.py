@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import tempfile
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+
+from .results_index import put_result
+
+# Default size cap of the blob store (bytes); override with the
+# BENCHCOMPRESS_BLOB_STORE_MAX_SIZE environment variable
+DEFAULT_MAX_BLOB_STORE_SIZE = 20 * 1024**3
+
+# Blobs that no result references, and files that are not in the index, are
+# only removed by garbage collection once they are this old (seconds), so
+# that blobs written by a running benchmark before its result are kept
+ORPHAN_GRACE_PERIOD = 3600.0
+
+
+def get_max_blob_store_size() -> int:
+    """Get the size cap of the blob store, in bytes."""
+    value = os.environ.get("BENCHCOMPRESS_BLOB_STORE_MAX_SIZE")
+    return int(value) if value else DEFAULT_MAX_BLOB_STORE_SIZE
+
+
+def get_blob_path(cache_dir: str, digest: str) -> str:
+    """Get the path of a blob: cache_dir/blobs/<first 2 hex digits>/<digest>."""
+    return os.path.join(cache_dir, "blobs", digest[:2], digest)
+
+
+def _remove_file(path: str) -> int:
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+    except FileNotFoundError:
+        return 0
+
+
+def put_blob(
+    conn: sqlite3.Connection,
+    cache_dir: str,
+    data: bytes,
+    max_size: Optional[int] = None,
+) -> str:
+    """Store compressed data by its SHA-256 digest.
+
+    Identical data (e.g. the output of two levels of a codec that make the
+    same choices) is stored once. The write is atomic, so concurrent writers
+    of the same blob are safe. If the store then exceeds its size cap, least
+    recently used blobs are evicted.
+
+    Args:
+        conn: Connection to the results index of cache_dir
+        cache_dir: Cache directory
+        data: Compressed data
+        max_size: Size cap in bytes (default: get_max_blob_store_size())
+
+    Returns:
+        Hex digest of the data
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = get_blob_path(cache_dir, digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove_file(tmp_path)
+            raise
+    conn.execute(
+        "INSERT INTO blobs (digest, size, last_used) VALUES (?, ?, ?) "
+        "ON CONFLICT (digest) DO UPDATE SET last_used = excluded.last_used",
+        (digest, len(data), time.time()),
+    )
+    evict_blobs(
+        conn,
+        cache_dir,
+        get_max_blob_store_size() if max_size is None else max_size,
+        keep=digest,
+    )
+    return digest
+
+
+def get_blob(conn: sqlite3.Connection, cache_dir: str, digest: str) -> Optional[bytes]:
+    """Retrieve compressed data by digest, marking it as recently used.
+
+    Args:
+        conn: Connection to the results index of cache_dir
+        cache_dir: Cache directory
+        digest: Hex digest returned by put_blob
+
+    Returns:
+        The data, or None if the blob is not in the store (e.g. evicted)
+    """
+    try:
+        with open(get_blob_path(cache_dir, digest), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    conn.execute(
+        "UPDATE blobs SET last_used = ? WHERE digest = ?", (time.time(), digest)
+    )
+    return data
+
+
+def get_blob_store_size(conn: sqlite3.Connection) -> int:
+    """Get the total size of the blobs in the store, in bytes."""
+    return conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+
+def _delete_blobs(conn: sqlite3.Connection, cache_dir: str, digests: List[str]) -> int:
+    # Rows first, so that a blob is never listed without its file
+    conn.executemany("DELETE FROM blobs WHERE digest = ?", [(d,) for d in digests])
+    return sum(_remove_file(get_blob_path(cache_dir, d)) for d in digests)
+
+
+def evict_blobs(
+    conn: sqlite3.Connection,
+    cache_dir: str,
+    max_size: int,
+    keep: Optional[str] = None,
+) -> Dict[str, int]:
+    """Evict least recently used blobs until the store fits in max_size bytes.
+
+    Results keep the digest of evicted blobs; get_blob then returns None.
+
+    Args:
+        conn: Connection to the results index of cache_dir
+        cache_dir: Cache directory
+        max_size: Size cap in bytes
+        keep: Digest of a blob never to evict (the one just stored)
+
+    Returns:
+        Dictionary with num_blobs and bytes evicted
+    """
+    excess = get_blob_store_size(conn) - max_size
+    if excess <= 0:
+        return {"num_blobs": 0, "bytes": 0}
+    evicted = []
+    for digest, size in conn.execute(
+        "SELECT digest, size FROM blobs WHERE digest != ? ORDER BY last_used",
+        (keep or "",),
+    ).fetchall():
+        if excess <= 0:
+            break
+        evicted.append(digest)
+        excess -= size
+    return {
+        "num_blobs": len(evicted),
+        "bytes": _delete_blobs(conn, cache_dir, evicted),
+    }
+
+
+def _import_legacy_files(conn: sqlite3.Connection, cache_dir: str) -> Dict[str, int]:
+    # Before the blob store, compressed data was written to
+    # cache_dir/<dataset>/<algorithm>/compressed.dat for the latest result of
+    # the pair. Attach it to that result if it is still indexed.
+    num_files = 0
+    num_bytes = 0
+    for dataset_dir in os.listdir(cache_dir):
+        dataset_path = os.path.join(cache_dir, dataset_dir)
+        if dataset_dir in ("datasets", "blobs") or not os.path.isdir(dataset_path):
+            continue
+        for algorithm_dir in os.listdir(dataset_path):
+            algorithm_path = os.path.join(dataset_path, algorithm_dir)
+            compressed_file = os.path.join(algorithm_path, "compressed.dat")
+            if os.path.exists(compressed_file):
+                file_size = os.path.getsize(compressed_file)
+                rows = conn.execute(
+                    "SELECT result FROM results WHERE dataset = ? AND algorithm = ? "
+                    "AND blob_digest IS NULL AND estimated = 0",
+                    (unquote(dataset_dir), unquote(algorithm_dir)),
+                ).fetchall()
+                matching = [
+                    result
+                    for result in (json.loads(row[0]) for row in rows)
+                    if result.get("compressed_size") == file_size
+                ]
+                if matching:
+                    result = max(matching, key=lambda r: r.get("timestamp", 0))
+                    with open(compressed_file, "rb") as f:
+                        digest = put_blob(conn, cache_dir, f.read())
+                    put_result(conn, result, blob_digest=digest)
+                num_bytes += _remove_file(compressed_file)
+                num_files += 1
+            # metadata.json files were imported into the results index when
+            # it was created
+            _remove_file(os.path.join(algorithm_path, "metadata.json"))
+            if os.path.isdir(algorithm_path) and not os.listdir(algorithm_path):
+                os.rmdir(algorithm_path)
+        if not os.listdir(dataset_path):
+            os.rmdir(dataset_path)
+    return {"num_files": num_files, "bytes": num_bytes}
+
+
+def collect_garbage(
+    conn: sqlite3.Connection,
+    cache_dir: str,
+    max_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Garbage-collect the blob store.
+
+    Compressed data of earlier versions (per-pair compressed.dat files) is
+    moved into the store, blobs that no result references any more (e.g. the
+    result was rerun) are removed, as are stray files, and least recently
+    used blobs are evicted to fit the size cap.
+
+    Args:
+        conn: Connection to the results index of cache_dir
+        cache_dir: Cache directory
+        max_size: Size cap in bytes (default: get_max_blob_store_size())
+
+    Returns:
+        Dictionary with the bytes reclaimed in total and by each step, and
+        the number and total size of the blobs left
+    """
+    size_before = get_blob_store_size(conn)
+    legacy = _import_legacy_files(conn, cache_dir)
+    # Bytes of the legacy files that did not end up in the store, whether
+    # duplicates or files without a result
+    legacy_reclaimed = legacy["bytes"] - (get_blob_store_size(conn) - size_before)
+
+    cutoff = time.time() - ORPHAN_GRACE_PERIOD
+    orphans = [
+        row[0]
+        for row in conn.execute(
+            "SELECT digest FROM blobs WHERE last_used < ? AND digest NOT IN "
+            "(SELECT blob_digest FROM results WHERE blob_digest IS NOT NULL)",
+            (cutoff,),
+        )
+    ]
+    orphan_bytes = _delete_blobs(conn, cache_dir, orphans)
+
+    stray_bytes = 0
+    known = {row[0] for row in conn.execute("SELECT digest FROM blobs")}
+    blobs_dir = os.path.join(cache_dir, "blobs")
+    for dirpath, _, filenames in os.walk(blobs_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if filename not in known and os.path.getmtime(path) < cutoff:
+                stray_bytes += _remove_file(path)
+
+    evicted = evict_blobs(
+        conn,
+        cache_dir,
+        get_max_blob_store_size() if max_size is None else max_size,
+    )
+    return {
+        "legacy_files": legacy["num_files"],
+        "legacy_bytes_reclaimed": legacy_reclaimed,
+        "orphan_blobs": len(orphans),
+        "orphan_bytes": orphan_bytes,
+        "stray_bytes": stray_bytes,
+        "evicted_blobs": evicted["num_blobs"],
+        "evicted_bytes": evicted["bytes"],
+        "reclaimed_bytes": legacy_reclaimed
+        + orphan_bytes
+        + stray_bytes
+        + evicted["bytes"],
+        "num_blobs": conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0],
+        "size": get_blob_store_size(conn),
+    }
@@ -1,10 +1,175 @@
-import os
-import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from ._memobin import (
     construct_memobin_url,
     download_from_memobin,
 )
+from .results_index import (
+    ResultKey,
+    open_results_index,
+    get_result,
+    get_result_blob_digest,
+    put_result,
+    put_results,
+)
+from .blob_store import get_blob, put_blob
+from .memobin_manifest import hash_memobin_file
+
+
+def find_local_result(
+    cache_dir: str,
+    dataset_name: str,
+    algorithm_name: str,
+    algorithm_version: str,
+    dataset_version: str,
+    system_version: str,
+) -> Optional[Dict[str, Any]]:
+    """Look up a cached benchmark result in the local cache only.
+
+    Unlike check_cached_result, memobin is not queried, so this is cheap
+    enough to call for every registered algorithm.
+
+    Args:
+        cache_dir: Directory containing cached results
+        dataset_name: Name of the dataset
+        algorithm_name: Name of the algorithm
+        algorithm_version: Version of the algorithm
+        dataset_version: Version of the dataset
+        system_version: Version of the system
+
+    Returns:
+        Cached result dictionary if found with matching versions, None otherwise
+    """
+    with open_results_index(cache_dir) as conn:
+        return get_result(
+            conn,
+            (dataset_name, algorithm_name, algorithm_version, dataset_version),
+            system_version,
+        )
+
+
+def _check_memobin_file(
+    cached_data: Any,
+    key: ResultKey,
+    system_version: str,
+    accept_estimated: bool,
+    expected_hash: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    # The result of a memobin metadata.json file, if it is the one expected
+    if not isinstance(cached_data, dict) or not isinstance(
+        cached_data.get("result"), dict
+    ):
+        return None
+    if expected_hash is not None and hash_memobin_file(cached_data) != expected_hash:
+        print("  Warning: result in memobin does not match the manifest, ignoring it")
+        return None
+    result = cached_data["result"]
+    if (
+        (
+            result.get("dataset"),
+            result.get("algorithm"),
+            result.get("algorithm_version"),
+            result.get("dataset_version"),
+        )
+        != key
+        or result.get("system_version", "") != system_version
+        or (result.get("estimated") and not accept_estimated)
+    ):
+        return None
+    return result
+
+
+def store_manifest_results(
+    cache_dir: str,
+    entries: Dict[ResultKey, Dict[str, Any]],
+    system_version: str,
+    accept_estimated: bool = False,
+) -> Dict[ResultKey, Dict[str, Any]]:
+    """Add the results carried by memobin manifest entries to the local index.
+
+    This replaces one download per pair (see fetch_memobin_result) with the
+    single manifest download. Entries of older manifests, which carry only
+    the hash, are left out.
+
+    Args:
+        cache_dir: Directory containing cached results
+        entries: Manifest entries by key (see fetch_memobin_manifest)
+        system_version: Version of the system
+        accept_estimated: Whether estimated results may be stored
+
+    Returns:
+        The stored results by key
+    """
+    results: Dict[ResultKey, Dict[str, Any]] = {}
+    for key, entry in entries.items():
+        if "result" not in entry:
+            continue
+        result = _check_memobin_file(
+            {"result": entry["result"]},
+            key,
+            system_version,
+            accept_estimated,
+            entry["sha256"],
+        )
+        if result is not None:
+            results[key] = result
+    if results:
+        with open_results_index(cache_dir) as conn:
+            put_results(conn, list(results.values()))
+    return results
+
+
+def fetch_memobin_result(
+    cache_dir: str,
+    dataset_name: str,
+    algorithm_name: str,
+    algorithm_version: str,
+    dataset_version: str,
+    system_version: str,
+    verbose: bool = True,
+    accept_estimated: bool = False,
+    expected_hash: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Download a benchmark result from memobin and add it to the local index.
+
+    Args:
+        cache_dir: Directory containing cached results
+        dataset_name: Name of the dataset
+        algorithm_name: Name of the algorithm
+        algorithm_version: Version of the algorithm
+        dataset_version: Version of the dataset
+        system_version: Version of the system
+        verbose: Whether to print progress messages
+        accept_estimated: Whether an estimated result may be returned
+        expected_hash: Hash of the file listed in the memobin manifest (see
+            hash_memobin_file); a file with another hash is rejected
+
+    Returns:
+        The result if memobin has one with matching versions, None otherwise
+    """
+    memobin_url = construct_memobin_url(
+        algorithm_name,
+        dataset_name,
+        algorithm_version,
+        dataset_version,
+        system_version,
+        "metadata.json",
+    )
+    if verbose:
+        print("  Looking for cached result in memobin...")
+    result = _check_memobin_file(
+        download_from_memobin(memobin_url),
+        (dataset_name, algorithm_name, algorithm_version, dataset_version),
+        system_version,
+        accept_estimated,
+        expected_hash,
+    )
+    if result is None:
+        return None
+    if verbose:
+        print("  Found result in memobin, saving locally...")
+    with open_results_index(cache_dir) as conn:
+        put_result(conn, result)
+    return result
 
 
 def check_cached_result(
@@ -16,9 +181,15 @@ def check_cached_result(
     system_version: str,
     force: bool = False,
     verbose: bool = True,
+    accept_estimated: bool = False,
 ) -> Optional[Dict[str, Any]]:
     """Check for cached benchmark results locally and in memobin.
 
+    Results of estimate runs (flagged "estimated") only stand in for a full
+    benchmark when accept_estimated is set; a full result is always accepted.
+    To look up many pairs, run_benchmarks queries the results index in bulk
+    instead.
+
     Args:
         cache_dir: Directory containing cached results
         dataset_name: Name of the dataset
@@ -28,91 +199,96 @@ def check_cached_result(
         system_version: Version of the system
         force: If True, ignore cached results
         verbose: Whether to print progress messages
+        accept_estimated: Whether an estimated result may be returned
 
     Returns:
         Cached result dictionary if found and valid, None otherwise
     """
-    test_dir = os.path.join(cache_dir, dataset_name, algorithm_name)
-    metadata_file = os.path.join(test_dir, "metadata.json")
-
-    # First try local cache (unless force flag is set)
-    cached_data = None
-    if not force and os.path.exists(metadata_file):
-        with open(metadata_file, "r") as f:
-            cached_data = json.load(f)
-            # if versions do not match, then set to None
-            if isinstance(cached_data, dict) and "result" in cached_data:
-                result = cached_data["result"]
-                if (
-                    result["algorithm_version"] != algorithm_version
-                    or result["dataset_version"] != dataset_version
-                    or result.get("system_version", "") != system_version
-                ):
-                    cached_data = None
-
-    # If not in local cache, try memobin (unless force flag is set)
-    if cached_data is None and not force:
-        memobin_url = construct_memobin_url(
-            algorithm_name,
+    if force:
+        return None
+    with open_results_index(cache_dir) as conn:
+        result = get_result(
+            conn,
+            (dataset_name, algorithm_name, algorithm_version, dataset_version),
+            system_version,
+            accept_estimated,
+        )
+    if result is None:
+        result = fetch_memobin_result(
+            cache_dir,
             dataset_name,
+            algorithm_name,
             algorithm_version,
             dataset_version,
             system_version,
-            "metadata.json",
+            verbose,
+            accept_estimated,
         )
-        if verbose:
-            print("  Looking for cached result in memobin...")
-        cached_data = download_from_memobin(memobin_url)
-        if cached_data is not None:
-            if verbose:
-                print("  Found result in memobin, saving locally...")
-            # Save to local cache
-            os.makedirs(test_dir, exist_ok=True)
-            with open(metadata_file, "w") as f:
-                json.dump(cached_data, f, indent=2)
-
-    if (
-        cached_data is not None
-        and isinstance(cached_data, dict)
-        and "result" in cached_data
-    ):
-        result = cached_data["result"]
-        if (
-            isinstance(result, dict)
-            and result.get("algorithm_version") == algorithm_version
-            and result.get("dataset_version") == dataset_version
-            and result.get("system_version", "") == system_version
-        ):
-            result["cache_status"] = "cached"
-            return result
+    if result is not None:
+        result["cache_status"] = "cached"
+    return result
 
-    return None
 
-
-def save_result_to_cache(
-    result: Dict[str, Any],
-    encoded_data: bytes,
+def load_cached_encoding(
     cache_dir: str,
     dataset_name: str,
     algorithm_name: str,
-) -> None:
-    """Save benchmark result and compressed data to cache.
+    algorithm_version: str,
+    dataset_version: str,
+    system_version: str,
+) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """Load a full cached result together with its compressed data.
 
     Args:
-        result: Benchmark result dictionary
-        encoded_data: Compressed data bytes
-        cache_dir: Directory to store cached results
+        cache_dir: Directory containing cached results
         dataset_name: Name of the dataset
         algorithm_name: Name of the algorithm
+        algorithm_version: Version of the algorithm
+        dataset_version: Version of the dataset
+        system_version: Version of the system
+
+    Returns:
+        Tuple of the result and the compressed data, or None if there is no
+        full result or its compressed data is not in the blob store
+        (estimated results, results from memobin, evicted blobs)
     """
-    test_dir = os.path.join(cache_dir, dataset_name, algorithm_name)
-    metadata_file = os.path.join(test_dir, "metadata.json")
-    compressed_file = os.path.join(test_dir, "compressed.dat")
+    key = (dataset_name, algorithm_name, algorithm_version, dataset_version)
+    with open_results_index(cache_dir) as conn:
+        result = get_result(conn, key, system_version, accept_estimated=False)
+        digest = get_result_blob_digest(conn, key, system_version)
+        if result is None or digest is None:
+            return None
+        encoded = get_blob(conn, cache_dir, digest)
+    if encoded is None:
+        return None
+    return result, encoded
+
+
+def save_result_to_cache(
+    result: Dict[str, Any],
+    encoded_data: Optional[bytes],
+    cache_dir: str,
+) -> Optional[str]:
+    """Save benchmark result to the results index and compressed data to the blob store.
 
-    os.makedirs(test_dir, exist_ok=True)
-    cache_data = {"result": result}
+    Safe to call from several processes at once (see open_results_index). An
+    estimated result is not saved over a full result of the same pair.
 
-    with open(metadata_file, "w") as f:
-        json.dump(cache_data, f, indent=2)
-    with open(compressed_file, "wb") as f:
-        f.write(encoded_data)
+    Args:
+        result: Benchmark result dictionary
+        encoded_data: Compressed data bytes, or None for estimated results,
+            which have no compressed data
+        cache_dir: Directory to store cached results
+
+    Returns:
+        Blob store digest of the compressed data, or None if there is none
+    """
+    with open_results_index(cache_dir) as conn:
+        digest = None
+        if encoded_data is not None:
+            digest = put_blob(conn, cache_dir, encoded_data)
+        # A result replacing an earlier one leaves the earlier blob to
+        # garbage collection
+        if not put_result(conn, result, blob_digest=digest):
+            print("  A full result is cached for this pair; the estimate is not saved")
+    return digest
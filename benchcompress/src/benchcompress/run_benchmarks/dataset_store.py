@@ -0,0 +1,193 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+def get_dataset_store_dir(
+    cache_dir: str, dataset_name: str, dataset_version: str
+) -> str:
+    """Get the directory holding the stored copy of a dataset.
+
+    Args:
+        cache_dir: Cache directory
+        dataset_name: Name of the dataset
+        dataset_version: Version of the dataset
+
+    Returns:
+        Path of the form cache_dir/datasets/<name>/<version>
+    """
+    return os.path.join(cache_dir, "datasets", dataset_name, dataset_version)
+
+
+def _compute_sha256(data: np.ndarray, chunk_size: int = 64 * 1024 * 1024) -> str:
+    flat = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+    h = hashlib.sha256()
+    for start in range(0, len(flat), chunk_size):
+        h.update(flat[start : start + chunk_size].data)
+    return h.hexdigest()
+
+
+def _read_store_metadata(store_dir: str) -> Optional[Dict[str, Any]]:
+    metadata_file = os.path.join(store_dir, "metadata.json")
+    data_file = os.path.join(store_dir, "data.npy")
+    if not os.path.exists(metadata_file) or not os.path.exists(data_file):
+        return None
+    with open(metadata_file, "r") as f:
+        return json.load(f)
+
+
+def _load_stored_array(store_dir: str, metadata: Dict[str, Any]) -> np.ndarray:
+    data = np.load(os.path.join(store_dir, "data.npy"), mmap_mode="r")
+    if list(data.shape) != metadata["shape"] or str(data.dtype) != metadata["dtype"]:
+        raise ValueError(
+            f"Stored dataset in {store_dir} does not match its metadata: "
+            f"shape={data.shape}, dtype={data.dtype}"
+        )
+    # Plain read-only ndarray view of the memory map
+    return np.asarray(data)
+
+
+def store_dataset(
+    data: np.ndarray,
+    cache_dir: str,
+    dataset_name: str,
+    dataset_version: str,
+) -> Dict[str, Any]:
+    """Save a materialized dataset in the local dataset store.
+
+    The array is written as data.npy next to a metadata.json sidecar holding
+    its shape, dtype and sha256. Both files are written to temporary names
+    first, so that an interrupted write never leaves a partial dataset behind.
+
+    Args:
+        data: The materialized dataset array
+        cache_dir: Cache directory
+        dataset_name: Name of the dataset
+        dataset_version: Version of the dataset
+
+    Returns:
+        The metadata dictionary that was written
+    """
+    store_dir = get_dataset_store_dir(cache_dir, dataset_name, dataset_version)
+    os.makedirs(store_dir, exist_ok=True)
+
+    metadata = {
+        "name": dataset_name,
+        "version": dataset_version,
+        "shape": list(data.shape),
+        "dtype": str(data.dtype),
+        "sha256": _compute_sha256(data),
+    }
+
+    data_file = os.path.join(store_dir, "data.npy")
+    metadata_file = os.path.join(store_dir, "metadata.json")
+    tmp_suffix = f".tmp{os.getpid()}"
+    with open(data_file + tmp_suffix, "wb") as f:
+        np.save(f, data)
+    with open(metadata_file + tmp_suffix, "w") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(data_file + tmp_suffix, data_file)
+    os.replace(metadata_file + tmp_suffix, metadata_file)
+    return metadata
+
+
+def load_dataset(
+    dataset: Dict[str, Any],
+    cache_dir: str,
+    verbose: bool = True,
+) -> np.ndarray:
+    """Load a dataset from the local dataset store, creating it if needed.
+
+    On a store miss the dataset's create function is called and the result is
+    saved. The returned array is always a read-only memory map of the stored
+    .npy file, so repeated runs skip the (often slow) creation step.
+
+    Args:
+        dataset: Dataset dictionary
+        cache_dir: Cache directory
+        verbose: Whether to print progress messages
+
+    Returns:
+        Read-only array backed by the stored file
+    """
+    store_dir = get_dataset_store_dir(cache_dir, dataset["name"], dataset["version"])
+    metadata = _read_store_metadata(store_dir)
+    if metadata is not None:
+        if verbose:
+            print(f"Loading dataset {dataset['name']} from {store_dir}")
+        return _load_stored_array(store_dir, metadata)
+
+    if verbose:
+        print(f"Creating dataset {dataset['name']}...")
+    data = dataset["create"]()
+    metadata = store_dataset(data, cache_dir, dataset["name"], dataset["version"])
+    if verbose:
+        print(f"Stored dataset {dataset['name']} in {store_dir}")
+    return _load_stored_array(store_dir, metadata)
+
+
+def verify_stored_dataset(
+    cache_dir: str, dataset_name: str, dataset_version: str
+) -> bool:
+    """Check a stored dataset against the sha256 recorded in its sidecar.
+
+    Args:
+        cache_dir: Cache directory
+        dataset_name: Name of the dataset
+        dataset_version: Version of the dataset
+
+    Returns:
+        True if the dataset is stored and intact, False otherwise
+    """
+    store_dir = get_dataset_store_dir(cache_dir, dataset_name, dataset_version)
+    metadata = _read_store_metadata(store_dir)
+    if metadata is None:
+        return False
+    try:
+        data = _load_stored_array(store_dir, metadata)
+    except ValueError:
+        return False
+    return _compute_sha256(data) == metadata["sha256"]
+
+
+def prefetch_datasets(
+    datasets: List[Dict[str, Any]],
+    cache_dir: str,
+    force: bool = False,
+    verify: bool = False,
+    verbose: bool = True,
+) -> None:
+    """Materialize datasets into the local dataset store.
+
+    Args:
+        datasets: List of dataset dictionaries
+        cache_dir: Cache directory
+        force: If True, recreate datasets that are already stored
+        verify: If True, check already stored datasets against their sha256 and
+            recreate the ones that do not match
+        verbose: Whether to print progress messages
+    """
+    for dataset in datasets:
+        store_dir = get_dataset_store_dir(
+            cache_dir, dataset["name"], dataset["version"]
+        )
+        stored = _read_store_metadata(store_dir) is not None
+        if stored and verify:
+            stored = verify_stored_dataset(
+                cache_dir, dataset["name"], dataset["version"]
+            )
+            if not stored:
+                print(f"  Stored dataset {dataset['name']} is corrupt, recreating")
+        if stored and not force:
+            if verbose:
+                print(f"  {dataset['name']} (version {dataset['version']}): cached")
+            continue
+
+        if verbose:
+            print(f"  {dataset['name']} (version {dataset['version']}): creating...")
+        data = dataset["create"]()
+        store_dataset(data, cache_dir, dataset["name"], dataset["version"])
+        if verbose:
+            print(f"    Stored shape={data.shape}, dtype={data.dtype}")
@@ -0,0 +1,133 @@
+import gzip
+import json
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ._memobin import (
+    construct_manifest_url,
+    download_from_memobin,
+    upload_to_memobin,
+)
+from .results_index import ResultKey
+
+
+def hash_memobin_file(data: Dict[str, Any]) -> str:
+    """Hash the content of a memobin metadata.json file, as listed in manifests.
+
+    The JSON is serialized canonically (sorted keys), so the hash does not
+    depend on how the file was written.
+
+    Args:
+        data: Content of the file, {"result": ...}
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _parse_manifest(content: bytes) -> Dict[ResultKey, Dict[str, Any]]:
+    try:
+        content = gzip.decompress(content)
+    except OSError:
+        # Served already decompressed (Content-Encoding: gzip)
+        pass
+    manifest = json.loads(content)
+    return {
+        (
+            entry["dataset"],
+            entry["algorithm"],
+            entry["algorithm_version"],
+            entry["dataset_version"],
+        ): entry
+        for entry in manifest["results"]
+    }
+
+
+def fetch_memobin_manifest(
+    system_version: str, verbose: bool = True
+) -> Optional[Dict[ResultKey, Dict[str, Any]]]:
+    """Fetch the manifest of the results hosted in memobin for a system version.
+
+    The manifest is a single gzipped JSON file listing every hosted result
+    with the hash of its metadata.json and its content, so that one request
+    fills the local index with all the hosted pairs and tells which ones
+    have to be run locally.
+
+    Args:
+        system_version: Version of the system
+        verbose: Whether to print progress messages
+
+    Returns:
+        Entry of each hosted result by (dataset, algorithm, algorithm_version,
+        dataset_version), with "sha256" and the "result" itself (missing
+        from entries of older manifests), or None if no manifest has been
+        published
+
+    Raises:
+        requests.RequestException: If the download fails for a reason other
+            than 404
+    """
+    url = construct_manifest_url(system_version)
+    if verbose:
+        print(f"Fetching the memobin manifest for system version {system_version}...")
+    content = download_from_memobin(url, as_json=False)
+    if content is None:
+        return None
+    manifest = _parse_manifest(content)
+    if verbose:
+        print(f"  The manifest lists {len(manifest)} result(s)")
+    return manifest
+
+
+def update_memobin_manifest(
+    results: List[Dict[str, Any]],
+    system_version: str,
+    memobin_api_key: str,
+) -> None:
+    """Add uploaded results to the memobin manifest of their system version.
+
+    The current manifest is downloaded, merged with the new entries and
+    uploaded again. Runs publishing at the same time can overwrite each
+    other's entries, and results missing from the manifest are run locally
+    by other runners, so results should be published from one runner at a
+    time.
+
+    Args:
+        results: Results uploaded to memobin, as {"result": ...} files
+        system_version: Version of the system
+        memobin_api_key: API key for memobin authentication
+
+    Raises:
+        requests.RequestException: If the download or the upload fails
+    """
+    url = construct_manifest_url(system_version)
+    content = download_from_memobin(url, as_json=False)
+    entries = _parse_manifest(content) if content is not None else {}
+    for result in results:
+        key = (
+            result["dataset"],
+            result["algorithm"],
+            result["algorithm_version"],
+            result["dataset_version"],
+        )
+        entries[key] = {
+            "dataset": key[0],
+            "algorithm": key[1],
+            "algorithm_version": key[2],
+            "dataset_version": key[3],
+            "sha256": hash_memobin_file({"result": result}),
+            "result": result,
+        }
+    manifest = {
+        "system_version": system_version,
+        "last_update": datetime.now().isoformat(),
+        "results": [entry for _, entry in sorted(entries.items())],
+    }
+    upload_to_memobin(
+        gzip.compress(json.dumps(manifest).encode("utf-8")),
+        url,
+        memobin_api_key,
+        content_type="application/gzip",
+    )
@@ -0,0 +1,326 @@
+import os
+import glob
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..algorithms import find_algorithm
+from ..datasets import datasets
+from .benchmark_job import run_benchmark_job
+from .dataset_store import load_dataset
+from .shared_datasets import attach_dataset, publish_dataset, release_dataset
+
+# Per-worker state: the currently attached shared dataset, so that consecutive
+# jobs on the same dataset reuse the mapping
+_worker_state: Dict[str, Any] = {"shm_name": None, "shm": None, "data": None}
+
+
+def _parse_cpu_list(cpu_list: str) -> List[int]:
+    """Parse a Linux cpulist string such as "0-3,8,10-11".
+
+    Args:
+        cpu_list: The cpulist string
+
+    Returns:
+        List of CPU ids
+    """
+    cpus = []
+    for part in cpu_list.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def _available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def get_numa_nodes() -> List[List[int]]:
+    """Get the available CPUs grouped by NUMA node.
+
+    Only one logical CPU per physical core is returned, so that pinned workers
+    do not share a core with a hyperthread sibling. Systems without NUMA
+    information are reported as a single node.
+
+    Returns:
+        List of NUMA nodes, each a sorted list of CPU ids
+    """
+    available = set(_available_cpus())
+
+    # Keep the first logical CPU of each physical core
+    core_cpus = set()
+    for cpu in sorted(available):
+        siblings_file = (
+            f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+        )
+        if os.path.exists(siblings_file):
+            with open(siblings_file, "r") as f:
+                siblings = _parse_cpu_list(f.read())
+            if min(siblings) != cpu and min(siblings) in available:
+                continue
+        core_cpus.add(cpu)
+
+    nodes = []
+    for node_dir in sorted(glob.glob("/sys/devices/system/node/node[0-9]*")):
+        with open(os.path.join(node_dir, "cpulist"), "r") as f:
+            node_cpus = sorted(set(_parse_cpu_list(f.read())) & core_cpus)
+        if node_cpus:
+            nodes.append(node_cpus)
+    if not nodes:
+        nodes = [sorted(core_cpus)]
+    return nodes
+
+
+def plan_worker_cpus(
+    num_workers: int,
+    pin_cores: bool = False,
+    max_jobs_per_numa_node: Optional[int] = None,
+) -> Optional[List[Set[int]]]:
+    """Decide which CPUs each worker process may run on.
+
+    When pinning, each worker gets its own physical core, spread round-robin
+    across NUMA nodes. When only a per-node cap is given, each worker is
+    restricted to the CPUs of its node instead of a single core.
+
+    Args:
+        num_workers: Requested number of worker processes
+        pin_cores: Whether to pin each worker to its own core
+        max_jobs_per_numa_node: Optional maximum number of concurrent jobs per NUMA node
+
+    Returns:
+        List of CPU sets, one per worker (its length is the effective number of
+        workers), or None if workers should not be restricted
+    """
+    if not pin_cores and max_jobs_per_numa_node is None:
+        return None
+    if not hasattr(os, "sched_setaffinity"):
+        print("Warning: CPU affinity is not supported on this platform")
+        return None
+
+    all_nodes = get_numa_nodes()
+    nodes = all_nodes
+    if max_jobs_per_numa_node is not None:
+        nodes = [node[:max_jobs_per_numa_node] for node in all_nodes]
+
+    # Interleave nodes so that workers are spread evenly
+    slots = []
+    for i in range(max(len(node) for node in nodes)):
+        for node_index, node in enumerate(nodes):
+            if i < len(node):
+                slots.append((node_index, node[i]))
+
+    if num_workers > len(slots):
+        print(
+            f"Warning: Requested {num_workers} workers but only {len(slots)} "
+            "cores are available under the pinning constraints"
+        )
+    slots = slots[:num_workers]
+
+    if pin_cores:
+        return [{cpu} for _, cpu in slots]
+    return [set(all_nodes[node_index]) for node_index, _ in slots]
+
+
+def _init_worker(cpu_queue) -> None:
+    if cpu_queue is None:
+        return
+    cpus = cpu_queue.get()
+    os.sched_setaffinity(0, cpus)
+
+
+def _find_by_name(items: List[Dict[str, Any]], name: str, kind: str) -> Dict[str, Any]:
+    for item in items:
+        if item["name"] == name:
+            return item
+    raise ValueError(f"Unknown {kind}: {name}")
+
+
+def _run_job_in_worker(
+    dataset_name: str,
+    algorithm_name: str,
+    data_descriptor: Dict[str, Any],
+    cache_dir: str,
+    system_version: str,
+    verbose: bool,
+    timing_policy: Optional[Dict[str, Any]],
+    estimate: bool,
+    decode_only: bool,
+) -> Dict[str, Any]:
+    dataset = _find_by_name(datasets, dataset_name, "dataset")
+    algorithm = find_algorithm(algorithm_name)
+
+    if _worker_state["shm_name"] != data_descriptor["shm_name"]:
+        # The array must be released before the mapping can be closed
+        _worker_state["data"] = None
+        if _worker_state["shm"] is not None:
+            _worker_state["shm"].close()
+        _worker_state["shm_name"] = None
+        _worker_state["shm"] = None
+        shm, data = attach_dataset(data_descriptor)
+        _worker_state["shm_name"] = data_descriptor["shm_name"]
+        _worker_state["shm"] = shm
+        _worker_state["data"] = data
+
+    return run_benchmark_job(
+        dataset,
+        algorithm,
+        _worker_state["data"],
+        cache_dir=cache_dir,
+        system_version=system_version,
+        verbose=verbose,
+        timing_policy=timing_policy,
+        estimate=estimate,
+        decode_only=decode_only,
+    )
+
+
+def run_jobs_in_parallel(
+    jobs: List[Dict[str, Any]],
+    *,
+    num_workers: int,
+    cache_dir: str,
+    system_version: str,
+    verbose: bool = True,
+    timing_policy: Optional[Dict[str, Any]] = None,
+    estimate: bool = False,
+    decode_only: bool = False,
+    pin_cores: bool = False,
+    max_jobs_per_numa_node: Optional[int] = None,
+    max_live_datasets: int = 2,
+    on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Run benchmark jobs on a pool of worker processes.
+
+    Each job is a dictionary with "dataset" and "algorithm" entries. Since the
+    registry entries hold lambdas, which cannot be sent to other processes,
+    workers look both up again by name in the registries. Every job therefore
+    has to refer to a registered algorithm (or a pipeline spec, which workers
+    build again from its name) and a registered dataset.
+
+    Each dataset is loaded only once, in this process, from the local dataset
+    store and published to the workers through shared memory, so workers get a
+    zero-copy read-only view instead of recreating the array. A dataset's shared memory is released as
+    soon as all of its jobs are done, and at most max_live_datasets are
+    published at any time to bound memory usage.
+
+    Args:
+        jobs: List of jobs to run
+        num_workers: Number of worker processes
+        cache_dir: Directory to store cached results
+        system_version: Version of the benchmarking system
+        verbose: Whether to print progress messages
+        timing_policy: Optional overrides for the default timing policy
+        estimate: Whether to estimate results from sampled chunks
+        decode_only: Whether to rerun only decoding on cached compressed data
+        pin_cores: Whether to pin each worker to its own physical core
+        max_jobs_per_numa_node: Optional maximum number of concurrent jobs per NUMA node
+        max_live_datasets: Maximum number of datasets held in shared memory at once
+        on_result: Optional callback invoked with (job, result) as each job completes
+
+    Returns:
+        List of results in the same order as jobs
+    """
+    registered_datasets = {ds["name"]: ds for ds in datasets}
+    for job in jobs:
+        alg_name = job["algorithm"]["name"]
+        ds_name = job["dataset"]["name"]
+        try:
+            registered_algorithm = find_algorithm(alg_name)
+        except ValueError:
+            registered_algorithm = None
+        if registered_algorithm is not job["algorithm"]:
+            raise ValueError(
+                f"Algorithm {alg_name} is not registered and cannot be run in parallel"
+            )
+        if registered_datasets.get(ds_name) is not job["dataset"]:
+            raise ValueError(
+                f"Dataset {ds_name} is not registered and cannot be run in parallel"
+            )
+
+    worker_cpus = plan_worker_cpus(num_workers, pin_cores, max_jobs_per_numa_node)
+    cpu_queue = None
+    if worker_cpus is not None:
+        num_workers = len(worker_cpus)
+        cpu_queue = multiprocessing.Queue()
+        for cpus in worker_cpus:
+            cpu_queue.put(cpus)
+
+    print(f"Running {len(jobs)} benchmarks on {num_workers} worker processes")
+
+    # Group jobs by dataset, keeping the original order
+    jobs_by_dataset: Dict[str, List[int]] = {}
+    for i, job in enumerate(jobs):
+        jobs_by_dataset.setdefault(job["dataset"]["name"], []).append(i)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+    live_datasets: Dict[str, Dict[str, Any]] = {}
+    futures: Dict[Any, int] = {}
+    not_done: Set[Any] = set()
+
+    def handle_completed(done: Set[Any]) -> None:
+        for future in done:
+            i = futures[future]
+            result = future.result()
+            results[i] = result
+            if on_result is not None:
+                on_result(jobs[i], result)
+            live = live_datasets[jobs[i]["dataset"]["name"]]
+            live["remaining"] -= 1
+            if live["remaining"] == 0:
+                release_dataset(live["shm"])
+                del live_datasets[jobs[i]["dataset"]["name"]]
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(cpu_queue,),
+        ) as executor:
+            for dataset_name, job_indices in jobs_by_dataset.items():
+                while len(live_datasets) >= max_live_datasets and not_done:
+                    done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                    handle_completed(done)
+
+                dataset = jobs[job_indices[0]]["dataset"]
+                data = load_dataset(dataset, cache_dir, verbose)
+                print(
+                    f"Loaded dataset {dataset_name}: shape={data.shape}, dtype={data.dtype}"
+                )
+                shm, descriptor = publish_dataset(data)
+                del data
+                live_datasets[dataset_name] = {
+                    "shm": shm,
+                    "remaining": len(job_indices),
+                }
+
+                for i in job_indices:
+                    future = executor.submit(
+                        _run_job_in_worker,
+                        dataset_name,
+                        jobs[i]["algorithm"]["name"],
+                        descriptor,
+                        cache_dir,
+                        system_version,
+                        verbose,
+                        timing_policy,
+                        estimate,
+                        decode_only,
+                    )
+                    futures[future] = i
+                    not_done.add(future)
+
+            while not_done:
+                done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+                handle_completed(done)
+    finally:
+        for live in live_datasets.values():
+            release_dataset(live["shm"])
+
+    return [result for result in results if result is not None]
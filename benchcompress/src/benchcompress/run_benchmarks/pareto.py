@@ -0,0 +1,69 @@
+from typing import Any, Dict, List
+
+SPEED_KEYS = {
+    "encode": "encode_mb_per_sec",
+    "decode": "decode_mb_per_sec",
+}
+
+
+def pareto_frontier(
+    results: List[Dict[str, Any]], speed_key: str
+) -> List[Dict[str, Any]]:
+    """Find the results that are not dominated in compression ratio and speed.
+
+    A result is dominated when another result is at least as good in both
+    compression ratio and speed and better in one of them.
+
+    Args:
+        results: Benchmark results (all for the same dataset)
+        speed_key: Result field holding the speed, e.g. "encode_mb_per_sec"
+
+    Returns:
+        The results on the frontier, ordered by increasing compression ratio
+        (and so by decreasing speed)
+    """
+    frontier: List[Dict[str, Any]] = []
+    best_ratio = float("-inf")
+    # Fastest first: a result is on the frontier when it compresses better
+    # than every faster result
+    for result in sorted(
+        results, key=lambda r: (-r[speed_key], -r["compression_ratio"])
+    ):
+        if result["compression_ratio"] > best_ratio:
+            frontier.append(result)
+            best_ratio = result["compression_ratio"]
+    return frontier[::-1]
+
+
+def compute_pareto_frontiers(
+    results: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Compute the ratio/encode-speed and ratio/decode-speed frontiers per dataset.
+
+    Args:
+        results: Benchmark results, as returned by run_benchmarks
+
+    Returns:
+        One entry per dataset, in order of first appearance, with the points of
+        the "encode" and "decode" frontiers. Each point holds the algorithm,
+        compression ratio and both speeds.
+    """
+    by_dataset: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        by_dataset.setdefault(result["dataset"], []).append(result)
+
+    frontiers = []
+    for dataset_name, dataset_results in by_dataset.items():
+        entry: Dict[str, Any] = {"dataset": dataset_name}
+        for name, speed_key in SPEED_KEYS.items():
+            entry[name] = [
+                {
+                    "algorithm": result["algorithm"],
+                    "compression_ratio": result["compression_ratio"],
+                    "encode_mb_per_sec": result["encode_mb_per_sec"],
+                    "decode_mb_per_sec": result["decode_mb_per_sec"],
+                }
+                for result in pareto_frontier(dataset_results, speed_key)
+            ]
+        frontiers.append(entry)
+    return frontiers
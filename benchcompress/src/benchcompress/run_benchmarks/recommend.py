@@ -0,0 +1,202 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from ..algorithms import algorithms
+from .._analysis import compute_entropy_per_sample
+from .benchmark_estimate import measure_chunks
+from .cache_management import find_local_result
+from .dataset_store import load_dataset
+from .is_compatible import is_compatible
+from .run_benchmarks import system_version
+from .sampling import DEFAULT_NUM_CHUNKS, DEFAULT_CHUNK_SAMPLES, sample_chunks
+
+
+def estimate_on_chunks(
+    algorithm: Dict[str, Any], chunks: List[np.ndarray]
+) -> Dict[str, Any]:
+    """Estimate the compression ratio and throughput of an algorithm on chunks.
+
+    Args:
+        algorithm: Algorithm dictionary
+        chunks: Sampled chunks of the array
+
+    Returns:
+        Dictionary with the compression ratio and the encode/decode MB/s over
+        all chunks
+
+    Raises:
+        ValueError: If a chunk does not decode to the original data
+    """
+    m = measure_chunks(
+        chunks, algorithm["name"], algorithm["encode"], algorithm["decode"]
+    )
+    size_mb = m["original_sizes"].sum() / (1024 * 1024)
+    return {
+        "compression_ratio": float(
+            m["original_sizes"].sum() / m["compressed_sizes"].sum()
+        ),
+        "encode_mb_per_sec": float(size_mb / m["encode_times"].sum()),
+        "decode_mb_per_sec": float(size_mb / m["decode_times"].sum()),
+    }
+
+
+def compute_entropy_bounds(
+    chunks: List[np.ndarray], dataset_tags: List[str]
+) -> Dict[str, float]:
+    """Compute entropy-based bounds on the compression ratio of sampled chunks.
+
+    The order-0 bound is the best ratio of a coder that treats samples as
+    independent. For 1-D integer time series, the bound of the same coder
+    applied to consecutive differences is reported as well.
+
+    Args:
+        chunks: Sampled chunks of the array
+        dataset_tags: Tags of the dataset
+
+    Returns:
+        Dictionary with entropy_bits_per_sample and entropy_ratio_bound, and
+        delta_entropy_bits_per_sample and delta_entropy_ratio_bound for 1-D
+        integer time series
+    """
+    bits = chunks[0].dtype.itemsize * 8
+
+    def ratio_bound(entropy: float) -> float:
+        return bits / entropy if entropy > 0 else float("inf")
+
+    samples = np.concatenate([chunk.ravel() for chunk in chunks])
+    entropy = compute_entropy_per_sample(samples)
+    bounds = {
+        "entropy_bits_per_sample": entropy,
+        "entropy_ratio_bound": ratio_bound(entropy),
+    }
+    if all(tag in dataset_tags for tag in ["timeseries", "1d", "integer"]):
+        diffs = np.concatenate(
+            [np.diff(chunk.ravel().astype(np.int64)) for chunk in chunks]
+        )
+        delta_entropy = compute_entropy_per_sample(diffs)
+        bounds["delta_entropy_bits_per_sample"] = delta_entropy
+        bounds["delta_entropy_ratio_bound"] = ratio_bound(delta_entropy)
+    return bounds
+
+
+def recommend_algorithm(
+    dataset: Dict[str, Any],
+    *,
+    cache_dir: str = ".benchmark_cache",
+    min_encode_mbps: Optional[float] = None,
+    min_decode_mbps: Optional[float] = None,
+    min_compression_ratio: Optional[float] = None,
+    candidates: Optional[List[Dict[str, Any]]] = None,
+    num_chunks: int = DEFAULT_NUM_CHUNKS,
+    chunk_samples: int = DEFAULT_CHUNK_SAMPLES,
+    verbose: bool = True,
+) -> Dict[str, Any]:
+    """Recommend the algorithm with the best compression ratio under constraints.
+
+    Instead of benchmarking every algorithm on the full dataset, each
+    compatible algorithm compresses the same stratified sample of chunks of
+    the array, so that all ratios are measured on the same basis. Timings of
+    small chunks are dominated by per-call costs, so the throughput is taken
+    from a local cached result for the dataset when there is one
+    (full-dataset measurements), and from the sample otherwise. Algorithms
+    meeting all constraints are ranked by compression ratio, then by decode
+    speed.
+
+    Args:
+        dataset: Dataset dictionary
+        cache_dir: Cache directory (dataset store and cached results)
+        min_encode_mbps: Optional minimum encode throughput in MB/s
+        min_decode_mbps: Optional minimum decode throughput in MB/s
+        min_compression_ratio: Optional minimum compression ratio
+        candidates: Algorithms to consider (default: all registered algorithms)
+        num_chunks: Number of sampled chunks
+        chunk_samples: Number of samples per chunk
+        verbose: Whether to print progress messages
+
+    Returns:
+        Dictionary with the recommended algorithm name (None if no algorithm
+        meets the constraints), the entropy bounds of the sample and the
+        estimates of all candidates, ordered from best to worst ("source"
+        is where the throughput comes from: "cached", "estimated" for a
+        cached estimate, or "sampled")
+    """
+    data = load_dataset(dataset, cache_dir, verbose)
+    chunks = sample_chunks(data, num_chunks, chunk_samples)
+    dataset_tags = dataset.get("tags", [])
+    if verbose:
+        print(
+            f"Sampled {len(chunks)} chunk(s) of shape {chunks[0].shape} "
+            f"from {dataset['name']} (shape={data.shape}, dtype={data.dtype})"
+        )
+
+    estimates = []
+    for algorithm in algorithms if candidates is None else candidates:
+        if not is_compatible(algorithm.get("tags", []), dataset_tags):
+            continue
+        cached = find_local_result(
+            cache_dir,
+            dataset["name"],
+            algorithm["name"],
+            algorithm["version"],
+            dataset["version"],
+            system_version,
+        )
+        try:
+            estimate = estimate_on_chunks(algorithm, chunks)
+        except Exception as e:
+            print(f"  Warning: Skipping {algorithm['name']}: {str(e)}")
+            continue
+        estimate["source"] = "sampled"
+        if cached is not None:
+            estimate.update(
+                {
+                    "encode_mb_per_sec": cached["encode_mb_per_sec"],
+                    "decode_mb_per_sec": cached["decode_mb_per_sec"],
+                    "source": "estimated" if cached.get("estimated") else "cached",
+                }
+            )
+        estimate["algorithm"] = algorithm["name"]
+        estimate["meets_constraints"] = (
+            (
+                min_encode_mbps is None
+                or estimate["encode_mb_per_sec"] >= min_encode_mbps
+            )
+            and (
+                min_decode_mbps is None
+                or estimate["decode_mb_per_sec"] >= min_decode_mbps
+            )
+            and (
+                min_compression_ratio is None
+                or estimate["compression_ratio"] >= min_compression_ratio
+            )
+        )
+        if verbose:
+            print(
+                f"  {algorithm['name']}: ratio {estimate['compression_ratio']:.3f}, "
+                f"encode {estimate['encode_mb_per_sec']:.1f} MB/s, "
+                f"decode {estimate['decode_mb_per_sec']:.1f} MB/s "
+                f"({estimate['source']} throughput)"
+            )
+        estimates.append(estimate)
+
+    estimates.sort(
+        key=lambda e: (
+            e["meets_constraints"],
+            e["compression_ratio"],
+            e["decode_mb_per_sec"],
+        ),
+        reverse=True,
+    )
+    recommended = (
+        estimates[0]["algorithm"]
+        if estimates and estimates[0]["meets_constraints"]
+        else None
+    )
+    return {
+        "dataset": dataset["name"],
+        "recommended": recommended,
+        "num_chunks": len(chunks),
+        "chunk_shape": list(chunks[0].shape),
+        **compute_entropy_bounds(chunks, dataset_tags),
+        "candidates": estimates,
+    }
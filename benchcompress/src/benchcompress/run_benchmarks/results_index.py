@@ -0,0 +1,336 @@
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+INDEX_FILENAME = "results.sqlite"
+
+# Seconds a connection waits for a lock held by another process (e.g. a
+# parallel worker saving its result) before giving up
+BUSY_TIMEOUT = 60.0
+
+# Fields identifying a result; results migrated from metadata.json files may
+# predate system_version
+_KEY_FIELDS = (
+    "dataset",
+    "algorithm",
+    "algorithm_version",
+    "dataset_version",
+    "system_version",
+)
+
+# (dataset, algorithm, algorithm_version, dataset_version)
+ResultKey = Tuple[str, str, str, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    dataset TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    algorithm_version TEXT NOT NULL,
+    dataset_version TEXT NOT NULL,
+    system_version TEXT NOT NULL,
+    estimated INTEGER NOT NULL DEFAULT 0,
+    result TEXT NOT NULL,
+    blob_digest TEXT,
+    PRIMARY KEY (dataset, algorithm, algorithm_version, dataset_version, system_version)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_last_used ON blobs (last_used);
+CREATE TABLE IF NOT EXISTS index_metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def get_index_path(cache_dir: str) -> str:
+    """Get the path of the results index of a cache directory."""
+    return os.path.join(cache_dir, INDEX_FILENAME)
+
+
+@contextmanager
+def open_results_index(cache_dir: str) -> Iterator[sqlite3.Connection]:
+    """Open the SQLite results index of a cache directory, creating it if needed.
+
+    The index is used in WAL mode, so readers never block and writers from
+    several processes (the parallel workers) queue on the database lock
+    instead of failing. When the index is created, results cached by earlier
+    versions as cache_dir/<dataset>/<algorithm>/metadata.json are imported.
+
+    Args:
+        cache_dir: Cache directory
+
+    Yields:
+        Connection in autocommit mode; writes use explicit transactions
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    conn = sqlite3.connect(
+        get_index_path(cache_dir), timeout=BUSY_TIMEOUT, isolation_level=None
+    )
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _add_missing_columns(conn)
+        _migrate_metadata_files(conn, cache_dir)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    # Indexes created before compressed data moved to the blob store
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(results)")]
+    if "blob_digest" not in columns:
+        try:
+            conn.execute("ALTER TABLE results ADD COLUMN blob_digest TEXT")
+        except sqlite3.OperationalError:
+            # Added by another process in the meantime
+            pass
+
+
+def _is_migrated(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT value FROM index_metadata WHERE key = 'migrated_metadata_files'"
+    ).fetchone()
+    return row is not None
+
+
+def _iter_metadata_results(cache_dir: str) -> Iterator[Dict[str, Any]]:
+    for dataset_dir in os.listdir(cache_dir):
+        # cache_dir/datasets holds the dataset store, not results
+        dataset_path = os.path.join(cache_dir, dataset_dir)
+        if dataset_dir == "datasets" or not os.path.isdir(dataset_path):
+            continue
+        for algorithm_dir in os.listdir(dataset_path):
+            metadata_file = os.path.join(dataset_path, algorithm_dir, "metadata.json")
+            if not os.path.exists(metadata_file):
+                continue
+            try:
+                with open(metadata_file, "r") as f:
+                    cached_data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(cached_data, dict) and isinstance(
+                cached_data.get("result"), dict
+            ):
+                yield cached_data["result"]
+
+
+def _migrate_metadata_files(conn: sqlite3.Connection, cache_dir: str) -> None:
+    if _is_migrated(conn):
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated while we waited for the lock
+        if not _is_migrated(conn):
+            num_imported = 0
+            for result in _iter_metadata_results(cache_dir):
+                if all(field in result for field in _KEY_FIELDS[:-1]):
+                    num_imported += _insert_result(conn, result, replace=False)
+            conn.execute(
+                "INSERT INTO index_metadata (key, value) "
+                "VALUES ('migrated_metadata_files', ?)",
+                (str(num_imported),),
+            )
+            if num_imported:
+                print(
+                    f"Imported {num_imported} cached result(s) into the results index"
+                )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _insert_result(
+    conn: sqlite3.Connection,
+    result: Dict[str, Any],
+    replace: bool,
+    blob_digest: Optional[str] = None,
+) -> int:
+    # An estimate never replaces a full result with the same key
+    conflict = (
+        "ON CONFLICT (dataset, algorithm, algorithm_version, dataset_version, "
+        "system_version) DO UPDATE SET estimated = excluded.estimated, "
+        "result = excluded.result, blob_digest = excluded.blob_digest "
+        "WHERE results.estimated = 1 OR excluded.estimated = 0"
+        if replace
+        else "ON CONFLICT DO NOTHING"
+    )
+    cursor = conn.execute(
+        "INSERT INTO results "
+        "(dataset, algorithm, algorithm_version, dataset_version, system_version, "
+        "estimated, result, blob_digest) VALUES (?, ?, ?, ?, ?, ?, ?, ?) " + conflict,
+        (
+            result["dataset"],
+            result["algorithm"],
+            result["algorithm_version"],
+            result["dataset_version"],
+            # Results from before system versions were recorded
+            result.get("system_version", ""),
+            int(bool(result.get("estimated", False))),
+            json.dumps(result),
+            blob_digest,
+        ),
+    )
+    return cursor.rowcount
+
+
+def put_result(
+    conn: sqlite3.Connection,
+    result: Dict[str, Any],
+    blob_digest: Optional[str] = None,
+) -> bool:
+    """Store a benchmark result, replacing any result with the same key.
+
+    Estimated results only replace estimated results, so that an estimate
+    run (even with force) never discards a full result and its compressed
+    data.
+
+    Args:
+        conn: Connection to the results index
+        result: Benchmark result, with dataset, algorithm and version fields
+        blob_digest: Digest of the compressed data in the blob store, if any
+
+    Returns:
+        Whether the result was stored
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        stored = _insert_result(conn, result, replace=True, blob_digest=blob_digest)
+        conn.execute("COMMIT")
+        return stored > 0
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def put_results(conn: sqlite3.Connection, results: List[Dict[str, Any]]) -> int:
+    """Store benchmark results in one transaction, as put_result does.
+
+    Args:
+        conn: Connection to the results index
+        results: Benchmark results, with dataset, algorithm and version fields
+
+    Returns:
+        Number of results stored
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        stored = sum(_insert_result(conn, result, replace=True) for result in results)
+        conn.execute("COMMIT")
+        return stored
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def get_result(
+    conn: sqlite3.Connection,
+    key: ResultKey,
+    system_version: str,
+    accept_estimated: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """Look up the result of one dataset/algorithm pair.
+
+    Args:
+        conn: Connection to the results index
+        key: (dataset, algorithm, algorithm_version, dataset_version)
+        system_version: Version of the benchmarking system
+        accept_estimated: Whether an estimated result may be returned
+
+    Returns:
+        The result, or None if there is no matching result
+    """
+    row = conn.execute(
+        "SELECT result FROM results WHERE dataset = ? AND algorithm = ? "
+        "AND algorithm_version = ? AND dataset_version = ? AND system_version = ? "
+        "AND (estimated = 0 OR ?)",
+        (*key, system_version, int(accept_estimated)),
+    ).fetchone()
+    return json.loads(row[0]) if row is not None else None
+
+
+def get_result_blob_digest(
+    conn: sqlite3.Connection, key: ResultKey, system_version: str
+) -> Optional[str]:
+    """Get the blob store digest of the compressed data of a result.
+
+    Args:
+        conn: Connection to the results index
+        key: (dataset, algorithm, algorithm_version, dataset_version)
+        system_version: Version of the benchmarking system
+
+    Returns:
+        The digest, or None if there is no result or it has no compressed
+        data (estimated results, results imported from memobin)
+    """
+    row = conn.execute(
+        "SELECT blob_digest FROM results WHERE dataset = ? AND algorithm = ? "
+        "AND algorithm_version = ? AND dataset_version = ? AND system_version = ?",
+        (*key, system_version),
+    ).fetchone()
+    return row[0] if row is not None else None
+
+
+def find_results(
+    conn: sqlite3.Connection,
+    keys: List[ResultKey],
+    system_version: str,
+    accept_estimated: bool = True,
+) -> Dict[ResultKey, Dict[str, Any]]:
+    """Look up the results of many dataset/algorithm pairs in one query.
+
+    Args:
+        conn: Connection to the results index
+        keys: (dataset, algorithm, algorithm_version, dataset_version) of
+            each pair
+        system_version: Version of the benchmarking system
+        accept_estimated: Whether estimated results may be returned
+
+    Returns:
+        The results found, by key
+    """
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS wanted (dataset TEXT, algorithm TEXT, "
+        "algorithm_version TEXT, dataset_version TEXT)"
+    )
+    conn.execute("DELETE FROM wanted")
+    conn.executemany("INSERT INTO wanted VALUES (?, ?, ?, ?)", keys)
+    rows = conn.execute(
+        "SELECT w.dataset, w.algorithm, w.algorithm_version, w.dataset_version, "
+        "r.result FROM wanted w JOIN results r ON r.dataset = w.dataset "
+        "AND r.algorithm = w.algorithm AND r.algorithm_version = w.algorithm_version "
+        "AND r.dataset_version = w.dataset_version AND r.system_version = ? "
+        "AND (r.estimated = 0 OR ?)",
+        (system_version, int(accept_estimated)),
+    ).fetchall()
+    return {tuple(row[:4]): json.loads(row[4]) for row in rows}
+
+
+def find_missing_pairs(
+    conn: sqlite3.Connection,
+    keys: List[ResultKey],
+    system_version: str,
+    accept_estimated: bool = True,
+) -> List[ResultKey]:
+    """Find which dataset/algorithm pairs have no result, in one query.
+
+    Args:
+        conn: Connection to the results index
+        keys: (dataset, algorithm, algorithm_version, dataset_version) of
+            each pair
+        system_version: Version of the benchmarking system
+        accept_estimated: Whether estimated results count as results
+
+    Returns:
+        The keys without a result, in the order given
+    """
+    found = find_results(conn, keys, system_version, accept_estimated)
+    return [key for key in keys if key not in found]
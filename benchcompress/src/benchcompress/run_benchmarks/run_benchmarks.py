@@ -1,19 +1,22 @@
 import os
 import time
+import requests
 from typing import Dict, Any, List, Optional
-import numpy as np
 
 from ..algorithms import algorithms
 from ..datasets import datasets
-from ._memobin import construct_memobin_url, upload_to_memobin
-from .upload_dataset import upload_dataset_to_memobin
-from .cache_management import check_cached_result, save_result_to_cache
-from .benchmark_timing import run_compression_benchmark
+from .cache_management import fetch_memobin_result, store_manifest_results
+from .results_index import open_results_index, find_results
+from .memobin_manifest import fetch_memobin_manifest, update_memobin_manifest
+from ._memobin import get_memobin_client
+from .benchmark_job import run_benchmark_job
+from .parallel_executor import run_jobs_in_parallel
+from .dataset_store import load_dataset
 from .collect_info import collect_algorithm_info, collect_dataset_info
 from .is_compatible import is_compatible
 from .upload_benchmark_status import upload_benchmark_status
 
-system_version = "v6"
+system_version = "v8"
 
 
 def run_benchmarks(
@@ -22,15 +25,54 @@ def run_benchmarks(
     selected_algorithms: Optional[List[dict]] = None,
     selected_datasets: Optional[List[dict]] = None,
     force: bool = False,
+    timing_policy: Optional[Dict[str, Any]] = None,
+    estimate: bool = False,
+    decode_only: bool = False,
+    jobs: int = 1,
+    pin_cores: bool = False,
+    max_jobs_per_numa_node: Optional[int] = None,
 ) -> Dict[str, Any]:
     """Run all benchmarks, with caching based on algorithm and dataset versions.
 
-    Results are stored in separate directories for each dataset/algorithm combination:
+    Results are stored in a SQLite results index keyed by dataset, algorithm,
+    their versions and the system version, and compressed data in a
+    content-addressed blob store referenced by the results:
     cache_dir/
-        dataset_name/
-            algorithm_name/
-                metadata.json  # Contains algorithm version, dataset version, and results
-                compressed.dat # The actual compressed data
+        results.sqlite     # The results index
+        blobs/
+            ab/
+                abcdef...  # Compressed data, named by its SHA-256 digest
+        datasets/
+            dataset_name/
+                dataset_version/
+                    data.npy       # The materialized dataset, loaded memory-mapped
+                    metadata.json  # Shape, dtype and sha256 of the dataset
+
+    Cached results are looked up first for every compatible pair, with a single
+    query of the results index. For the pairs missing from it, the memobin
+    manifest of the system version is fetched once; it carries the hosted
+    results, which are added to the index, and the other pairs are run
+    without further requests. Without a published manifest, the missing
+    pairs are downloaded one by one, concurrently.
+    Results cached by earlier versions as metadata.json files are imported
+    into the index on first use, and their compressed.dat files into the blob
+    store by "benchcompress cache gc". The pairs that still need to run are
+    then executed either serially or, with jobs > 1, on a pool of worker
+    processes. Either way the results are returned in dataset/algorithm
+    order.
+
+    With estimate, ratio and throughput are extrapolated from a stratified
+    sample of chunks, with confidence intervals, instead of being measured on
+    the whole dataset. Estimated results are cached with an "estimated" flag;
+    they are reused by later estimate runs but rerun by full runs, while
+    estimate runs reuse full results when available.
+
+    With decode_only, every pair is rerun, but only decoding and verification
+    are timed, on the compressed data cached in the blob store, and only the
+    decode fields of the cached result are updated. This is for decoder
+    upgrades, where the encoded output does not change and slow encoders
+    (lzma-9, brotli-11) would dominate a full rerun. Pairs without cached
+    compressed data are benchmarked in full.
 
     Args:
         cache_dir: Directory to store cached results
@@ -38,18 +80,27 @@ def run_benchmarks(
         selected_algorithms: Optional list of specific algorithms to run
         selected_datasets: Optional list of specific datasets to run
         force: If True, ignore cached results
+        timing_policy: Optional overrides for the default timing policy
+            (warmup_iterations, min_trials, max_trials, time_budget, ...)
+        estimate: If True, estimate results from sampled chunks
+        decode_only: If True, rerun only decoding and verification on the
+            cached compressed data of each pair
+        jobs: Number of benchmarks to run concurrently in separate processes
+        pin_cores: Whether to pin each worker process to its own physical core
+        max_jobs_per_numa_node: Optional maximum number of concurrent jobs per NUMA node
 
     Returns:
         Dictionary containing benchmark results and metadata
     """
+    if estimate and decode_only:
+        raise ValueError("estimate and decode_only cannot be combined")
+
     print("\n=== Starting Benchmark Run ===")
     print(f"Cache directory: {cache_dir}")
 
     os.makedirs(cache_dir, exist_ok=True)
 
     start_time = time.time()
-    last_status_upload = 0  # Track last status upload time
-    results = []
     print("\nRunning benchmarks for all dataset-algorithm combinations...")
 
     # Use selected datasets/algorithms or fall back to all
@@ -66,148 +117,234 @@ def run_benchmarks(
         if is_compatible(algorithm.get("tags", []), dataset.get("tags", []))
     )
 
-    # Run benchmarks for each dataset and algorithm combination
     memobin_api_key = os.environ.get("MEMOBIN_API_KEY")
     upload_enabled = os.environ.get("UPLOAD_TO_MEMOBIN") == "1"
 
-    for dataset in datasets_to_run:
-        dataset_tags = dataset.get("tags", [])
-        print(f"\n*** Dataset: {dataset['name']} (tags: {dataset_tags}) ***")
+    # One slot per compatible pair, in dataset/algorithm order
+    result_slots: List[Optional[Dict[str, Any]]] = []
+    completed: List[Dict[str, Any]] = []
+    pending_jobs: List[Dict[str, Any]] = []
+    last_status_upload = 0.0  # Track last status upload time
 
-        # only create the dataset if it is needed
-        data = None
+    # Results uploaded to memobin by this run, to be listed in the manifest
+    uploaded_results: List[Dict[str, Any]] = []
 
+    def record_result(job: Dict[str, Any], result: Dict[str, Any]) -> None:
+        nonlocal last_status_upload
+        if result.pop("memobin_uploaded", False):
+            uploaded_results.append(result)
+        result_slots[job["index"]] = result
+        completed.append(result)
+
+        # Upload current status to memobin if enabled (once per minute)
+        current_time = time.time()
+        if (
+            memobin_api_key
+            and upload_enabled
+            and (current_time - last_status_upload >= 60)
+        ):  # Check if 60 seconds have passed
+            try:
+                upload_benchmark_status(
+                    memobin_api_key,
+                    job["dataset"]["name"],
+                    job["algorithm"]["name"],
+                    completed,
+                    total_benchmarks,
+                    start_time,
+                )
+                last_status_upload = current_time  # Update last upload time
+            except Exception as e:
+                print(f"  Warning: Failed to upload status to memobin: {str(e)}")
+
+    # Collect the compatible dataset and algorithm combinations
+    all_jobs: List[Dict[str, Any]] = []
+    for dataset in datasets_to_run:
+        dataset_tags = dataset.get("tags", [])
         for algorithm in algorithms_to_run:
-            alg_name = algorithm["name"]
             alg_tags = algorithm.get("tags", [])
 
             # Skip if algorithm and dataset are not compatible based on tags
             if not is_compatible(alg_tags, dataset_tags):
                 if verbose:
                     print(
-                        f"\nSkipping algorithm {alg_name} (tags: {alg_tags}) - incompatible with dataset tags"
+                        f"\nSkipping algorithm {algorithm['name']} (tags: {alg_tags}) on dataset {dataset['name']} - incompatible with dataset tags"
                     )
                 continue
 
-            print(f"\nTesting algorithm: {alg_name} on dataset: {dataset['name']}")
-
-            # Upload current status to memobin if enabled (once per minute)
-            current_time = time.time()
-            if (
-                memobin_api_key
-                and upload_enabled
-                and (current_time - last_status_upload >= 60)
-            ):  # Check if 60 seconds have passed
-                try:
-                    upload_benchmark_status(
-                        memobin_api_key,
+            all_jobs.append(
+                {
+                    "index": len(result_slots),
+                    "dataset": dataset,
+                    "algorithm": algorithm,
+                    "key": (
                         dataset["name"],
-                        alg_name,
-                        results,
-                        total_benchmarks,
-                        start_time,
-                    )
-                    last_status_upload = current_time  # Update last upload time
-                except Exception as e:
-                    print(f"  Warning: Failed to upload status to memobin: {str(e)}")
-
-            # Check if we can use cached result
-            cached_result = check_cached_result(
-                cache_dir,
-                dataset["name"],
-                alg_name,
-                algorithm["version"],
-                dataset["version"],
+                        algorithm["name"],
+                        algorithm["version"],
+                        dataset["version"],
+                    ),
+                }
+            )
+            result_slots.append(None)
+
+    # Look up all of them in the results index at once
+    local_results: Dict[Any, Dict[str, Any]] = {}
+    if not force and not decode_only:
+        with open_results_index(cache_dir) as conn:
+            local_results = find_results(
+                conn,
+                [job["key"] for job in all_jobs],
                 system_version,
-                force,
-                verbose,
+                accept_estimated=estimate,
             )
+    print(
+        f"\nFound {len(local_results)} of {total_benchmarks} results in the local cache"
+    )
 
-            if cached_result is not None:
-                print("  Using cached result")
-                results.append(cached_result)
-                continue
+    # Fetch the memobin manifest once: it carries the hosted results, which
+    # are added to the local index without further requests. Without a
+    # published manifest, every missing pair is looked up.
+    use_memobin = not force and not decode_only
+    manifest = None
+    if use_memobin and len(local_results) < len(all_jobs):
+        try:
+            manifest = fetch_memobin_manifest(system_version, verbose)
+        except requests.RequestException as e:
+            print(f"  Warning: Failed to fetch the memobin manifest: {str(e)}")
+            print("  Missing results will be run locally")
+            use_memobin = False
 
-            print(f"  Running benchmark for {alg_name} on {dataset['name']}...")
-            if data is None:
-                data = dataset["create"]()
-                print(f"Created dataset: shape={data.shape}, dtype={data.dtype}")
-            else:
-                print("Dataset already created")
+    downloaded_results: Dict[Any, Dict[str, Any]] = {}
+    if manifest:
+        downloaded_results = store_manifest_results(
+            cache_dir,
+            {
+                job["key"]: manifest[job["key"]]
+                for job in all_jobs
+                if job["key"] not in local_results and job["key"] in manifest
+            },
+            system_version,
+            accept_estimated=estimate,
+        )
+        print(f"  Found {len(downloaded_results)} result(s) in the manifest")
 
-            # Upload dataset to memobin if enabled
-            if memobin_api_key and upload_enabled:
-                try:
-                    upload_dataset_to_memobin(
-                        data,
-                        dataset["name"],
-                        dataset["version"],
-                        memobin_api_key,
-                        cache_dir,
-                        verbose,
-                    )
-                except Exception as e:
-                    print(f"  Warning: Failed to upload dataset to memobin: {str(e)}")
+    # Download the missing ones that memobin may have, concurrently: all of
+    # them without a manifest, or those listed by hash only in an older one
+    to_download = [
+        job
+        for job in all_jobs
+        if job["key"] not in local_results
+        and use_memobin
+        and (
+            manifest is None
+            or (job["key"] in manifest and "result" not in manifest[job["key"]])
+        )
+    ]
 
-            # Run the benchmark
-            result, encoded = run_compression_benchmark(
-                data,
-                alg_name,
-                algorithm["encode"],
-                algorithm["decode"],
-                verbose,
-            )
+    def download_result(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return fetch_memobin_result(
+            cache_dir,
+            job["dataset"]["name"],
+            job["algorithm"]["name"],
+            job["algorithm"]["version"],
+            job["dataset"]["version"],
+            system_version,
+            verbose=False,
+            accept_estimated=estimate,
+            expected_hash=manifest[job["key"]]["sha256"] if manifest else None,
+        )
 
-            # Add metadata to result
-            result.update(
-                {
-                    "dataset": dataset["name"],
-                    "algorithm": alg_name,
-                    "algorithm_version": algorithm["version"],
-                    "dataset_version": dataset["version"],
-                    "system_version": system_version,
-                }
-            )
-            results.append(result)
-
-            # Save result and compressed data
-            save_result_to_cache(
-                result,
-                encoded,
-                cache_dir,
-                dataset["name"],
-                alg_name,
-            )
+    if to_download:
+        print(f"Looking for {len(to_download)} result(s) in memobin...")
+        num_downloaded = 0
+        for job, result in zip(
+            to_download, get_memobin_client().map(download_result, to_download)
+        ):
+            if result is not None:
+                downloaded_results[job["key"]] = result
+                num_downloaded += 1
+        print(f"  Downloaded {num_downloaded} result(s) from memobin")
+
+    for job in all_jobs:
+        cached_result = local_results.get(job["key"]) or downloaded_results.get(
+            job["key"]
+        )
+        if cached_result is None:
+            if verbose:
+                print(
+                    f"Scheduled for benchmarking: {job['algorithm']['name']}"
+                    f" on dataset: {job['dataset']['name']}"
+                )
+            pending_jobs.append(job)
+            continue
+
+        cached_result["cache_status"] = "cached"
+        record_result(job, cached_result)
+
+    print(f"\n{len(pending_jobs)} of {total_benchmarks} benchmarks need to be run")
+
+    if jobs > 1 and len(pending_jobs) > 1:
+        run_jobs_in_parallel(
+            pending_jobs,
+            num_workers=min(jobs, len(pending_jobs)),
+            cache_dir=cache_dir,
+            system_version=system_version,
+            verbose=verbose,
+            timing_policy=timing_policy,
+            estimate=estimate,
+            decode_only=decode_only,
+            pin_cores=pin_cores,
+            max_jobs_per_numa_node=max_jobs_per_numa_node,
+            on_result=record_result,
+        )
+    else:
+        # only load each dataset once, and only if it is needed
+        data = None
+        data_name = None
+        for job in pending_jobs:
+            dataset = job["dataset"]
             print(
-                f"  Results saved to: {os.path.join(cache_dir, dataset['name'], alg_name)}"
+                f"\nBenchmarking algorithm: {job['algorithm']['name']} on dataset: {dataset['name']}"
+            )
+            if data_name != dataset["name"]:
+                data = None
+                data = load_dataset(dataset, cache_dir, verbose)
+                data_name = dataset["name"]
+                print(f"Loaded dataset: shape={data.shape}, dtype={data.dtype}")
+            else:
+                print("Dataset already loaded")
+
+            result = run_benchmark_job(
+                dataset,
+                job["algorithm"],
+                data,
+                cache_dir=cache_dir,
+                system_version=system_version,
+                verbose=verbose,
+                timing_policy=timing_policy,
+                estimate=estimate,
+                decode_only=decode_only,
             )
+            record_result(job, result)
 
-            # Upload to memobin if enabled
-            if memobin_api_key and upload_enabled:
-                try:
-                    memobin_url = construct_memobin_url(
-                        alg_name,
-                        dataset["name"],
-                        algorithm["version"],
-                        dataset["version"],
-                        system_version,
-                    )
-                    upload_to_memobin(
-                        {"result": result},
-                        memobin_url,
-                        memobin_api_key,
-                    )
-                    if verbose:
-                        print("  Successfully uploaded to memobin")
-                except Exception as e:
-                    print(f"  Warning: Failed to upload to memobin: {str(e)}")
+    results = [result for result in result_slots if result is not None]
 
     print("\n=== Benchmark Run Complete ===\n")
 
     # Collect algorithm and dataset information
-    algorithm_info = collect_algorithm_info(algorithms)
+    registered_names = {algorithm["name"] for algorithm in algorithms}
+    algorithm_info = collect_algorithm_info(
+        algorithms
+        + [alg for alg in algorithms_to_run if alg["name"] not in registered_names]
+    )
     dataset_info = collect_dataset_info(datasets)
 
+    # List the uploaded results in the manifest (estimates are not uploaded)
+    if memobin_api_key and upload_enabled and uploaded_results:
+        try:
+            update_memobin_manifest(uploaded_results, system_version, memobin_api_key)
+        except Exception as e:
+            print(f"  Warning: Failed to update the memobin manifest: {str(e)}")
+
     # Upload final benchmark status
     if memobin_api_key and upload_enabled:
         try:
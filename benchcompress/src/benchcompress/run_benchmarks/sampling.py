@@ -0,0 +1,50 @@
+from typing import List
+import numpy as np
+
+DEFAULT_NUM_CHUNKS = 8
+DEFAULT_CHUNK_SAMPLES = 1 << 14
+
+
+def sample_chunks(
+    data: np.ndarray,
+    num_chunks: int = DEFAULT_NUM_CHUNKS,
+    chunk_samples: int = DEFAULT_CHUNK_SAMPLES,
+    seed: int = 0,
+) -> List[np.ndarray]:
+    """Draw contiguous chunks spread over an array by stratified sampling.
+
+    The array is split along its first axis into num_chunks strata of equal
+    length and one chunk is drawn at a random offset within each stratum, so
+    that the chunks cover the whole array (e.g. the beginning and the end of a
+    recording) while not being aligned with any periodic structure. Chunks are
+    contiguous so that codecs see realistic runs of neighboring samples.
+
+    Args:
+        data: Input array
+        num_chunks: Number of chunks to draw
+        chunk_samples: Number of samples (array elements) per chunk, rounded
+            to whole rows of the first axis
+        seed: Seed of the random offsets, so that the same chunks are drawn
+            for the same array
+
+    Returns:
+        List of chunks (copies, in array order). When the array is not larger
+        than the requested sample, the whole array is returned as one chunk.
+    """
+    num_rows = data.shape[0] if data.ndim > 0 else 1
+    row_size = max(1, data.size // max(1, num_rows))
+    chunk_rows = max(1, chunk_samples // row_size)
+    if data.ndim == 0 or num_rows <= num_chunks * chunk_rows:
+        return [np.array(data)]
+
+    rng = np.random.default_rng(seed)
+    stratum_rows = num_rows // num_chunks
+    chunks = []
+    for i in range(num_chunks):
+        # The last stratum also covers the rows left over by the division
+        stratum_start = i * stratum_rows
+        stratum_end = num_rows if i == num_chunks - 1 else stratum_start + stratum_rows
+        offset = int(rng.integers(0, stratum_end - stratum_start - chunk_rows + 1))
+        start = stratum_start + offset
+        chunks.append(np.array(data[start : start + chunk_rows]))
+    return chunks
@@ -0,0 +1,63 @@
+from multiprocessing import shared_memory
+from typing import Any, Dict, Tuple
+import numpy as np
+
+
+def publish_dataset(
+    data: np.ndarray,
+) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """Copy a dataset into a new shared memory block.
+
+    The returned descriptor is small and picklable, so it can be sent to worker
+    processes, which then map the same memory with attach_dataset.
+
+    Args:
+        data: The materialized dataset array
+
+    Returns:
+        Tuple containing:
+        - shm: The shared memory block (the caller must close and unlink it)
+        - descriptor: Dictionary with the block name, shape and dtype
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    view = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+    view[...] = data
+    del view
+    descriptor = {
+        "shm_name": shm.name,
+        "shape": list(data.shape),
+        "dtype": str(data.dtype),
+    }
+    return shm, descriptor
+
+
+def attach_dataset(
+    descriptor: Dict[str, Any],
+) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Map a dataset published with publish_dataset without copying it.
+
+    Args:
+        descriptor: Descriptor returned by publish_dataset
+
+    Returns:
+        Tuple containing:
+        - shm: The attached shared memory block (the caller must close it once
+          the array is no longer referenced)
+        - data: Read-only array backed by the shared memory
+    """
+    shm = shared_memory.SharedMemory(name=descriptor["shm_name"])
+    data = np.ndarray(
+        tuple(descriptor["shape"]), dtype=descriptor["dtype"], buffer=shm.buf
+    )
+    data.flags.writeable = False
+    return shm, data
+
+
+def release_dataset(shm: shared_memory.SharedMemory) -> None:
+    """Close and unlink a shared memory block created by publish_dataset.
+
+    Args:
+        shm: The shared memory block
+    """
+    shm.close()
+    shm.unlink()
@@ -0,0 +1,263 @@
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from .benchmark_timing import run_timed_trials
+from .dataset_store import load_dataset
+from .is_compatible import is_compatible
+
+# Input sizes (bytes) of the size-scaling suite
+DEFAULT_SCALING_SIZES = [
+    4 * 1024,
+    64 * 1024,
+    1024 * 1024,
+    16 * 1024 * 1024,
+    256 * 1024 * 1024,
+]
+
+# Once encoding and decoding an input takes longer than this (seconds), larger
+# sizes are skipped for the algorithm
+DEFAULT_MAX_CALL_TIME = 10.0
+
+
+def get_sized_data(
+    dataset: Dict[str, Any],
+    max_size: int,
+    cache_dir: str,
+    verbose: bool = True,
+) -> np.ndarray:
+    """Get an array of a dataset from which prefixes of up to max_size bytes can be taken.
+
+    Datasets with a create_sized function (synthetic generators) are generated
+    with enough samples for max_size bytes. The others are loaded from the
+    dataset store at their fixed size, so larger prefixes are not available.
+
+    Args:
+        dataset: Dataset dictionary
+        max_size: Largest prefix size in bytes
+        cache_dir: Cache directory (dataset store)
+        verbose: Whether to print progress messages
+
+    Returns:
+        The array
+    """
+    if "create_sized" not in dataset:
+        return load_dataset(dataset, cache_dir, verbose)
+    # Generate a small array to find the size of a sample
+    itemsize = dataset["create_sized"](1).itemsize
+    num_samples = max(1, max_size // itemsize)
+    if verbose:
+        print(f"Generating {num_samples:,} samples of {dataset['name']}...")
+    return dataset["create_sized"](num_samples)
+
+
+def get_prefix(data: np.ndarray, size: int) -> Optional[np.ndarray]:
+    """Get the prefix of an array with about size bytes, in whole rows.
+
+    Args:
+        data: The array
+        size: Prefix size in bytes
+
+    Returns:
+        Contiguous copy of the prefix, or None if the array is smaller
+    """
+    row_bytes = data.nbytes // data.shape[0]
+    num_rows = max(1, size // row_bytes)
+    if num_rows > data.shape[0]:
+        return None
+    return np.ascontiguousarray(data[:num_rows])
+
+
+def fit_call_overhead(sizes: List[int], times: List[float]) -> Dict[str, float]:
+    """Fit time = overhead + size / throughput to the times of a curve.
+
+    The fit is weighted by 1 / time, so that small sizes, where the overhead
+    shows, count as much as large ones.
+
+    Args:
+        sizes: Input sizes in bytes
+        times: Median times in seconds
+
+    Returns:
+        Dictionary with overhead_time (seconds per call) and
+        asymptotic_mb_per_sec
+    """
+    if len(sizes) < 2:
+        return {}
+    slope, intercept = np.polyfit(
+        np.array(sizes, dtype=float),
+        np.array(times),
+        1,
+        w=1 / np.array(times),
+    )
+    return {
+        "overhead_time": max(0.0, float(intercept)),
+        "asymptotic_mb_per_sec": (
+            float(1 / (slope * 1024 * 1024)) if slope > 0 else float("inf")
+        ),
+    }
+
+
+def run_scaling_curve(
+    algorithm: Dict[str, Any],
+    data: np.ndarray,
+    sizes: List[int],
+    *,
+    timing_policy: Optional[Dict[str, Any]] = None,
+    max_call_time: float = DEFAULT_MAX_CALL_TIME,
+    verbose: bool = True,
+) -> Dict[str, Any]:
+    """Measure compression ratio and throughput of an algorithm on prefixes of an array.
+
+    Args:
+        algorithm: Algorithm dictionary
+        data: Array to take prefixes from
+        sizes: Prefix sizes in bytes, in increasing order
+        timing_policy: Optional overrides for the default timing policy
+        max_call_time: Larger sizes are skipped once encoding and decoding
+            take longer than this (seconds)
+        verbose: Whether to print progress messages
+
+    Returns:
+        Dictionary with one point per measured size (size, num_samples,
+        compression_ratio and the encode/decode timing fields) and the fitted
+        encode/decode call overhead
+    """
+    encode_fn = algorithm["encode"]
+    decode_fn = algorithm["decode"]
+    points = []
+    for size in sizes:
+        x = get_prefix(data, size)
+        if x is None:
+            if verbose:
+                print(f"  {size:,} bytes: larger than the dataset, skipped")
+            break
+        start = time.perf_counter()
+        encoded = encode_fn(x)
+        decoded = decode_fn(encoded, str(x.dtype), x.shape)
+        call_time = time.perf_counter() - start
+        if not np.array_equal(x, decoded):
+            raise ValueError(
+                f"Decompression verification failed for {algorithm['name']}"
+            )
+
+        # The call above serves as warmup. Slow calls are timed only once,
+        # and larger sizes are skipped.
+        too_slow = call_time > max_call_time
+        policy = {**(timing_policy or {}), "warmup_iterations": 0}
+        if too_slow:
+            policy.update({"min_trials": 1, "time_budget": 0})
+        encode_stats, _ = run_timed_trials(x, encode_fn, x, timing_policy=policy)
+        decode_stats, _ = run_timed_trials(
+            x, decode_fn, encoded, str(x.dtype), x.shape, timing_policy=policy
+        )
+        point = {
+            "size": int(x.nbytes),
+            "num_samples": int(x.size),
+            "compression_ratio": x.nbytes / len(encoded),
+        }
+        for prefix, stats in [("encode", encode_stats), ("decode", decode_stats)]:
+            point.update(
+                {
+                    f"{prefix}_time": stats["median_time"],
+                    f"{prefix}_mb_per_sec": stats["mb_per_sec"],
+                    f"{prefix}_mb_per_sec_ci_low": stats["mb_per_sec_ci_low"],
+                    f"{prefix}_mb_per_sec_ci_high": stats["mb_per_sec_ci_high"],
+                }
+            )
+        points.append(point)
+        if verbose:
+            print(
+                f"  {x.nbytes:,} bytes: ratio {point['compression_ratio']:.3f}, "
+                f"encode {point['encode_mb_per_sec']:.2f} MB/s, "
+                f"decode {point['decode_mb_per_sec']:.2f} MB/s"
+            )
+        if too_slow:
+            if verbose:
+                print(
+                    f"  Encoding and decoding took over {max_call_time} s,"
+                    " skipping larger sizes"
+                )
+            break
+
+    curve: Dict[str, Any] = {"points": points}
+    for prefix in ["encode", "decode"]:
+        curve[f"{prefix}_fit"] = fit_call_overhead(
+            [point["size"] for point in points],
+            [point[f"{prefix}_time"] for point in points],
+        )
+    return curve
+
+
+def run_size_scaling(
+    selected_algorithms: List[Dict[str, Any]],
+    selected_datasets: List[Dict[str, Any]],
+    *,
+    sizes: Optional[List[int]] = None,
+    cache_dir: str = ".benchmark_cache",
+    timing_policy: Optional[Dict[str, Any]] = None,
+    max_call_time: float = DEFAULT_MAX_CALL_TIME,
+    verbose: bool = True,
+) -> Dict[str, Any]:
+    """Run the size-scaling suite: each algorithm on prefixes of increasing size.
+
+    Per-call fixed costs (headers, model fitting, thread startup) dominate
+    small inputs, and cache effects show at large ones, so throughput is
+    measured on prefixes of each dataset at every size. Synthetic datasets
+    are generated at the largest size; the others are limited to their own
+    size. Algorithms that need continuous data (delta encoding, Markov
+    prediction) scale past the real datasets only on ar1-0.99.
+
+    Args:
+        selected_algorithms: Algorithms to run
+        selected_datasets: Datasets to run
+        sizes: Prefix sizes in bytes (default: DEFAULT_SCALING_SIZES)
+        cache_dir: Cache directory (dataset store)
+        timing_policy: Optional overrides for the default timing policy
+        max_call_time: Larger sizes are skipped for an algorithm once
+            encoding and decoding take longer than this (seconds)
+        verbose: Whether to print progress messages
+
+    Returns:
+        Dictionary with the sizes and one curve per compatible
+        dataset/algorithm pair (see run_scaling_curve)
+    """
+    sizes = sorted(DEFAULT_SCALING_SIZES if sizes is None else sizes)
+    curves = []
+    for dataset in selected_datasets:
+        dataset_tags = dataset.get("tags", [])
+        compatible = []
+        for algorithm in selected_algorithms:
+            alg_tags = algorithm.get("tags", [])
+            if not is_compatible(alg_tags, dataset_tags):
+                if verbose:
+                    print(
+                        f"Skipping algorithm {algorithm['name']} (tags: {alg_tags}) on dataset {dataset['name']} - incompatible with dataset tags"
+                    )
+                continue
+            compatible.append(algorithm)
+        if not compatible:
+            continue
+        data = get_sized_data(dataset, sizes[-1], cache_dir, verbose)
+        for algorithm in compatible:
+            if verbose:
+                print(f"\n{algorithm['name']} on {dataset['name']}:")
+            curve = run_scaling_curve(
+                algorithm,
+                data,
+                sizes,
+                timing_policy=timing_policy,
+                max_call_time=max_call_time,
+                verbose=verbose,
+            )
+            curves.append(
+                {
+                    "dataset": dataset["name"],
+                    "algorithm": algorithm["name"],
+                    "algorithm_version": algorithm["version"],
+                    "dataset_version": dataset["version"],
+                    **curve,
+                }
+            )
+        data = None
+    return {"sizes": sizes, "curves": curves}
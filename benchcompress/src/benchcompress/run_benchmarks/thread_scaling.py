@@ -0,0 +1,69 @@
+import os
+from typing import Any, Dict, List, Tuple
+
+
+def default_thread_counts() -> List[int]:
+    """Thread counts of a scaling run: powers of two up to the number of CPUs, and that number.
+
+    Returns:
+        Increasing list of thread counts, starting at 1
+    """
+    num_cpus = os.cpu_count() or 1
+    counts = []
+    threads = 1
+    while threads < num_cpus:
+        counts.append(threads)
+        threads *= 2
+    return counts + [num_cpus]
+
+
+def compute_thread_scaling(
+    results: List[Dict[str, Any]],
+    variants: Dict[str, Tuple[str, int]],
+) -> List[Dict[str, Any]]:
+    """Compute speedup and efficiency curves from the results of thread-count variants.
+
+    The speedup at n threads is the throughput relative to the smallest
+    thread count measured (normally 1), and the efficiency is the speedup
+    divided by the relative number of threads.
+
+    Args:
+        results: Benchmark results, as returned by run_benchmarks
+        variants: Maps each variant name to (base algorithm name, threads)
+
+    Returns:
+        One curve per dataset and base algorithm, in order of first
+        appearance, with one point per thread count (threads, compression
+        ratio and, for encode and decode, MB/s, speedup and efficiency)
+    """
+    curves: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for result in results:
+        if result["algorithm"] not in variants:
+            continue
+        base_name, threads = variants[result["algorithm"]]
+        curves.setdefault((result["dataset"], base_name), []).append(
+            {
+                "threads": threads,
+                "algorithm": result["algorithm"],
+                "compression_ratio": result["compression_ratio"],
+                "encode_mb_per_sec": result["encode_mb_per_sec"],
+                "decode_mb_per_sec": result["decode_mb_per_sec"],
+            }
+        )
+
+    scaling = []
+    for (dataset_name, base_name), points in curves.items():
+        points.sort(key=lambda point: point["threads"])
+        reference = points[0]
+        for point in points:
+            relative_threads = point["threads"] / reference["threads"]
+            for prefix in ["encode", "decode"]:
+                speedup = (
+                    point[f"{prefix}_mb_per_sec"] / reference[f"{prefix}_mb_per_sec"]
+                )
+                point[f"{prefix}_speedup"] = speedup
+                point[f"{prefix}_efficiency"] = speedup / relative_threads
+        scaling.append(
+            {"dataset": dataset_name, "algorithm": base_name, "points": points}
+        )
+    return scaling
@@ -2,6 +2,7 @@ from typing import Any, Dict, List
 import time
 from datetime import datetime
 from ._memobin import (
+    get_memobin_base_url,
     upload_to_memobin,
 )
 
@@ -35,5 +36,5 @@ def upload_benchmark_status(
         "completed_benchmarks": completed_benchmarks,
     }
 
-    status_url = "https://tempory.net/f/memobin/benchmark_status/current.json"
+    status_url = f"{get_memobin_base_url()}/benchmark_status/current.json"
     upload_to_memobin(status, status_url, memobin_api_key)
@@ -14,6 +14,7 @@ export interface BenchmarkResult {
   array_shape: number[];
   array_dtype: string;
   timestamp: number;
+  threads?: number;
 }
 
 export interface Algorithm {